@@ -6,28 +6,31 @@ Connects to backend WebSocket and controls LED/buttons
 
 import json
 import time
+import logging
 import sys
 import os
-from typing import Optional
+from typing import Iterable, Optional
 
-try:
-    import websocket
-except ImportError:
-    print("Installing websocket-client...")
-    os.system("pip install websocket-client")
-    import websocket
+from lazy import lazy_import
 
-try:
-    import requests
-except ImportError:
-    print("Installing requests...")
-    os.system("pip install requests")
-    import requests
+websocket = lazy_import("websocket", "websocket-client")
+requests = lazy_import("requests")
+
+from ratelimit import RateLimiter, limiter, priority_for_trade
+import logqueue
+
+logger = logging.getLogger("adafruit_device")
 
 # Configuration
 WS_URL = os.getenv("WS_URL", "ws://localhost:3001")
 API_URL = os.getenv("API_URL", "http://localhost:3001")
 USER_ID = os.getenv("USER_ID", "default")
+# Optional: JSON mapping of many users to pixels/buttons, served from one process
+DEVICE_CONFIG = os.getenv("DEVICE_CONFIG", "")
+# Optional: Durable outbound trade queue, e.g. trade_queue.jsonl (trades are sent synchronously when empty)
+TRADE_QUEUE_PATH = os.getenv("TRADE_QUEUE_PATH", "")
+# Ask for 20-byte binary price frames instead of JSON; devices skip them unparsed
+COMPACT_FEED = os.getenv("COMPACT_FEED", "0") in ("1", "binary")
 
 # Hardware configuration (adjust based on your setup)
 LED_PIN = 18  # GPIO pin for NeoPixel (or use built-in on Circuit Playground)
@@ -42,7 +45,10 @@ COLOR_MAP = {
     "yellow": (255, 255, 0),
     "purple": (128, 0, 128),
     "orange": (255, 165, 0),
+    "white": (255, 255, 255),
 }
+# Shown as soon as a press is queued, until the backend's next device signal
+ACK_COLOR = "white"
 
 # Try to import hardware libraries
 HAS_NEOPIXEL = False
@@ -63,25 +69,39 @@ try:
 except ImportError:
     print("⚠️  RPi.GPIO not found. Buttons will be simulated via keyboard input.")
 
-# Initialize hardware
-if HAS_NEOPIXEL:
-    try:
-        pixels = neopixel.NeoPixel(board.D18, 1, brightness=0.5)
-        print("✅ NeoPixel initialized on pin 18")
-    except Exception as e:
-        print(f"⚠️  Could not initialize NeoPixel: {e}")
-        HAS_NEOPIXEL = False
+pixels = None
+trade_queue = None  # TradeQueue, created in main when TRADE_QUEUE_PATH is set
 
-if HAS_GPIO:
-    try:
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(BUTTON_BUY_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        GPIO.setup(BUTTON_SELL_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        GPIO.setup(BUTTON_PANIC_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        print("✅ GPIO buttons initialized")
-    except Exception as e:
-        print(f"⚠️  Could not initialize GPIO: {e}")
-        HAS_GPIO = False
+
+def init_hardware(
+    pixel_count: int = 1,
+    button_pins: Iterable[int] = (BUTTON_BUY_PIN, BUTTON_SELL_PIN, BUTTON_PANIC_PIN),
+):
+    """Claim the NeoPixel strip and button pins; returns (pixels, GPIO or None)"""
+    global pixels, HAS_NEOPIXEL, HAS_GPIO
+
+    if HAS_NEOPIXEL:
+        try:
+            # Writes are pushed explicitly with pixels.show()
+            pixels = neopixel.NeoPixel(
+                board.D18, pixel_count, brightness=0.5, auto_write=False
+            )
+            print(f"✅ NeoPixel initialized on pin 18 ({pixel_count} pixels)")
+        except Exception as e:
+            print(f"⚠️  Could not initialize NeoPixel: {e}")
+            HAS_NEOPIXEL = False
+
+    if HAS_GPIO:
+        try:
+            GPIO.setmode(GPIO.BCM)
+            for pin in button_pins:
+                GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            print("✅ GPIO buttons initialized")
+        except Exception as e:
+            print(f"⚠️  Could not initialize GPIO: {e}")
+            HAS_GPIO = False
+
+    return pixels, (GPIO if HAS_GPIO else None)
 
 
 def set_led_color(color: Optional[str]):
@@ -95,9 +115,9 @@ def set_led_color(color: Optional[str]):
         try:
             pixels[0] = rgb
             pixels.show()
-            print(f"🟢 LED: {color.upper()}")
+            logger.info("🟢 LED: %s", color.upper())
         except Exception as e:
-            print(f"Error setting LED: {e}")
+            logger.error("Error setting LED: %s", e)
     else:
         # Console simulation
         emoji = {
@@ -107,17 +127,32 @@ def set_led_color(color: Optional[str]):
             "purple": "🟣",
             "orange": "🟠",
         }.get(color.lower(), "⚪")
-        print(f"{emoji} LED: {color.upper()}")
+        logger.info("%s LED: %s", emoji, color.upper())
+
+
+def send_trade(
+    trade_type: str,
+    user_id: Optional[str] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+):
+    """Send trade request to backend (queued when the trade queue is enabled)"""
+    user_id = user_id or USER_ID
+    if trade_queue is not None:
+        trade_queue.submit(user_id, trade_type, rate_limiter)
+        return
 
+    # Panic exits go through /trade/sell, as in the web app (and tradequeue.py)
+    endpoint = f"{API_URL}/trade/{'sell' if trade_type == 'panic' else trade_type}"
 
-def send_trade(trade_type: str):
-    """Send trade request to backend"""
-    endpoint = f"{API_URL}/trade/{trade_type}"
+    # Panic presses bypass the limiter; repeated buy/sell mashing is shed
+    if not (rate_limiter or limiter).acquire(priority_for_trade(trade_type)):
+        logger.warning("⚠️  %s dropped by rate limiter (too many presses)", trade_type.upper())
+        return
     
     try:
         response = requests.post(
             endpoint,
-            json={"userId": USER_ID, "type": trade_type},
+            json={"userId": user_id, "type": trade_type},
             headers={"Content-Type": "application/json"},
             timeout=5
         )
@@ -125,17 +160,20 @@ def send_trade(trade_type: str):
         if response.status_code == 200:
             data = response.json()
             if data.get("success"):
-                print(f"✅ Trade executed: {trade_type.upper()}")
+                logger.info("✅ Trade executed: %s (%s)", trade_type.upper(), user_id)
             else:
-                print(f"❌ Trade failed: {data.get('error', 'Unknown error')}")
+                logger.error("❌ Trade failed: %s", data.get("error", "Unknown error"))
         else:
-            print(f"❌ HTTP {response.status_code}: {response.text}")
+            logger.error("❌ HTTP %s: %s", response.status_code, response.text)
     except Exception as e:
-        print(f"❌ Error sending trade: {e}")
+        logger.error("❌ Error sending trade: %s", e)
 
 
 def on_message(ws, message):
     """Handle WebSocket messages"""
+    # Binary frames are compact price ticks, which the device doesn't use
+    if isinstance(message, bytes):
+        return
     try:
         data = json.loads(message)
         
@@ -148,40 +186,47 @@ def on_message(ws, message):
                 set_led_color(color)
             
             if message_text:
-                print(f"📢 {message_text}")
+                logger.info("📢 %s", message_text)
         
         elif data.get("type") == "price":
             # Optionally log price updates
             pass
             
     except Exception as e:
-        print(f"Error parsing message: {e}")
+        logger.error("Error parsing message: %s", e)
 
 
 def on_error(ws, error):
     """Handle WebSocket errors"""
-    print(f"❌ WebSocket error: {error}")
+    logger.error("❌ WebSocket error: %s", error)
 
 
 def on_close(ws, close_status_code, close_msg):
     """Handle WebSocket close"""
-    print("❌ WebSocket closed. Reconnecting in 3 seconds...")
+    logger.warning("❌ WebSocket closed. Reconnecting in 3 seconds...")
     time.sleep(3)
     connect_websocket()
 
 
+def subscribe_message(user_id: str, feed: int) -> dict:
+    """Subscribe request, asking for binary price ticks when COMPACT_FEED is set"""
+    if COMPACT_FEED:
+        return {"type": "subscribe", "userId": user_id, "encoding": "binary", "feed": feed}
+    return {"type": "subscribe", "userId": user_id}
+
+
 def on_open(ws):
     """Handle WebSocket open"""
-    print("✅ Connected to backend")
+    logger.info("✅ Connected to backend")
     # Subscribe to user's feed
-    subscribe_msg = json.dumps({"type": "subscribe", "userId": USER_ID})
+    subscribe_msg = json.dumps(subscribe_message(USER_ID, 0))
     ws.send(subscribe_msg)
-    print(f"📡 Subscribed to user: {USER_ID}")
+    logger.info("📡 Subscribed to user: %s", USER_ID)
 
 
 def connect_websocket():
     """Connect to WebSocket server"""
-    print(f"🔌 Connecting to {WS_URL}...")
+    logger.info("🔌 Connecting to %s...", WS_URL)
     
     ws = websocket.WebSocketApp(
         WS_URL,
@@ -229,7 +274,7 @@ def check_buttons():
             time.sleep(0.1)  # Debounce
             
         except Exception as e:
-            print(f"Error checking buttons: {e}")
+            logger.error("Error checking buttons: %s", e)
             time.sleep(1)
 
 
@@ -267,14 +312,49 @@ def keyboard_input():
 
 
 if __name__ == "__main__":
+    # Plain messages, like print; LOG_QUEUE=1 keeps slow stdout off the button thread
+    logqueue.setup_logging(level=logging.INFO, format="%(message)s")
+
     print("=" * 50)
     print("tradeOS Adafruit Device Controller")
     print("=" * 50)
     print(f"WebSocket URL: {WS_URL}")
     print(f"API URL: {API_URL}")
-    print(f"User ID: {USER_ID}")
+    if DEVICE_CONFIG:
+        print(f"Device config: {DEVICE_CONFIG}")
+    else:
+        print(f"User ID: {USER_ID}")
     print("=" * 50)
-    
+
+    if TRADE_QUEUE_PATH:
+        from tradequeue import TradeQueue
+
+        trade_queue = TradeQueue(TRADE_QUEUE_PATH, API_URL)
+        trade_queue.on_queued = lambda user_id, trade_type: set_led_color(ACK_COLOR)
+        trade_queue.start()
+        print(f"✅ Trade queue: {TRADE_QUEUE_PATH} ({len(trade_queue.pending)} pending)")
+
+    if DEVICE_CONFIG:
+        import multiplex
+
+        try:
+            multiplex.run(
+                multiplex.load_config(DEVICE_CONFIG),
+                init_hardware=init_hardware,
+                send_trade=send_trade,
+                colors=COLOR_MAP,
+                ws_url=WS_URL,
+                trade_queue=trade_queue,
+                subscribe_message=subscribe_message,
+            )
+        except KeyboardInterrupt:
+            print("\n👋 Shutting down...")
+            if HAS_GPIO:
+                GPIO.cleanup()
+        sys.exit(0)
+
+    init_hardware()
+
     # Start button checking thread if GPIO is available
     if HAS_GPIO:
         import threading
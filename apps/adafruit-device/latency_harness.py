@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Headless latency harness for the device controller
+Runs adafruit_device.py (or the multi-user controller) against fake
+NeoPixel and GPIO backends that timestamp every write and read, a local
+WebSocket source of `device` messages and a local trade endpoint, then
+reports latency distributions for:
+- WS `device` message sent -> LED shown
+- button pressed -> pin read LOW -> trade HTTP request received
+- button pressed -> acknowledgement LED (with --queue)
+
+Timestamps come from time.monotonic(), which is system-wide on Linux, so
+the WebSocket source can run in its own process.
+
+Usage:
+    python latency_harness.py --messages 500 --presses 100
+    python latency_harness.py --users 8 --connections 2 --queue
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+RGB = Tuple[int, int, int]
+
+# WS2812 data rate: about 30 us per pixel, plus the latch
+SHOW_COST_PER_PIXEL = 30e-6
+SHOW_LATCH = 50e-6
+
+# Colors alternate per user so every message changes the LED
+SIGNAL_COLORS = ("green", "red")
+# Buttons pressed in turn by the script
+PRESS_CYCLE = ("buy", "sell", "buy", "sell", "panic")
+# Single-user pins (adafruit_device.BUTTON_*_PIN); multi-user pins start here
+SINGLE_USER_PINS = {"buy": 5, "sell": 6, "panic": 13}
+MULTI_USER_PIN_BASE = 100
+
+
+# ---------------------------------------------------------------------------
+# Fake hardware
+# ---------------------------------------------------------------------------
+
+
+class FakeNeoPixel:
+    """NeoPixel stand-in that records when each frame reaches the LEDs"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self._values: List[RGB] = [(0, 0, 0)] * count
+        self._dirty: Dict[int, RGB] = {}
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.shows: List[Tuple[float, Dict[int, RGB]]] = []
+
+    def __setitem__(self, index: int, rgb: RGB):
+        with self._lock:
+            self._values[index] = tuple(rgb)
+            self._dirty[index] = tuple(rgb)
+            self.writes += 1
+
+    def __getitem__(self, index: int) -> RGB:
+        return self._values[index]
+
+    def show(self):
+        # Takes as long as clocking the strip out would
+        time.sleep(SHOW_LATCH + SHOW_COST_PER_PIXEL * self.count)
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            self.shows.append((time.monotonic(), dirty))
+
+
+class FakeGPIO:
+    """RPi.GPIO stand-in driven by scripted presses"""
+
+    BCM = "BCM"
+    IN = "IN"
+    PUD_UP = "PUD_UP"
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self):
+        self._levels: Dict[int, int] = {}
+        self._undetected: Dict[int, Dict] = {}
+        self.presses: List[Dict] = []
+        self.reads = 0
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin: int, mode, pull_up_down=None):
+        self._levels[pin] = self.HIGH
+
+    def input(self, pin: int) -> int:
+        self.reads += 1
+        level = self._levels.get(pin, self.HIGH)
+        if level == self.LOW and pin in self._undetected:
+            self._undetected.pop(pin)["detected"] = time.monotonic()
+        return level
+
+    def press(self, pin: int, **info) -> Dict:
+        press = {"pin": pin, "pressed": time.monotonic(), "detected": None, **info}
+        self.presses.append(press)
+        self._undetected[pin] = press
+        self._levels[pin] = self.LOW
+        return press
+
+    def release(self, pin: int):
+        self._levels[pin] = self.HIGH
+
+    def cleanup(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Local backend: trade endpoint (thread) and device signal source (process)
+# ---------------------------------------------------------------------------
+
+
+class TradeSink:
+    """Accepts every trade and records when it arrived"""
+
+    def __init__(self, port: int):
+        self.requests: List[Dict] = []
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received = time.monotonic()
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                sink.requests.append(
+                    {"received": received, "user": body.get("userId"), "type": body.get("type")}
+                )
+                payload = json.dumps({"success": True, "portfolio": {}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="trade-sink", daemon=True).start()
+
+
+def run_signal_source(port: int, user_ids: List[str], messages: int, interval: float, ready, go, results):
+    """Send `messages` device signals round-robin over the subscribed users"""
+    import asyncio
+    from lazy import load
+
+    websockets = load("websockets")
+
+    async def main():
+        subscribed = asyncio.Event()
+        sockets: Dict[str, object] = {}
+
+        async def handler(websocket, *_):
+            try:
+                async for message in websocket:
+                    data = json.loads(message)
+                    if data.get("type") == "subscribe":
+                        sockets[data["userId"]] = websocket
+                        if len(sockets) == len(user_ids):
+                            subscribed.set()
+            except websockets.ConnectionClosed:
+                pass
+
+        async with websockets.serve(handler, "127.0.0.1", port):
+            ready.set()
+            await subscribed.wait()
+            await asyncio.get_running_loop().run_in_executor(None, go.wait)
+
+            sent = []
+            counts = defaultdict(int)
+            for i in range(messages):
+                user_id = user_ids[i % len(user_ids)]
+                color = SIGNAL_COLORS[counts[user_id] % len(SIGNAL_COLORS)]
+                counts[user_id] += 1
+                message = json.dumps(
+                    {
+                        "type": "device",
+                        "userId": user_id,
+                        "data": {"color": color, "message": None},
+                    }
+                )
+                sent.append({"user": user_id, "color": color, "sent": time.monotonic()})
+                await sockets[user_id].send(message)
+                await asyncio.sleep(interval)
+            results.put(sent)
+            await asyncio.sleep(1)
+
+    asyncio.run(main())
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+
+def distribution(samples: List[float]) -> Dict:
+    """Percentiles of latencies given in seconds, reported in milliseconds"""
+    if not samples:
+        return {"samples": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * (len(ordered) - 1)))] * 1000, 2)
+
+    return {
+        "samples": len(ordered),
+        "p50": pick(0.5),
+        "p90": pick(0.9),
+        "p99": pick(0.99),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+def first_show(shows_by_pixel: Dict[int, deque], pixel: int, after: float, rgb: RGB) -> Optional[float]:
+    """Consume shows of `pixel` up to the first one at or after `after` showing `rgb`"""
+    shows = shows_by_pixel[pixel]
+    while shows:
+        shown, value = shows.popleft()
+        if shown >= after and value == rgb:
+            return shown
+    return None
+
+
+def shows_by_pixel(pixels: FakeNeoPixel, since: float) -> Dict[int, deque]:
+    by_pixel: Dict[int, deque] = defaultdict(deque)
+    for shown, dirty in pixels.shows:
+        if shown >= since:
+            for index, rgb in dirty.items():
+                by_pixel[index].append((shown, rgb))
+    return by_pixel
+
+
+# ---------------------------------------------------------------------------
+# Harness
+# ---------------------------------------------------------------------------
+
+
+def start_device(args, user_ids: List[str], pins: Dict[str, Dict[str, int]], pixels, gpio):
+    """Import the controller against the local backend and fake hardware"""
+    os.environ.update(
+        {
+            "WS_URL": f"ws://127.0.0.1:{args.ws_port}",
+            "API_URL": f"http://127.0.0.1:{args.http_port}",
+            "USER_ID": user_ids[0],
+            "TRADE_QUEUE_PATH": "",
+        }
+    )
+    import adafruit_device as device
+
+    device.pixels = pixels
+    device.GPIO = gpio
+    device.HAS_NEOPIXEL = device.HAS_GPIO = True
+
+    if args.queue:
+        from tradequeue import TradeQueue
+
+        path = os.path.join(tempfile.mkdtemp(prefix="trade-queue-"), "queue.jsonl")
+        device.trade_queue = TradeQueue(path, device.API_URL)
+        device.trade_queue.on_queued = lambda user_id, trade_type: device.set_led_color(device.ACK_COLOR)
+        device.trade_queue.start()
+
+    if len(user_ids) == 1:
+        threading.Thread(target=device.connect_websocket, name="ws", daemon=True).start()
+        threading.Thread(target=device.check_buttons, name="buttons", daemon=True).start()
+        return device
+
+    import multiplex
+
+    config = {
+        "connections": args.connections,
+        "users": [
+            {"user_id": user_id, "pixel": i, "buttons": pins[user_id]}
+            for i, user_id in enumerate(user_ids)
+        ],
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+    config = multiplex.load_config(f.name)
+    os.unlink(f.name)
+
+    threading.Thread(
+        target=multiplex.run,
+        args=(config,),
+        kwargs={
+            "init_hardware": lambda pixel_count, button_pins: (pixels, gpio),
+            "send_trade": device.send_trade,
+            "colors": device.COLOR_MAP,
+            "ws_url": device.WS_URL,
+            "trade_queue": device.trade_queue,
+        },
+        name="multiplex",
+        daemon=True,
+    ).start()
+    return device
+
+
+def measure_signals(args, user_ids, pixels, colors, ready, go, results) -> Dict:
+    """WS device message sent -> LED frame shown"""
+    started = time.monotonic()
+    go.set()
+    sent = results.get(timeout=args.messages * args.signal_interval + 30)
+    time.sleep(0.5)  # let the last frames land
+
+    pixel_of = {user_id: i for i, user_id in enumerate(user_ids)}
+    by_pixel = shows_by_pixel(pixels, started)
+    latencies, missed = [], 0
+    for message in sent:
+        shown = first_show(by_pixel, pixel_of[message["user"]], message["sent"], colors[message["color"]])
+        if shown is None:
+            missed += 1
+        else:
+            latencies.append(shown - message["sent"])
+    return {**distribution(latencies), "sent": len(sent), "not_shown": missed}
+
+
+def measure_presses(args, user_ids, pins, pixels, gpio, sink, colors) -> Dict:
+    """Button press -> pin read LOW -> trade request (and ack LED with --queue)"""
+    started = time.monotonic()
+    reads_before = gpio.reads
+    rng = random.Random(args.seed)
+    for i in range(args.presses):
+        user_id = user_ids[i % len(user_ids)]
+        trade_type = PRESS_CYCLE[(i // len(user_ids)) % len(PRESS_CYCLE)]
+        pin = pins[user_id][trade_type]
+        gpio.press(pin, user=user_id, type=trade_type)
+        time.sleep(args.hold)
+        gpio.release(pin)
+        # Jitter keeps presses from locking onto the controller's poll phase
+        time.sleep(max(0.0, args.press_interval - args.hold) + rng.uniform(0, args.jitter))
+    elapsed = time.monotonic() - started
+    time.sleep(2)  # deliveries still in flight
+
+    pending = defaultdict(deque)
+    for request in sink.requests:
+        if request["received"] >= started:
+            pending[(request["user"], request["type"])].append(request["received"])
+
+    pixel_of = {user_id: i for i, user_id in enumerate(user_ids)}
+    by_pixel = shows_by_pixel(pixels, started)
+    to_detect, to_request, to_ack = [], [], []
+    undetected = unsent = 0
+    for press in gpio.presses:
+        if press["pressed"] < started:
+            continue
+        if press["detected"] is None:
+            undetected += 1
+            continue
+        to_detect.append(press["detected"] - press["pressed"])
+
+        requests = pending[(press["user"], press["type"])]
+        while requests and requests[0] < press["pressed"]:
+            requests.popleft()
+        if requests:
+            to_request.append(requests.popleft() - press["pressed"])
+        else:
+            unsent += 1
+
+        if args.queue:
+            shown = first_show(by_pixel, pixel_of[press["user"]], press["pressed"], colors["white"])
+            if shown is not None:
+                to_ack.append(shown - press["pressed"])
+
+    report = {
+        "press_to_read": distribution(to_detect),
+        "press_to_request": {**distribution(to_request), "not_sent": unsent},
+        "presses": args.presses,
+        "undetected": undetected,
+        "pin_reads_per_s": round((gpio.reads - reads_before) / elapsed, 1),
+    }
+    if args.queue:
+        report["press_to_ack_led"] = distribution(to_ack)
+    return report
+
+
+def print_report(report: Dict):
+    def line(label: str, d: Dict, extra: str = ""):
+        if not d.get("samples"):
+            print(f"{label:20} no samples{extra}")
+            return
+        print(
+            f"{label:20} p50 {d['p50']:>8} ms  p90 {d['p90']:>8} ms  "
+            f"p99 {d['p99']:>8} ms  max {d['max']:>8} ms  (n={d['samples']}){extra}"
+        )
+
+    signals, presses = report["signals"], report["presses"]
+    print("=" * 50)
+    print(
+        f"Mode: {report['users']} user(s), {report['connections']} connection(s), "
+        f"trade queue {'on' if report['queue'] else 'off'}"
+    )
+    line("WS -> LED", signals, f", {signals['not_shown']} coalesced/missed")
+    line("Press -> pin read", presses["press_to_read"])
+    line("Press -> trade HTTP", presses["press_to_request"], f", {presses['press_to_request']['not_sent']} not sent")
+    if "press_to_ack_led" in presses:
+        line("Press -> ack LED", presses["press_to_ack_led"])
+    print(f"Pin reads: {presses['pin_reads_per_s']}/s, {presses['undetected']} presses undetected")
+    print("=" * 50)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="tradeOS device latency harness")
+    parser.add_argument("--users", type=int, default=1, help="users served (more than 1 uses multiplex.py)")
+    parser.add_argument("--connections", type=int, default=1, help="WebSockets in multi-user mode")
+    parser.add_argument("--messages", type=int, default=200, help="device signals to send")
+    parser.add_argument("--signal-interval", type=float, default=0.02, help="seconds between signals")
+    parser.add_argument("--presses", type=int, default=50, help="scripted button presses")
+    parser.add_argument("--press-interval", type=float, default=0.3, help="seconds between presses")
+    parser.add_argument("--hold", type=float, default=0.15, help="seconds each button is held")
+    parser.add_argument("--jitter", type=float, default=0.1, help="random extra seconds between presses")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--queue", action="store_true", help="route presses through tradequeue.py")
+    parser.add_argument("--ws-port", type=int, default=3131)
+    parser.add_argument("--http-port", type=int, default=3132)
+    parser.add_argument("--output", help="also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    if args.users == 1:
+        user_ids = ["harness-user"]
+        pins = {user_ids[0]: dict(SINGLE_USER_PINS)}
+    else:
+        user_ids = [f"harness-user-{i}" for i in range(args.users)]
+        pins = {
+            user_id: {
+                trade_type: MULTI_USER_PIN_BASE + 3 * i + k
+                for k, trade_type in enumerate(SINGLE_USER_PINS)
+            }
+            for i, user_id in enumerate(user_ids)
+        }
+
+    ready, go = multiprocessing.Event(), multiprocessing.Event()
+    results = multiprocessing.Queue()
+    source = multiprocessing.Process(
+        target=run_signal_source,
+        args=(args.ws_port, user_ids, args.messages, args.signal_interval, ready, go, results),
+        name="signal-source",
+        daemon=True,
+    )
+    source.start()
+    if not ready.wait(10):
+        print("❌ Signal source did not start")
+        return 1
+
+    sink = TradeSink(args.http_port)
+    pixels, gpio = FakeNeoPixel(len(user_ids)), FakeGPIO()
+    for user_pins in pins.values():
+        for pin in user_pins.values():
+            gpio.setup(pin, gpio.IN, pull_up_down=gpio.PUD_UP)
+    device = start_device(args, user_ids, pins, pixels, gpio)
+
+    report = {"users": args.users, "connections": args.connections, "queue": args.queue}
+    report["signals"] = measure_signals(args, user_ids, pixels, device.COLOR_MAP, ready, go, results)
+    report["presses"] = measure_presses(args, user_ids, pins, pixels, gpio, sink, device.COLOR_MAP)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    source.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Non-blocking queued logging for the tick path
+With LOG_QUEUE=1, log calls only enqueue the raw record; a background
+listener thread formats and writes it. Repeated warnings/errors from the
+same call site are rate-limited, and records that don't fit in the queue
+are dropped and counted instead of blocking the caller.
+
+Vendored: apps/ai-agent-example and apps/adafruit-device ship identical
+copies so each app deploys on its own. Edit both; the check in
+apps/ai-agent-example/tests/test_vendored.py fails if they drift.
+"""
+
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Dict, Optional, Tuple
+
+LOG_QUEUE = os.getenv("LOG_QUEUE", "0") == "1"
+# Records buffered before new ones are dropped
+QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Warnings/errors allowed per call site per window before sampling kicks in
+RATE_LIMIT_BURST = int(os.getenv("LOG_RATE_LIMIT_BURST", "5"))
+RATE_LIMIT_WINDOW = float(os.getenv("LOG_RATE_LIMIT_WINDOW", "10"))
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and defers formatting to the listener"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats here, on the caller's thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Block (rather than fail) on a full queue so shutdown flushes everything
+        self.queue.put(self._sentinel)
+
+
+class CallSiteRateLimitFilter(logging.Filter):
+    """Let at most `burst` WARNING+ records per call site through per window"""
+
+    def __init__(self, burst: int = RATE_LIMIT_BURST, window: float = RATE_LIMIT_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.suppressed = 0
+        self._sites: Dict[Tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        site = (record.pathname, record.lineno)
+        state = self._sites.get(site)
+        if state is None or now - state[0] >= self.window:
+            skipped = state[2] if state else 0
+            self._sites[site] = [now, 1, 0]
+            if skipped:
+                record.msg = f"{record.msg} (+{skipped} similar suppressed)"
+            return True
+
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+
+        state[2] += 1
+        self.suppressed += 1
+        return False
+
+
+_handler: Optional[DroppingQueueHandler] = None
+_filter: Optional[CallSiteRateLimitFilter] = None
+_listener: Optional[_Listener] = None
+
+
+def setup_logging(
+    level: int = logging.INFO,
+    format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+):
+    """Configure root logging; queued and rate-limited when LOG_QUEUE=1"""
+    global _handler, _filter, _listener
+
+    if not LOG_QUEUE:
+        logging.basicConfig(level=level, format=format)
+        return
+
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter(format))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    _handler = DroppingQueueHandler(log_queue)
+    _filter = CallSiteRateLimitFilter()
+    _handler.addFilter(_filter)
+
+    root = logging.getLogger()
+    root.handlers[:] = [_handler]
+    root.setLevel(level)
+
+    _listener = _Listener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued on shutdown
+    atexit.register(_listener.stop)
+
+
+def get_stats() -> Dict:
+    """Queue depth and dropped/suppressed record counts"""
+    if _handler is None:
+        return {"mode": "sync"}
+    return {
+        "mode": "queued",
+        "queued": _handler.queue.qsize(),
+        "dropped": _handler.dropped,
+        "rate_limited": _filter.suppressed if _filter else 0,
+    }
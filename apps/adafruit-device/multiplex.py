@@ -0,0 +1,310 @@
+"""
+Multiplexed multi-user device controller for tradeOS
+One process drives the LEDs and buttons of many users. Users are spread
+over a small pool of WebSocket connections (several subscriptions per
+connection). Each message is routed to its user's pixel with a dict
+lookup, and LED changes are batched into frames so the whole strip is
+written with one pixels.show() per frame.
+
+Config (DEVICE_CONFIG=devices.json):
+{
+  "connections": 2,
+  "users": [
+    {"user_id": "0xabc...", "pixel": 0, "buttons": {"buy": 5, "sell": 6, "panic": 13}},
+    {"user_id": "0xdef...", "pixel": 1, "buttons": {"buy": 19, "sell": 20, "panic": 21}}
+  ]
+}
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from lazy import lazy_import
+from ratelimit import RateLimiter, limiter
+
+websocket = lazy_import("websocket", "websocket-client")
+
+logger = logging.getLogger("adafruit_device.multiplex")
+
+# Shortest time between two pixels.show() calls (seconds)
+FRAME_INTERVAL = float(os.getenv("LED_FRAME_INTERVAL", "0.02"))
+# Threads sending trades, so one slow request never delays other users
+TRADE_WORKERS = int(os.getenv("TRADE_WORKERS", "4"))
+BUTTON_POLL_INTERVAL = 0.1
+RECONNECT_DELAY = 3
+
+TRADE_TYPES = ("buy", "sell", "panic")
+
+RGB = Tuple[int, int, int]
+
+
+def load_config(path: str) -> Dict:
+    """Load and validate a multi-user device config"""
+    with open(path) as f:
+        config = json.load(f)
+
+    users = config.get("users") or []
+    if not users:
+        raise ValueError(f"{path}: no users configured")
+
+    pixels: Dict[int, str] = {}
+    pins: Dict[int, str] = {}
+    user_ids = set()
+    for user in users:
+        user_id = user.get("user_id")
+        pixel = user.get("pixel")
+        if not user_id or not isinstance(pixel, int) or pixel < 0:
+            raise ValueError(f"{path}: each user needs a user_id and a pixel index")
+        if user_id in user_ids:
+            raise ValueError(f"{path}: user {user_id} is configured more than once")
+        user_ids.add(user_id)
+        if pixel in pixels:
+            raise ValueError(f"{path}: pixel {pixel} used by {pixels[pixel]} and {user_id}")
+        pixels[pixel] = user_id
+
+        for trade_type, pin in (user.get("buttons") or {}).items():
+            if trade_type not in TRADE_TYPES:
+                raise ValueError(f"{path}: unknown button '{trade_type}' for {user_id}")
+            if pin in pins:
+                raise ValueError(f"{path}: pin {pin} used by {pins[pin]} and {user_id}")
+            pins[pin] = user_id
+
+    config["pixel_count"] = max(pixels) + 1
+    config["connections"] = max(1, min(int(config.get("connections", 1)), len(users)))
+    return config
+
+
+class LedFrame:
+    """Coalesces pixel updates and writes each frame with one show()"""
+
+    def __init__(self, pixels, interval: float = FRAME_INTERVAL):
+        self.pixels = pixels  # NeoPixel with auto_write=False, or None to log instead
+        self.interval = interval
+        self._pending: Dict[int, RGB] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.updates = 0
+        self.coalesced = 0
+        self.frames = 0
+
+    def set(self, index: int, rgb: RGB):
+        """Queue a pixel change for the next frame (safe from any thread)"""
+        with self._lock:
+            if index in self._pending:
+                self.coalesced += 1
+            self._pending[index] = rgb
+            self.updates += 1
+        self._wakeup.set()
+
+    def flush(self):
+        """Write all pending changes as a single frame"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        if self.pixels is not None:
+            try:
+                for index, rgb in pending.items():
+                    self.pixels[index] = rgb
+                self.pixels.show()
+            except Exception as e:
+                logger.error("Error writing LED frame: %s", e)
+        else:
+            logger.info(
+                "💡 Frame: %s", ", ".join(f"#{i}={rgb}" for i, rgb in sorted(pending.items()))
+            )
+        self.frames += 1
+
+    def run(self):
+        """Frame loop; sleeps until there is something to draw"""
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            started = time.monotonic()
+            self.flush()
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def get_stats(self) -> Dict:
+        return {"updates": self.updates, "coalesced": self.coalesced, "frames": self.frames}
+
+
+class DeviceRouter:
+    """Routes device signals to pixels and button presses to trades"""
+
+    def __init__(
+        self,
+        config: Dict,
+        frame: LedFrame,
+        send_trade: Callable,
+        colors: Dict[str, RGB],
+    ):
+        self.frame = frame
+        self.colors = colors
+        self.send_trade = send_trade
+        self.pixel_for: Dict[str, int] = {u["user_id"]: u["pixel"] for u in config["users"]}
+        self.button_for: Dict[int, Tuple[str, str]] = {
+            pin: (u["user_id"], trade_type)
+            for u in config["users"]
+            for trade_type, pin in (u.get("buttons") or {}).items()
+        }
+        # Each user gets the rate limit a single device would have
+        self.limiters = {
+            user_id: RateLimiter(rate=limiter.rate, burst=limiter.burst)
+            for user_id in self.pixel_for
+        }
+        self._executor = ThreadPoolExecutor(TRADE_WORKERS, thread_name_prefix="trade")
+        self.unrouted = 0
+        self.presses = 0
+
+    def on_message(self, data: Dict, default_user: Optional[str] = None):
+        """Apply one decoded WebSocket message"""
+        if data.get("type") != "device":
+            return
+
+        index = self.pixel_for.get(data.get("userId") or default_user)
+        if index is None:
+            self.unrouted += 1
+            return
+
+        signal = data.get("data") or {}
+        color = signal.get("color")
+        if color:
+            self.frame.set(index, self.colors.get(color.lower(), (0, 0, 0)))
+        if signal.get("message"):
+            logger.info("📢 [%s] %s", index, signal["message"])
+
+    def press(self, pin: int):
+        """Handle a button press on `pin`"""
+        target = self.button_for.get(pin)
+        if target is None:
+            return
+        user_id, trade_type = target
+        self.presses += 1
+        self._executor.submit(self.send_trade, trade_type, user_id, self.limiters[user_id])
+
+    def acknowledge(self, user_id: str, trade_type: str):
+        """Light the user's pixel as soon as their press is queued"""
+        index = self.pixel_for.get(user_id)
+        if index is not None:
+            self.frame.set(index, self.colors.get("white", (255, 255, 255)))
+
+    def poll_buttons(self, gpio):
+        """Poll every configured pin and fire on falling edges"""
+        released = {pin: True for pin in self.button_for}
+        while True:
+            try:
+                for pin in self.button_for:
+                    pressed = gpio.input(pin) == gpio.LOW
+                    if pressed and released[pin]:
+                        self.press(pin)
+                    released[pin] = not pressed
+                time.sleep(BUTTON_POLL_INTERVAL)
+            except Exception as e:
+                logger.error("Error checking buttons: %s", e)
+                time.sleep(1)
+
+    def get_stats(self) -> Dict:
+        return {"unrouted": self.unrouted, "presses": self.presses, **self.frame.get_stats()}
+
+
+class MultiplexConnection:
+    """One WebSocket carrying the subscriptions of several users"""
+
+    def __init__(
+        self,
+        url: str,
+        user_ids: List[str],
+        router: DeviceRouter,
+        name: str,
+        subscribe_message: Optional[Callable] = None,
+    ):
+        self.url = url
+        self.user_ids = user_ids
+        self.router = router
+        self.name = name
+        self.subscribe_message = subscribe_message
+        # Backends that don't tag messages with userId only work one user per connection
+        self.default_user = user_ids[0] if len(user_ids) == 1 else None
+
+    def _on_open(self, ws):
+        for feed, user_id in enumerate(self.user_ids):
+            if self.subscribe_message:
+                message = self.subscribe_message(user_id, feed)
+            else:
+                message = {"type": "subscribe", "userId": user_id}
+            ws.send(json.dumps(message))
+        logger.info("📡 %s subscribed %d users", self.name, len(self.user_ids))
+
+    def _on_message(self, ws, message):
+        # Binary frames are compact price ticks; only device signals drive the LEDs
+        if isinstance(message, bytes):
+            return
+        try:
+            self.router.on_message(json.loads(message), self.default_user)
+        except Exception as e:
+            logger.error("Error parsing message: %s", e)
+
+    def _on_error(self, ws, error):
+        logger.error("❌ %s WebSocket error: %s", self.name, error)
+
+    def run(self):
+        while True:
+            ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+            )
+            ws.run_forever()
+            logger.warning("❌ %s closed. Reconnecting in %d seconds...", self.name, RECONNECT_DELAY)
+            time.sleep(RECONNECT_DELAY)
+
+
+def run(
+    config: Dict,
+    init_hardware: Callable,
+    send_trade: Callable,
+    colors: Dict[str, RGB],
+    ws_url: str,
+    trade_queue=None,
+    subscribe_message: Optional[Callable] = None,
+):
+    """Serve every configured user from this process (blocks)"""
+    users = config["users"]
+    pins = [pin for u in users for pin in (u.get("buttons") or {}).values()]
+    pixels, gpio = init_hardware(config["pixel_count"], pins)
+
+    frame = LedFrame(pixels)
+    router = DeviceRouter(config, frame, send_trade, colors)
+    if trade_queue is not None:
+        trade_queue.on_queued = router.acknowledge
+    threading.Thread(target=frame.run, name="led-frame", daemon=True).start()
+    if gpio is not None:
+        threading.Thread(
+            target=router.poll_buttons, args=(gpio,), name="buttons", daemon=True
+        ).start()
+        print(f"✅ Monitoring {len(pins)} buttons")
+
+    # Spread users round-robin over the connection pool
+    count = config["connections"]
+    connections = [
+        MultiplexConnection(
+            ws_url, [u["user_id"] for u in users[i::count]], router, f"ws-{i}", subscribe_message
+        )
+        for i in range(count)
+    ]
+    print(f"✅ Serving {len(users)} users over {count} connection(s)")
+
+    threads = [
+        threading.Thread(target=c.run, name=c.name, daemon=True) for c in connections
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
@@ -0,0 +1,128 @@
+"""
+Priority-aware outbound rate limiter for tradeOS clients
+A single token bucket shared by every backend call in the process.
+Priority order: panic > sell > buy > informational.
+
+Vendored: apps/ai-agent-example and apps/adafruit-device ship identical
+copies so each app deploys on its own. Edit both; the check in
+apps/ai-agent-example/tests/test_vendored.py fails if they drift.
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Optional
+
+PANIC = 0
+SELL = 1
+BUY = 2
+INFO = 3
+
+PRIORITY_NAMES = {PANIC: "panic", SELL: "sell", BUY: "buy", INFO: "info"}
+
+# Fraction of the bucket each class must leave untouched for higher classes
+DEFAULT_RESERVE = {PANIC: 0.0, SELL: 0.0, BUY: 0.2, INFO: 0.5}
+
+# Longest a call of each class may be deferred before it is shed (seconds)
+DEFAULT_MAX_WAIT = {PANIC: 0.0, SELL: 1.0, BUY: 0.5, INFO: 0.0}
+
+
+def priority_for_trade(trade_type: str) -> int:
+    """Map a trade type to its priority class"""
+    return {"panic": PANIC, "sell": SELL, "buy": BUY}.get(trade_type, INFO)
+
+
+class RateLimiter:
+    """Token bucket with priority classes and a panic fast lane"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        reserve: Optional[Dict[int, float]] = None,
+        max_wait: Optional[Dict[int, float]] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.reserve = {**DEFAULT_RESERVE, **(reserve or {})}
+        self.max_wait = {**DEFAULT_MAX_WAIT, **(max_wait or {})}
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = {p: 0 for p in PRIORITY_NAMES}
+        self.shed = {p: 0 for p in PRIORITY_NAMES}
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def _try_acquire(self, priority: int) -> float:
+        """Take a token if allowed; otherwise return seconds until one is"""
+        with self._lock:
+            self._refill(time.monotonic())
+
+            # Panic orders always go out, even if that drives the bucket negative
+            if priority == PANIC:
+                self._tokens -= 1
+                self.granted[PANIC] += 1
+                return 0.0
+
+            needed = 1 + self.reserve[priority] * self.burst
+            if self._tokens >= needed:
+                self._tokens -= 1
+                self.granted[priority] += 1
+                return 0.0
+
+            return (needed - self._tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def _shed(self, priority: int):
+        with self._lock:
+            self.shed[priority] += 1
+
+    def acquire(self, priority: int) -> bool:
+        """Blocking acquire; returns False if the call should be shed"""
+        deadline = time.monotonic() + self.max_wait[priority]
+        while True:
+            wait = self._try_acquire(priority)
+            if wait == 0:
+                return True
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                self._shed(priority)
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, priority: int) -> bool:
+        """Non-blocking acquire for asyncio callers"""
+        import asyncio  # deferred: threaded clients never pay for asyncio
+
+        deadline = time.monotonic() + self.max_wait[priority]
+        while True:
+            wait = self._try_acquire(priority)
+            if wait == 0:
+                return True
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                self._shed(priority)
+                return False
+            await asyncio.sleep(wait)
+
+    def get_stats(self) -> Dict:
+        """Limiter counters for /stats"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 3),
+                "granted": {PRIORITY_NAMES[p]: n for p, n in self.granted.items()},
+                "shed": {PRIORITY_NAMES[p]: n for p, n in self.shed.items()},
+            }
+
+
+# Process-wide limiter shared by all outbound backend calls
+limiter = RateLimiter(
+    rate=float(os.getenv("OUTBOUND_RATE", "5")),
+    burst=float(os.getenv("OUTBOUND_BURST", "10")),
+)
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from multiplex import load_config
+
+
+def write_config(tmp_path, users, **extra):
+    path = tmp_path / "devices.json"
+    path.write_text(json.dumps({"users": users, **extra}))
+    return str(path)
+
+
+def test_valid_config_sizes_the_strip_and_connection_pool(tmp_path):
+    path = write_config(
+        tmp_path,
+        [
+            {"user_id": "0xa", "pixel": 0, "buttons": {"buy": 5, "sell": 6}},
+            {"user_id": "0xb", "pixel": 3, "buttons": {"panic": 13}},
+        ],
+        connections=8,
+    )
+    config = load_config(path)
+    assert config["pixel_count"] == 4
+    assert config["connections"] == 2  # never more connections than users
+
+
+@pytest.mark.parametrize(
+    "users, message",
+    [
+        ([], "no users"),
+        ([{"user_id": "0xa"}], "pixel index"),
+        ([{"user_id": "0xa", "pixel": 0}, {"user_id": "0xb", "pixel": 0}], "pixel 0"),
+        (
+            [
+                {"user_id": "0xa", "pixel": 0, "buttons": {"buy": 5}},
+                {"user_id": "0xb", "pixel": 1, "buttons": {"sell": 5}},
+            ],
+            "pin 5",
+        ),
+        ([{"user_id": "0xa", "pixel": 0, "buttons": {"hodl": 5}}], "unknown button"),
+        ([{"user_id": "0xa", "pixel": 0}, {"user_id": "0xa", "pixel": 1}], "more than once"),
+    ],
+    ids=["empty", "no-pixel", "shared-pixel", "shared-pin", "unknown-button", "duplicate-user"],
+)
+def test_invalid_configs_are_rejected(tmp_path, users, message):
+    with pytest.raises(ValueError, match=message):
+        load_config(write_config(tmp_path, users))
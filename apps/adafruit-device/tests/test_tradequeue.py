@@ -0,0 +1,171 @@
+import json
+import time
+
+import pytest
+
+import tradequeue
+from ratelimit import RateLimiter
+from tradequeue import RETRY, SENT, TradeQueue
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, text=None):
+        self.status_code = status_code
+        self.text = text if text is not None else json.dumps(body)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeSession:
+    """Records posts and answers from a script (then succeeds)"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.posts = []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.posts.append({"url": url, "body": json, "key": headers["Idempotency-Key"]})
+        if self.responses:
+            response = self.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return FakeResponse(body={"success": True})
+
+
+def make_queue(tmp_path, *responses) -> TradeQueue:
+    queue = TradeQueue(str(tmp_path / "queue.jsonl"), "http://backend")
+    queue._session = FakeSession(*responses)
+    return queue
+
+
+def unlimited() -> RateLimiter:
+    return RateLimiter(rate=1000, burst=1000)
+
+
+def test_replay_after_crash_recovers_pending_trades(tmp_path):
+    queue = make_queue(tmp_path)
+    buy = queue.submit("0xa", "buy")
+    panic = queue.submit("0xb", "panic")
+    queue._deliver(panic, queue.pending[panic])
+    # Crash mid-append: the last journal line is torn
+    with open(queue.path, "a") as f:
+        f.write('{"op": "add", "id": "torn", "tr')
+
+    recovered = TradeQueue(queue.path, "http://backend")
+    assert list(recovered.pending) == [buy]
+    assert recovered.pending[buy]["type"] == "buy"
+    assert recovered.stats["recovered"] == 1
+
+
+def test_replayed_trade_keeps_its_idempotency_key(tmp_path):
+    key = make_queue(tmp_path).submit("0xa", "sell")
+
+    recovered = make_queue(tmp_path)
+    assert recovered._send_batch() == SENT
+    assert recovered._session.posts[0]["key"] == key
+    assert recovered.pending == {}
+
+
+def test_retry_resends_with_the_same_key(tmp_path):
+    queue = make_queue(tmp_path, FakeResponse(503, text="busy"), ConnectionError("down"))
+    key = queue.submit("0xa", "buy", unlimited())
+    assert queue._send_batch() == RETRY
+    assert queue._send_batch() == RETRY
+    assert queue._send_batch() == SENT
+    assert [post["key"] for post in queue._session.posts] == [key] * 3
+    assert queue.stats["delivered"] == 1
+
+
+def test_unreadable_response_is_retried(tmp_path):
+    queue = make_queue(tmp_path, FakeResponse(200, text="<html>gateway</html>"))
+    key = queue.submit("0xa", "buy", unlimited())
+    assert queue._send_batch() == RETRY
+    assert key in queue.pending
+    assert queue._send_batch() == SENT
+
+
+def test_new_intent_replaces_queued_buy_sell_but_not_panic(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.submit("0xa", "buy")
+    panic = queue.submit("0xa", "panic")
+    sell = queue.submit("0xa", "sell")
+    assert list(queue.pending) == [panic, sell]
+    assert queue.stats["collapsed"] == 1
+
+
+def test_panic_goes_first_to_trade_sell(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.submit("0xa", "buy", unlimited())
+    queue.submit("0xb", "panic")
+    queue._send_batch()
+    first = queue._session.posts[0]
+    assert first["url"] == "http://backend/trade/sell"
+    assert first["body"] == {"userId": "0xb", "type": "panic"}
+
+
+def test_stale_buy_is_expired_not_sent(tmp_path):
+    queue = make_queue(tmp_path)
+    key = queue.submit("0xa", "buy")
+    queue.pending[key]["at"] -= queue.max_age + 1
+    assert queue._send_batch() == SENT
+    assert queue._session.posts == []
+    assert queue.stats["expired"] == 1
+
+
+def test_compaction_keeps_only_pending_trades(tmp_path, monkeypatch):
+    monkeypatch.setattr(tradequeue, "COMPACT_AFTER", 4)
+    queue = make_queue(tmp_path)
+    for _ in range(3):
+        queue.submit("0xa", "buy", unlimited())  # each replaces the last: add + drop records
+    pending = queue.submit("0xb", "panic")
+    queue.submit("0xc", "buy", unlimited())
+    queue._session = FakeSession(FakeResponse(503, text="busy"))
+    assert queue._send_batch() == RETRY
+
+    with open(queue.path) as f:
+        records = [json.loads(line) for line in f]
+    assert [r["id"] for r in records] == list(queue.pending)
+    assert pending in queue.pending
+    queue.submit("0xd", "sell")  # the journal is still appendable after the swap
+    assert TradeQueue(queue.path, "http://backend").pending.keys() == queue.pending.keys()
+
+
+def test_sender_survives_a_disk_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(tradequeue, "RETRY_INITIAL", 0.01)
+    queue = make_queue(tmp_path)
+    real_fsync = tradequeue.os.fsync
+    failures = [OSError("disk full")]
+
+    def flaky_fsync(fd):
+        if failures:
+            raise failures.pop()
+        real_fsync(fd)
+
+    monkeypatch.setattr(tradequeue.os, "fsync", flaky_fsync)
+    queue.submit("0xa", "panic")
+    queue.start()
+
+    deadline = time.monotonic() + 5
+    while queue.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert queue.pending == {}
+    assert queue.stats["errors"] == 1
+    assert queue.stats["delivered"] == 1
+
+
+def test_synchronous_panic_uses_the_queue_endpoint(monkeypatch):
+    device = pytest.importorskip("adafruit_device")
+    posts = []
+
+    class Requests:
+        @staticmethod
+        def post(url, json=None, headers=None, timeout=None):
+            posts.append((url, json))
+            return FakeResponse(body={"success": True})
+
+    monkeypatch.setattr(device, "requests", Requests)
+    monkeypatch.setattr(device, "trade_queue", None)
+    device.send_trade("panic", "0xa", RateLimiter(rate=1, burst=1))
+    assert posts == [(f"{device.API_URL}/trade/sell", {"userId": "0xa", "type": "panic"})]
@@ -0,0 +1,265 @@
+"""
+Durable store-and-forward queue for device trades
+A button press is appended to a small journal file and acknowledged on
+the LED immediately. A sender thread delivers queued trades in batches
+over one keep-alive connection once the backend is reachable. A new
+buy/sell intent replaces that user's older queued buy/sell, panics are
+never collapsed or expired, and every trade carries an Idempotency-Key
+so retries after a timeout or restart can't execute twice.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from lazy import lazy_import
+from ratelimit import RateLimiter, limiter, priority_for_trade
+
+requests = lazy_import("requests")
+
+logger = logging.getLogger("adafruit_device.tradequeue")
+
+# Queued buy/sell intents older than this are dropped instead of sent (seconds)
+MAX_INTENT_AGE = float(os.getenv("TRADE_QUEUE_MAX_AGE", "30"))
+BATCH_SIZE = int(os.getenv("TRADE_QUEUE_BATCH", "20"))
+DELIVERY_TIMEOUT = 5
+RETRY_INITIAL = 1.0
+RETRY_MAX = 30.0
+# Rewrite the journal with only pending trades after this many records
+COMPACT_AFTER = 1000
+
+# 429 and 409 (same key still in progress) are worth retrying; other 4xx are final
+RETRY_STATUSES = {409, 429}
+
+# Outcomes of a delivery attempt
+SENT = "sent"
+RETRY = "retry"
+LIMITED = "limited"
+LIMITED_DELAY = 0.5
+
+
+class TradeQueue:
+    """Append-only journal of trade intents plus a background sender"""
+
+    def __init__(self, path: str, api_url: str, max_age: float = MAX_INTENT_AGE):
+        self.path = path
+        self.api_url = api_url
+        self.max_age = max_age
+        self.on_queued: Optional[Callable[[str, str], None]] = None
+        self.pending: "OrderedDict[str, Dict]" = OrderedDict()
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._records = 0
+        self._file = None
+        self._session = None
+        self.stats = {
+            "queued": 0,
+            "delivered": 0,
+            "rejected": 0,
+            "collapsed": 0,
+            "expired": 0,
+            "retries": 0,
+            "recovered": 0,
+            "errors": 0,
+        }
+
+        self._replay()
+        self._compact()
+
+    def _replay(self):
+        """Rebuild the pending set from the journal left by a previous run"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-append
+                    continue
+                if record.get("op") == "add":
+                    self.pending[record["id"]] = record["trade"]
+                else:
+                    self.pending.pop(record.get("id"), None)
+        self.stats["recovered"] = len(self.pending)
+        if self.pending:
+            logger.info("📦 Recovered %d queued trades", len(self.pending))
+
+    def _compact(self):
+        """Atomically rewrite the journal with only the pending trades"""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            for key, trade in self.pending.items():
+                f.write(json.dumps({"op": "add", "id": key, "trade": trade}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        # Swap handles only once the new journal is in place; a failed
+        # compaction leaves the old journal open and appendable
+        old, self._file = self._file, open(self.path, "a")
+        if old is not None:
+            old.close()
+        self._records = len(self.pending)
+
+    def _append(self, op: str, key: str, trade: Optional[Dict] = None):
+        record = {"op": op, "id": key}
+        if trade is not None:
+            record["trade"] = trade
+        self._file.write(json.dumps(record) + "\n")
+        # Flushed to the OS right away; the sender fsyncs before delivering
+        self._file.flush()
+        self._records += 1
+
+    def submit(
+        self, user_id: str, trade_type: str, rate_limiter: Optional[RateLimiter] = None
+    ) -> str:
+        """Queue a trade and acknowledge it; never waits on the network"""
+        key = uuid.uuid4().hex
+        trade = {"user": user_id, "type": trade_type, "at": time.time()}
+
+        with self._lock:
+            # The latest intent wins: drop this user's queued buy/sell orders
+            stale = [
+                k
+                for k, t in self.pending.items()
+                if t["user"] == user_id and t["type"] != "panic"
+            ]
+            for k in stale:
+                del self.pending[k]
+                self._append("drop", k)
+            self.stats["collapsed"] += len(stale)
+
+            self.pending[key] = trade
+            self._append("add", key, trade)
+            self.stats["queued"] += 1
+            if rate_limiter is not None:
+                self._limiters[user_id] = rate_limiter
+
+        if self.on_queued:
+            self.on_queued(user_id, trade_type)
+        self._wakeup.set()
+        return key
+
+    def _next_batch(self) -> List[tuple]:
+        with self._lock:
+            batch = list(self.pending.items())
+        # Panics first, otherwise in press order
+        batch.sort(key=lambda item: item[1]["type"] != "panic")
+        return batch[:BATCH_SIZE]
+
+    def _finish(self, key: str, op: str):
+        with self._lock:
+            if self.pending.pop(key, None) is not None:
+                self._append(op, key)
+
+    def _deliver(self, key: str, trade: Dict) -> str:
+        """Send one trade; SENT once it has a final answer"""
+        trade_type = trade["type"]
+        if trade_type != "panic" and time.time() - trade["at"] > self.max_age:
+            logger.warning("⌛ Dropped stale %s from %s", trade_type.upper(), trade["user"])
+            self.stats["expired"] += 1
+            self._finish(key, "expire")
+            return SENT
+
+        rate_limiter = self._limiters.get(trade["user"], limiter)
+        if not rate_limiter.acquire(priority_for_trade(trade_type)):
+            return LIMITED
+
+        # Panic exits go through /trade/sell, as in the web app
+        endpoint = "sell" if trade_type == "panic" else trade_type
+        try:
+            if self._session is None:
+                self._session = requests.Session()
+            response = self._session.post(
+                f"{self.api_url}/trade/{endpoint}",
+                json={"userId": trade["user"], "type": trade_type},
+                headers={"Content-Type": "application/json", "Idempotency-Key": key},
+                timeout=DELIVERY_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning("⚠️  Backend unreachable, %d trades queued: %s", len(self.pending), e)
+            return RETRY
+
+        if response.status_code >= 500 or response.status_code in RETRY_STATUSES:
+            logger.warning("⚠️  HTTP %s, will retry %s", response.status_code, trade_type.upper())
+            return RETRY
+
+        try:
+            success = response.status_code == 200 and response.json().get("success")
+        except (ValueError, AttributeError):
+            # Not the backend's JSON (e.g. a proxy error page); the key makes a resend safe
+            logger.warning("⚠️  Unreadable response to %s, will retry", trade_type.upper())
+            return RETRY
+
+        if success:
+            logger.info("✅ Trade executed: %s (%s)", trade_type.upper(), trade["user"])
+            self.stats["delivered"] += 1
+            self._finish(key, "done")
+        else:
+            logger.error("❌ Trade rejected: %s %s", response.status_code, response.text)
+            self.stats["rejected"] += 1
+            self._finish(key, "reject")
+        return SENT
+
+    def _send_batch(self) -> Optional[str]:
+        """Deliver one batch; the outcome that ended it, or None if nothing was pending"""
+        batch = self._next_batch()
+        if not batch:
+            return None
+        os.fsync(self._file.fileno())
+
+        outcome = SENT
+        for key, trade in batch:
+            if key not in self.pending:
+                continue  # collapsed while the batch was in flight
+            outcome = self._deliver(key, trade)
+            if outcome != SENT:
+                break
+
+        with self._lock:
+            if self._records > COMPACT_AFTER:
+                self._compact()
+        return outcome
+
+    def run(self):
+        """Sender loop (runs in its own thread)"""
+        delay = RETRY_INITIAL
+        retry_at = 0.0
+        while True:
+            wait = retry_at - time.monotonic()
+            if wait > 0:
+                # Backing off: new presses queue up but don't hammer a dead backend
+                time.sleep(wait)
+            elif not self.pending:
+                self._wakeup.wait()
+            self._wakeup.clear()
+
+            try:
+                outcome = self._send_batch()
+            except Exception as e:
+                # Presses are still being acknowledged; never let the sender die
+                logger.error("❌ Trade queue error, will retry: %s", e)
+                self.stats["errors"] += 1
+                outcome = RETRY
+
+            if outcome == LIMITED:
+                retry_at = time.monotonic() + LIMITED_DELAY
+            elif outcome == RETRY:
+                self.stats["retries"] += 1
+                retry_at = time.monotonic() + delay
+                delay = min(delay * 2, RETRY_MAX)
+            elif outcome == SENT:
+                delay = RETRY_INITIAL
+                retry_at = 0.0
+
+    def start(self):
+        threading.Thread(target=self.run, name="trade-queue", daemon=True).start()
+
+    def get_stats(self) -> Dict:
+        return {"pending": len(self.pending), **self.stats}
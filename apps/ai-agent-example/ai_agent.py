@@ -8,28 +8,31 @@ import os
 import sys
 import time
 import json
-import requests
+import logging
+import threading
 from typing import List, Optional, Dict
 from collections import deque
 
-try:
-    import websocket
-except ImportError:
-    print("Installing websocket-client...")
-    os.system("pip install websocket-client")
-    import websocket
+from lazy import lazy_import
 
-try:
-    import numpy as np
-except ImportError:
-    print("Installing numpy...")
-    os.system("pip install numpy")
-    import numpy as np
+websocket = lazy_import("websocket", "websocket-client")
+requests = lazy_import("requests")
+np = lazy_import("numpy")
+
+from portfolio import PortfolioMirror
+from ratelimit import INFO, limiter, priority_for_trade
+from breaker import CircuitOpenError, breakers
+from clock import MonotonicClock
+import logqueue
 
 # Configuration
 API_URL = os.getenv("API_URL", "http://localhost:3001")
 WS_URL = os.getenv("WS_URL", "ws://localhost:3001")
 AGENT_WALLET = os.getenv("AGENT_WALLET", "")
+# Seconds between reconciling the local portfolio mirror against /state
+PORTFOLIO_RECONCILE_INTERVAL = float(os.getenv("PORTFOLIO_RECONCILE_INTERVAL", "60"))
+
+logger = logging.getLogger("ai_agent")
 
 # Trading parameters
 MIN_PRICE_CHANGE = 0.01  # 1% minimum price change to trigger trade
@@ -42,14 +45,17 @@ RSI_OVERBOUGHT = 70
 class MomentumAgent:
     """Simple momentum-based trading agent"""
 
-    def __init__(self, wallet_address: str):
+    def __init__(self, wallet_address: str, clock=None):
         self.wallet_address = wallet_address
         self.price_history: deque = deque(maxlen=100)
         self.is_connected = False
         self.has_tokens = False
         self.session_started = False
-        self.last_trade_time = 0
+        # Trade timing runs on this clock (MonotonicClock live, TickClock in replay)
+        self.clock = clock or MonotonicClock()
+        self.last_trade_time: Optional[float] = None  # clock reading of the last trade
         self.min_trade_interval = 5  # Minimum seconds between trades
+        self.portfolio = PortfolioMirror(difficulty="pro")
 
     def calculate_rsi(self, prices: List[float], period: int = RSI_PERIOD) -> float:
         """Calculate Relative Strength Index"""
@@ -81,6 +87,12 @@ class MomentumAgent:
 
         return ((recent[-1] - recent[0]) / recent[0]) * 100
 
+    def trade_interval_elapsed(self) -> bool:
+        """True if min_trade_interval has passed since the last trade"""
+        if self.last_trade_time is None:
+            return True
+        return (self.clock.now() - self.last_trade_time) > self.min_trade_interval
+
     def should_buy(self, current_price: float) -> bool:
         """Determine if agent should buy"""
         if len(self.price_history) < LOOKBACK_PERIOD:
@@ -94,10 +106,12 @@ class MomentumAgent:
         # 1. Positive momentum (price rising)
         # 2. RSI not overbought
         # 3. Minimum time since last trade
+        # 4. Enough USD in the local portfolio mirror
         if (
             momentum > MIN_PRICE_CHANGE
             and rsi < RSI_OVERBOUGHT
-            and (time.time() - self.last_trade_time) > self.min_trade_interval
+            and self.trade_interval_elapsed()
+            and self.portfolio.allows("buy", current_price)
         ):
             return True
 
@@ -116,10 +130,12 @@ class MomentumAgent:
         # 1. Negative momentum (price falling)
         # 2. RSI not oversold (take profit)
         # 3. Minimum time since last trade
+        # 4. Tokens held in the local portfolio mirror
         if (
             momentum < -MIN_PRICE_CHANGE
             and rsi > RSI_OVERSOLD
-            and (time.time() - self.last_trade_time) > self.min_trade_interval
+            and self.trade_interval_elapsed()
+            and self.portfolio.allows("sell", current_price)
         ):
             return True
 
@@ -127,9 +143,15 @@ class MomentumAgent:
 
     def execute_trade(self, trade_type: str) -> bool:
         """Execute a trade via the API"""
+        if not limiter.acquire(priority_for_trade(trade_type)):
+            logger.warning("⚠️  %s shed by outbound rate limiter", trade_type.upper())
+            return False
+
         try:
             url = f"{API_URL}/trade/{trade_type}"
-            response = requests.post(
+            response = breakers.call(
+                f"/trade/{trade_type}",
+                requests.post,
                 url,
                 json={"userId": self.wallet_address, "type": trade_type},
                 headers={"Content-Type": "application/json"},
@@ -139,24 +161,75 @@ class MomentumAgent:
             if response.status_code == 200:
                 data = response.json()
                 if data.get("success"):
-                    self.last_trade_time = time.time()
-                    print(f"✅ {trade_type.upper()} executed successfully")
+                    self.last_trade_time = self.clock.now()
+                    self.portfolio.apply(data.get("portfolio"))
+                    logger.info("✅ %s executed successfully", trade_type.upper())
                     return True
                 else:
-                    print(f"❌ {trade_type.upper()} failed: {data.get('error')}")
+                    logger.error("❌ %s failed: %s", trade_type.upper(), data.get("error"))
             else:
-                print(f"❌ HTTP {response.status_code}: {response.text}")
+                logger.error("❌ HTTP %s: %s", response.status_code, response.text)
 
+            # Rejected trade means the mirror disagrees with the backend
+            if response.status_code == 400:
+                self.reconcile_portfolio()
+            return False
+        except CircuitOpenError as e:
+            logger.warning("⚡ %s skipped: %s", trade_type.upper(), e)
             return False
         except Exception as e:
-            print(f"❌ Error executing {trade_type}: {e}")
+            logger.error("❌ Error executing %s: %s", trade_type, e)
             return False
 
+    def fetch_state(self) -> Optional[Dict]:
+        """Fetch the authoritative game state (including portfolio) from API"""
+        if not limiter.acquire(INFO):
+            return None
+
+        try:
+            url = f"{API_URL}/state"
+            response = breakers.call(
+                "/state",
+                requests.get,
+                url,
+                params={"userId": self.wallet_address},
+                timeout=5,
+            )
+
+            if response.status_code == 200:
+                return response.json()
+            return None
+        except Exception as e:
+            logger.error("❌ Error fetching state: %s", e)
+            return None
+
+    def reconcile_portfolio(self) -> bool:
+        """Reconcile the local portfolio mirror against the backend"""
+        state = self.fetch_state()
+        if not state:
+            return False
+
+        portfolio = (state.get("user") or {}).get("portfolio")
+        if self.portfolio.reconcile(portfolio):
+            logger.warning(
+                "⚠️  Portfolio mirror drifted, resynced: %s", self.portfolio.to_dict()
+            )
+        return True
+
+    def reconcile_portfolio_loop(self):
+        """Slowly reconcile the portfolio mirror (runs in separate thread)"""
+        while True:
+            time.sleep(PORTFOLIO_RECONCILE_INTERVAL)
+            if self.session_started:
+                self.reconcile_portfolio()
+
     def start_session(self) -> bool:
         """Start a trading session for the agent"""
         try:
             url = f"{API_URL}/session/start"
-            response = requests.post(
+            response = breakers.call(
+                "/session/start",
+                requests.post,
                 url,
                 json={
                     "userId": self.wallet_address,
@@ -171,24 +244,33 @@ class MomentumAgent:
                 data = response.json()
                 if data.get("success"):
                     self.session_started = True
-                    print("✅ Trading session started")
+                    # Backend resets the portfolio on every new session
+                    self.portfolio.reset("pro")
+                    logger.info("✅ Trading session started")
                     return True
                 else:
-                    print(f"❌ Failed to start session: {data.get('error')}")
+                    logger.error("❌ Failed to start session: %s", data.get("error"))
             else:
-                print(f"❌ HTTP {response.status_code}: {response.text}")
+                logger.error("❌ HTTP %s: %s", response.status_code, response.text)
 
             return False
         except Exception as e:
-            print(f"❌ Error starting session: {e}")
+            logger.error("❌ Error starting session: %s", e)
             return False
 
     def check_token_balance(self) -> bool:
         """Check if agent has tokens"""
+        if not limiter.acquire(INFO):
+            return self.has_tokens
+
         try:
             url = f"{API_URL}/tokens/balance"
-            response = requests.get(
-                url, params={"address": self.wallet_address}, timeout=5
+            response = breakers.call(
+                "/tokens/balance",
+                requests.get,
+                url,
+                params={"address": self.wallet_address},
+                timeout=5,
             )
 
             if response.status_code == 200:
@@ -197,7 +279,7 @@ class MomentumAgent:
                 return self.has_tokens
             return False
         except Exception as e:
-            print(f"❌ Error checking balance: {e}")
+            logger.error("❌ Error checking balance: %s", e)
             return False
 
     def on_message(self, ws, message: str):
@@ -211,6 +293,7 @@ class MomentumAgent:
                 timestamp = tick.get("timestamp")
 
                 if price:
+                    self.clock.observe(timestamp)
                     self.price_history.append(price)
 
                     # Make trading decision
@@ -225,34 +308,34 @@ class MomentumAgent:
                 pass
 
         except Exception as e:
-            print(f"❌ Error processing message: {e}")
+            logger.error("❌ Error processing message: %s", e)
 
     def on_error(self, ws, error):
         """Handle WebSocket errors"""
-        print(f"❌ WebSocket error: {error}")
+        logger.error("❌ WebSocket error: %s", error)
 
     def on_close(self, ws, close_status_code, close_msg):
         """Handle WebSocket close"""
         self.is_connected = False
-        print("❌ WebSocket closed. Reconnecting in 3 seconds...")
+        logger.warning("⚠️  WebSocket closed. Reconnecting in 3 seconds...")
         time.sleep(3)
         self.connect()
 
     def on_open(self, ws):
         """Handle WebSocket open"""
         self.is_connected = True
-        print("✅ Connected to backend")
+        logger.info("✅ Connected to backend")
         # Subscribe to price feed
         subscribe_msg = json.dumps(
             {"type": "subscribe", "userId": self.wallet_address}
         )
         ws.send(subscribe_msg)
-        print(f"📡 Subscribed to price feed for {self.wallet_address}")
+        logger.info("📡 Subscribed to price feed for %s", self.wallet_address)
 
     def connect(self):
         """Connect to WebSocket server"""
         ws_url = WS_URL.replace("http", "ws") if WS_URL.startswith("http") else WS_URL
-        print(f"🔌 Connecting to {ws_url}...")
+        logger.info("🔌 Connecting to %s...", ws_url)
 
         ws = websocket.WebSocketApp(
             ws_url,
@@ -276,21 +359,27 @@ class MomentumAgent:
 
         # Start trading session
         if not self.start_session():
-            print("❌ Failed to start session. Exiting.")
+            logger.error("❌ Failed to start session. Exiting.")
             sys.exit(1)
 
         # Wait a bit for tokens to be airdropped
-        print("⏳ Waiting for tokens...")
+        logger.info("⏳ Waiting for tokens...")
         time.sleep(5)
 
         # Check token balance
         if not self.check_token_balance():
-            print("⚠️  No tokens detected. Agent will wait...")
+            logger.warning("⚠️  No tokens detected. Agent will wait...")
             # Keep checking
             while not self.has_tokens:
                 time.sleep(5)
                 self.check_token_balance()
-            print("✅ Tokens detected!")
+            logger.info("✅ Tokens detected!")
+
+        # Keep the portfolio mirror honest in the background
+        reconcile_thread = threading.Thread(
+            target=self.reconcile_portfolio_loop, daemon=True
+        )
+        reconcile_thread.start()
 
         # Connect to WebSocket and start trading
         self.connect()
@@ -302,6 +391,9 @@ if __name__ == "__main__":
         print("   export AGENT_WALLET=0xAgentWalletAddress")
         sys.exit(1)
 
+    # Plain messages, like print; LOG_QUEUE=1 moves writes off the callback thread
+    logqueue.setup_logging(level=logging.INFO, format="%(message)s")
+
     agent = MomentumAgent(AGENT_WALLET)
     try:
         agent.run()
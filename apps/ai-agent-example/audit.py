@@ -0,0 +1,210 @@
+"""
+Columnar, append-only decision and trade audit log
+Every evaluated tick is appended to in-memory column buffers (stdlib
+arrays, no per-tick allocation beyond the append). Full chunks, and
+whatever is buffered once the log has been idle for the flush interval,
+are written by a background thread as fixed-width column blocks, rotating
+files by size. `load()` reads them straight into NumPy arrays.
+"""
+
+import os
+import sys
+import glob
+import time
+import queue
+import struct
+import logging
+import threading
+from array import array
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Decision codes stored in the `decision` column
+HOLD = 0
+BUY = 1
+SELL = 2
+
+# (column, array typecode, numpy dtype) - order defines the on-disk layout
+COLUMNS: List[Tuple[str, str, str]] = [
+    ("timestamp", "d", "<f8"),
+    ("price", "d", "<f8"),
+    ("momentum", "d", "<f8"),
+    ("rsi", "d", "<f8"),
+    ("decision", "B", "u1"),
+    ("executed", "B", "u1"),
+    ("latency_ms", "f", "<f4"),
+]
+
+CHUNK_MAGIC = b"TAC1"
+CHUNK_HEADER = struct.Struct("<4sI")  # magic, row count
+FILE_SUFFIX = ".tac"
+
+CHUNK_ROWS = int(os.getenv("AUDIT_CHUNK_ROWS", "4096"))
+FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "5"))
+MAX_FILE_BYTES = int(os.getenv("AUDIT_MAX_FILE_BYTES", str(64 * 1024 * 1024)))
+
+
+def _new_buffers() -> List[array]:
+    return [array(typecode) for _, typecode, _ in COLUMNS]
+
+
+class AuditWriter:
+    """Buffers decision rows and flushes columnar chunks in the background"""
+
+    def __init__(
+        self,
+        directory: str,
+        chunk_rows: int = CHUNK_ROWS,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_file_bytes: int = MAX_FILE_BYTES,
+    ):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.rows_written = 0
+        self.chunks_written = 0
+        self.files_rotated = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._buffers = _new_buffers()
+        self._lock = threading.Lock()  # guards the buffers against the idle flush
+        self._last_handoff = time.monotonic()
+        self._queue: queue.Queue = queue.Queue()
+        self._file = None
+        self._file_index = 0
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def record(
+        self,
+        timestamp: float,
+        price: float,
+        momentum: float,
+        rsi: float,
+        decision: int,
+        executed: bool = False,
+        latency_ms: float = float("nan"),
+    ):
+        """Append one evaluated tick (called on the tick path)"""
+        row = (timestamp, price, momentum, rsi, decision, executed, latency_ms)
+        with self._lock:
+            for buffer, value in zip(self._buffers, row):
+                buffer.append(value)
+            full = len(self._buffers[0]) >= self.chunk_rows
+
+        # Partial chunks are handed off by the writer thread once idle
+        if full:
+            self._handoff()
+
+    def _handoff(self):
+        with self._lock:
+            buffers, self._buffers = self._buffers, _new_buffers()
+            self._last_handoff = time.monotonic()
+            # Queued under the lock so chunks stay in row order
+            if len(buffers[0]):
+                self._queue.put(buffers)
+
+    def _open_next_file(self):
+        if self._file is not None:
+            self._file.close()
+            self.files_rotated += 1
+        self._file_index += 1
+        name = time.strftime("audit-%Y%m%d-%H%M%S") + f"-{self._file_index:04d}{FILE_SUFFIX}"
+        self._file = open(os.path.join(self.directory, name), "ab")
+
+    def _write_chunk(self, buffers: List[array]):
+        if self._file is None or self._file.tell() >= self.max_file_bytes:
+            self._open_next_file()
+
+        rows = len(buffers[0])
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, rows))
+        for buffer in buffers:
+            if sys.byteorder == "big":
+                buffer.byteswap()
+            self._file.write(buffer.tobytes())
+        self._file.flush()
+
+        self.rows_written += rows
+        self.chunks_written += 1
+
+    def _run(self):
+        while True:
+            idle = time.monotonic() - self._last_handoff
+            try:
+                buffers = self._queue.get(timeout=max(self.flush_interval - idle, 0.01))
+            except queue.Empty:
+                # No full chunk for flush_interval: flush what has been buffered
+                if time.monotonic() - self._last_handoff >= self.flush_interval:
+                    self._handoff()
+                continue
+            if buffers is None:
+                break
+            try:
+                self._write_chunk(buffers)
+            except Exception as e:
+                logger.error("❌ Error writing audit chunk: %s", e)
+
+        if self._file is not None:
+            self._file.close()
+
+    def close(self):
+        """Flush buffered rows and stop the writer thread"""
+        self._handoff()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def get_stats(self) -> Dict:
+        return {
+            "directory": self.directory,
+            "buffered_rows": len(self._buffers[0]),
+            "pending_chunks": self._queue.qsize(),
+            "rows_written": self.rows_written,
+            "chunks_written": self.chunks_written,
+            "files_rotated": self.files_rotated,
+        }
+
+
+def _read_file(path: str, np) -> List[Dict]:
+    chunks = []
+    with open(path, "rb") as f:
+        data = f.read()
+
+    offset = 0
+    while offset + CHUNK_HEADER.size <= len(data):
+        magic, rows = CHUNK_HEADER.unpack_from(data, offset)
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"{path}: bad chunk header at byte {offset}")
+        offset += CHUNK_HEADER.size
+
+        chunk = {}
+        for name, _, dtype in COLUMNS:
+            size = rows * np.dtype(dtype).itemsize
+            if offset + size > len(data):
+                # Truncated tail from a crash mid-write; keep complete chunks only
+                return chunks
+            chunk[name] = np.frombuffer(data, dtype=dtype, count=rows, offset=offset)
+            offset += size
+        chunks.append(chunk)
+    return chunks
+
+
+def load(path: str) -> Dict:
+    """Load an audit file, or every audit file in a directory, into NumPy arrays"""
+    import numpy as np
+
+    if os.path.isdir(path):
+        paths = sorted(glob.glob(os.path.join(path, f"*{FILE_SUFFIX}")))
+    else:
+        paths = [path]
+
+    chunks = [chunk for p in paths for chunk in _read_file(p, np)]
+    return {
+        name: (
+            np.concatenate([chunk[name] for chunk in chunks])
+            if chunks
+            else np.empty(0, dtype=dtype)
+        )
+        for name, _, dtype in COLUMNS
+    }
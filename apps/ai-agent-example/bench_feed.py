@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Price feed encoding benchmark (COMPACT_FEED)
+Streams the same synthetic ticks to a MomentumAgent feed loop as JSON text
+or binary tickcodec frames, each with and without permessage-deflate, and
+reports per tick:
+- wire bytes, counted by a TCP proxy in front of the stand-in server
+- agent CPU (frame read, inflate, decode, dispatch), from process time
+- decode alone (JSON with json/orjson vs binary), timed in-process
+
+The stand-in honours {"encoding": "binary", "feed": n} like the backend, and
+negotiates deflate only in the deflate modes (WS_PERMESSAGE_DEFLATE=1).
+
+Usage: python bench_feed.py --ticks 100000
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing
+from typing import Dict, List, Tuple
+
+import tickcodec
+from runtime import RuntimeProfile
+
+# (label, binary ticks, permessage-deflate)
+MODES: List[Tuple[str, bool, bool]] = [
+    ("json", False, False),
+    ("json+deflate", False, True),
+    ("binary", True, False),
+    ("binary+deflate", True, True),
+]
+USER_ID = "0x5a3c8e2b7f1d4a6e9c0b8d7f6e5a4c3b2a1f0e9d"
+
+
+def make_ticks(n: int, seed: int):
+    from pricegen import PriceGenerator
+
+    ticks = PriceGenerator(difficulty="pro", seed=seed, session_ticks=600).generate(n)
+    # Backend ticks carry Date.now() milliseconds
+    ticks["timestamp"] = 1_700_000_000_000 + ticks["timestamp"] * 1000
+    return ticks
+
+
+def encode_ticks(ticks, binary: bool) -> List:
+    if binary:
+        return [
+            tickcodec.encode(0, price, timestamp, tickcodec.TRENDS[trend])
+            for price, timestamp, trend in ticks.tolist()
+        ]
+    return [
+        json.dumps(
+            {
+                "type": "price",
+                "userId": USER_ID,
+                "data": {"price": price, "timestamp": timestamp, "trend": tickcodec.TRENDS[trend]},
+            },
+            separators=(",", ":"),
+        )
+        for price, timestamp, trend in ticks.tolist()
+    ]
+
+
+def run_source(port: int, ticks: int, seed: int, deflate: bool, ready, wire_bytes):
+    """Stand-in feed behind a byte-counting proxy on `port` (child process)"""
+    import websockets
+
+    data = make_ticks(ticks, seed)
+    encoded = {binary: encode_ticks(data, binary) for binary in (False, True)}
+
+    async def handler(websocket, *_):
+        subscribe = json.loads(await websocket.recv())
+        messages = encoded[subscribe.get("encoding") == "binary"]
+        try:
+            for message in messages:
+                await websocket.send(message)
+            await websocket.wait_closed()
+        except websockets.ConnectionClosed:
+            pass
+
+    async def pipe(reader, writer, count: bool):
+        try:
+            while chunk := await reader.read(65536):
+                if count:
+                    wire_bytes.value += len(chunk)
+                writer.write(chunk)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def proxy(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection("127.0.0.1", port + 1)
+        await asyncio.gather(
+            pipe(client_reader, server_writer, False),
+            pipe(server_reader, client_writer, True),
+        )
+
+    async def main():
+        compression = "deflate" if deflate else None
+        async with websockets.serve(
+            handler, "127.0.0.1", port + 1, max_queue=None, compression=compression
+        ):
+            async with await asyncio.start_server(proxy, "127.0.0.1", port):
+                ready.set()
+                await asyncio.Future()
+
+    asyncio.run(main())
+
+
+def feed_worker(port: int, ticks: int, binary: bool, results):
+    """Count ticks through MomentumAgent.connect_websocket (child process)"""
+    os.environ.update(
+        {
+            "WS_URL": f"ws://127.0.0.1:{port}",
+            "COMPACT_FEED": "1" if binary else "0",
+            "SNAPSHOT_PATH": "",
+            "AUDIT_DIR": "",
+            "HISTORY_POINTS": "0",
+            "LOG_QUEUE": "1",
+        }
+    )
+    import logging
+    import server
+
+    logging.getLogger("server").setLevel(logging.WARNING)
+
+    class BenchAgent(server.MomentumAgent):
+        def __init__(self):
+            super().__init__("0xbench")
+            self.has_tokens = self.session_started = True
+            self.seen = 0
+            self.checksum = 0.0
+            self.done = asyncio.Event()
+
+        async def evaluate_tick(self, price, timestamp=None):
+            self.seen += 1
+            self.checksum += price
+            if self.seen == ticks:
+                self.done.set()
+
+    async def main():
+        agent = BenchAgent()
+        cpu, wall = time.process_time(), time.perf_counter()
+        task = asyncio.create_task(agent.connect_websocket())
+        await agent.done.wait()
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        task.cancel()
+        return {"cpu_us": cpu / ticks * 1e6, "ticks_per_s": ticks / wall, "checksum": agent.checksum}
+
+    results.put(asyncio.run(main()))
+
+
+def decode_cost(messages: List, binary: bool, loads=json.loads, repeat: int = 200) -> float:
+    """Microseconds to turn one message into (price, timestamp), as the feed loop does"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if binary:
+            for message in messages:
+                for _, price, timestamp in tickcodec.decode(message):
+                    pass
+        else:
+            for message in messages:
+                data = loads(message)
+                if data.get("type") == "price":
+                    tick = data.get("data", {})
+                    price, timestamp = tick.get("price"), tick.get("timestamp")
+    return (time.perf_counter() - started) / (repeat * len(messages)) * 1e6
+
+
+def bench_mode(binary: bool, deflate: bool, args) -> Dict:
+    ready = multiprocessing.Event()
+    wire_bytes = multiprocessing.Value("q", 0, lock=False)
+    source = multiprocessing.Process(
+        target=run_source,
+        args=(args.port, args.ticks, args.seed, deflate, ready, wire_bytes),
+        daemon=True,
+    )
+    source.start()
+    try:
+        if not ready.wait(30):
+            raise RuntimeError("feed source did not start")
+        results = multiprocessing.Queue()
+        worker = multiprocessing.Process(
+            target=feed_worker, args=(args.port, args.ticks, binary, results)
+        )
+        worker.start()
+        result = results.get(timeout=300)
+        worker.join(timeout=10)
+        time.sleep(0.2)
+        result["bytes_per_tick"] = wire_bytes.value / args.ticks
+        return result
+    finally:
+        source.terminate()
+        source.join()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="tradeOS price feed encoding benchmark")
+    parser.add_argument("--ticks", type=int, default=100_000, help="price ticks per mode")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=3121)
+    parser.add_argument("--output", help="also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report: Dict[str, Dict] = {}
+    for label, binary, deflate in MODES:
+        print(f"⏱️  {label}...")
+        report[label] = bench_mode(binary, deflate, args)
+
+    # Decode alone, on a cache-resident sample
+    sample = make_ticks(1000, args.seed)
+    text, frames = encode_ticks(sample, False), encode_ticks(sample, True)
+    decode = {
+        "json": decode_cost(text, False),
+        "orjson": decode_cost(text, False, RuntimeProfile("performance").json_loads()),
+        "binary": decode_cost(frames, True),
+    }
+
+    checksums = {round(r.pop("checksum"), 6) for r in report.values()}
+    if len(checksums) != 1:
+        print(f"❌ Modes delivered different prices: {checksums}")
+        return 1
+
+    base = report["json"]
+    print("=" * 60)
+    print(f"{'':16}{'bytes/tick':>11}{'vs json':>9}{'agent CPU/tick':>16}{'ticks/s':>9}")
+    for label, r in report.items():
+        print(
+            f"{label:16}{r['bytes_per_tick']:>11.1f}{base['bytes_per_tick'] / r['bytes_per_tick']:>8.1f}x"
+            f"{r['cpu_us']:>14.1f}us{r['ticks_per_s']:>9,.0f}"
+        )
+    print("-" * 60)
+    print(
+        "Decode per tick: "
+        + ", ".join(f"{name} {us:.2f}us" for name, us in decode.items())
+        + f" ({decode['json'] / decode['binary']:.1f}x / {decode['orjson'] / decode['binary']:.1f}x)"
+    )
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"modes": report, "decode_us": decode}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Runtime profile benchmark for the agent server
+Compares the default and performance RUNTIME_PROFILEs on:
+- request throughput: keep-alive GET / against a real `server.py` process
+- tick throughput: price messages a MomentumAgent feed loop consumes per
+  second from a local WebSocket blasting pre-encoded ticks
+
+Usage: python bench_runtime.py --duration 5 --ticks 100000
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import multiprocessing
+from typing import Dict, List
+
+from loadtest import run_backend
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROFILES = ["default", "performance"]
+
+
+# ---------------------------------------------------------------------------
+# Request throughput
+# ---------------------------------------------------------------------------
+
+
+async def _http_worker(port: int, deadline: float, counts: List[int]):
+    """One keep-alive connection sending GET / back to back"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = b"GET / HTTP/1.1\r\nHost: bench\r\n\r\n"
+    try:
+        while time.monotonic() < deadline:
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            counts[0] += 1
+    finally:
+        writer.close()
+
+
+async def _hammer(port: int, concurrency: int, duration: float) -> float:
+    counts = [0]
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(*(_http_worker(port, deadline, counts) for _ in range(concurrency)))
+    return counts[0] / (time.monotonic() - started)
+
+
+async def _wait_ready(port: int, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+def bench_requests(profile: str, args) -> Dict:
+    """Start server.py under `profile` and measure GET / throughput"""
+    env = {
+        **os.environ,
+        "RUNTIME_PROFILE": profile,
+        "AGENT_WALLET": f"0xbench{PROFILES.index(profile):035x}",
+        "AGENT_PORT": str(args.agent_port),
+        "API_URL": f"http://127.0.0.1:{args.http_port}",
+        "WS_URL": f"ws://127.0.0.1:{args.ws_port}",
+        "SNAPSHOT_PATH": "",
+        "AUDIT_DIR": "",
+        "LOG_QUEUE": "1",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "server.py"],
+        cwd=HERE,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        # Startup waits for the session and token balance before serving
+        if not asyncio.run(_wait_ready(args.agent_port, 30)):
+            raise RuntimeError(f"server.py ({profile}) did not start")
+        asyncio.run(_hammer(args.agent_port, args.concurrency, 1.0))  # warm up
+        rate = asyncio.run(_hammer(args.agent_port, args.concurrency, args.duration))
+        return {"requests_per_s": round(rate, 1)}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+# ---------------------------------------------------------------------------
+# Tick throughput
+# ---------------------------------------------------------------------------
+
+
+def run_tick_source(port: int, ticks: int, ready):
+    """WebSocket server that sends `ticks` pre-encoded price messages per subscriber"""
+    import websockets
+
+    messages = [
+        json.dumps(
+            {
+                "type": "price",
+                "userId": "0xbench",
+                "data": {"price": 1.0 + (i % 1000) * 1e-4, "timestamp": 1.7e12 + i, "trend": "sideways"},
+            }
+        )
+        for i in range(ticks)
+    ]
+
+    async def handler(websocket, *_):
+        await websocket.recv()  # subscribe
+        try:
+            for message in messages:
+                await websocket.send(message)
+            await websocket.wait_closed()
+        except websockets.ConnectionClosed:
+            pass
+
+    async def main():
+        async with websockets.serve(handler, "127.0.0.1", port, max_queue=None):
+            ready.set()
+            await asyncio.Future()
+
+    asyncio.run(main())
+
+
+def tick_worker(profile: str, ws_port: int, ticks: int, results):
+    """Time a MomentumAgent feed loop over `ticks` messages (child process)"""
+    os.environ.update(
+        {
+            "RUNTIME_PROFILE": profile,
+            "WS_URL": f"ws://127.0.0.1:{ws_port}",
+            "SNAPSHOT_PATH": "",
+            "AUDIT_DIR": "",
+            "LOG_QUEUE": "1",
+        }
+    )
+    import logging
+    import server
+
+    logging.getLogger("server").setLevel(logging.WARNING)
+
+    class BenchAgent(server.MomentumAgent):
+        def __init__(self):
+            super().__init__("0xbench")
+            # Count ticks through the feed path without running the strategy
+            self.has_tokens = self.session_started = True
+            self.seen = 0
+            self.started = 0.0
+            self.done = asyncio.Event()
+
+        async def evaluate_tick(self, price, timestamp=None):
+            if self.seen == 0:
+                self.started = time.perf_counter()
+            self.seen += 1
+            if self.seen == ticks:
+                self.done.set()
+
+    async def main():
+        agent = BenchAgent()
+        task = asyncio.create_task(agent.connect_websocket())
+        await agent.done.wait()
+        elapsed = time.perf_counter() - agent.started
+        task.cancel()
+        return (ticks - 1) / elapsed
+
+    results.put(server.runtime_profile.run(main()))
+
+
+def bench_ticks(profile: str, args) -> Dict:
+    ready = multiprocessing.Event()
+    source = multiprocessing.Process(
+        target=run_tick_source, args=(args.tick_port, args.ticks, ready), daemon=True
+    )
+    source.start()
+    try:
+        if not ready.wait(10):
+            raise RuntimeError("tick source did not start")
+        results = multiprocessing.Queue()
+        worker = multiprocessing.Process(
+            target=tick_worker, args=(profile, args.tick_port, args.ticks, results)
+        )
+        worker.start()
+        rate = results.get(timeout=300)
+        worker.join(timeout=10)
+        return {"ticks_per_s": round(rate, 1)}
+    finally:
+        source.terminate()
+        source.join()
+
+
+# ---------------------------------------------------------------------------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="tradeOS agent runtime profile benchmark")
+    parser.add_argument("--duration", type=float, default=5, help="request benchmark window (s)")
+    parser.add_argument("--concurrency", type=int, default=16, help="keep-alive HTTP connections")
+    parser.add_argument("--ticks", type=int, default=100_000, help="price messages per tick run")
+    parser.add_argument("--http-port", type=int, default=3111)
+    parser.add_argument("--ws-port", type=int, default=3112)
+    parser.add_argument("--tick-port", type=int, default=3113)
+    parser.add_argument("--agent-port", type=int, default=8011)
+    parser.add_argument("--output", help="also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    # Stand-in backend so server.py can start a session and see tokens
+    ready = multiprocessing.Event()
+    stop = multiprocessing.Event()
+    backend = multiprocessing.Process(
+        target=run_backend,
+        args=(
+            args.http_port,
+            args.ws_port,
+            {"difficulty": "pro", "seed": 1, "tick_interval": 1.0},
+            ready,
+            stop,
+            multiprocessing.Queue(),
+        ),
+        name="stand-in-backend",
+        daemon=True,
+    )
+    backend.start()
+    if not ready.wait(10):
+        print("❌ Stand-in backend did not start")
+        backend.terminate()
+        return 1
+
+    report: Dict[str, Dict] = {}
+    try:
+        for profile in PROFILES:
+            print(f"⏱️  {profile}: requests...")
+            report[profile] = bench_requests(profile, args)
+            print(f"⏱️  {profile}: ticks...")
+            report[profile].update(bench_ticks(profile, args))
+    finally:
+        stop.set()
+        backend.join(timeout=10)
+
+    base, fast = report["default"], report["performance"]
+    print("=" * 50)
+    print(f"{'':14}{'default':>12}{'performance':>14}{'gain':>8}")
+    for key, label in (("requests_per_s", "Requests/s"), ("ticks_per_s", "Ticks/s")):
+        gain = fast[key] / base[key] if base[key] else float("nan")
+        print(f"{label:14}{base[key]:>12,.0f}{fast[key]:>14,.0f}{gain:>7.2f}x")
+    print("=" * 50)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
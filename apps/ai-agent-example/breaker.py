@@ -0,0 +1,206 @@
+"""
+Circuit breakers and adaptive timeouts for tradeOS backend calls
+One breaker per endpoint. Timeouts follow observed latency percentiles,
+calls fail fast while a breaker is open, and a single half-open probe
+decides when the endpoint has recovered.
+"""
+
+import os
+import time
+import functools
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Consecutive failures before a breaker opens
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+# Seconds a breaker stays open before allowing a probe
+RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "10"))
+# Adaptive timeout = p99 latency * multiplier, clamped to [MIN_TIMEOUT, call timeout]
+TIMEOUT_MULTIPLIER = 3.0
+MIN_TIMEOUT = 0.25
+# Latency samples required before timeouts start adapting
+MIN_SAMPLES = 20
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Breaker with a rolling latency window for a single endpoint"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+        window: int = 200,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.fast_failures = 0
+        self._probe_in_flight = False
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out right now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.fast_failures += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+
+            # Half-open: let exactly one probe through
+            if self._probe_in_flight:
+                self.fast_failures += 1
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self.failures = 0
+            self.state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            # Released only once the verdict is in, under the same lock
+            self._probe_in_flight = False
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0-100) over the rolling window"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def timeout(self, max_timeout: float) -> float:
+        """Adaptive timeout derived from observed latency"""
+        if len(self._latencies) < MIN_SAMPLES:
+            return max_timeout
+        p99 = self.percentile(99) or max_timeout
+        return max(MIN_TIMEOUT, min(max_timeout, p99 * TIMEOUT_MULTIPLIER))
+
+    def call(self, fn: Callable[..., Any], *args, timeout: float, **kwargs) -> Any:
+        """Run `fn(*args, timeout=..., **kwargs)` through the breaker.
+
+        `timeout` is the upper bound; the adaptive timeout is passed on.
+        Exceptions and HTTP 5xx responses count as failures.
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"circuit open for {self.name}")
+
+        started = time.monotonic()
+        try:
+            result = fn(*args, timeout=self.timeout(timeout), **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+        return self._record_result(result, started)
+
+    async def call_async(self, fn: Callable[..., Any], *args, timeout: float, **kwargs) -> Any:
+        """Like `call`, but runs the blocking `fn` in the loop's default executor
+
+        A slow endpoint then only delays the awaiting task, not the event loop.
+        """
+        import asyncio  # deferred: threaded clients never pay for asyncio
+
+        if not self.allow():
+            raise CircuitOpenError(f"circuit open for {self.name}")
+
+        started = time.monotonic()
+        call = functools.partial(fn, *args, timeout=self.timeout(timeout), **kwargs)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(None, call)
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+        return self._record_result(result, started)
+
+    def _release_probe(self):
+        # A probe that ends without a verdict (e.g. cancelled) must not keep
+        # the breaker rejecting every call; verdicts release it themselves
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _record_result(self, result: Any, started: float) -> Any:
+        if getattr(result, "status_code", 200) >= 500:
+            self.record_failure()
+        else:
+            self.record_success(time.monotonic() - started)
+        return result
+
+    def get_stats(self) -> Dict:
+        p50 = self.percentile(50)
+        p99 = self.percentile(99)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "fast_failures": self.fast_failures,
+            "samples": len(self._latencies),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+        }
+
+
+class BreakerRegistry:
+    """Lazily created breakers keyed by endpoint"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(endpoint)
+            return breaker
+
+    def call(self, endpoint: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return self.get(endpoint).call(fn, *args, **kwargs)
+
+    async def call_async(self, endpoint: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self.get(endpoint).call_async(fn, *args, **kwargs)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {endpoint: breaker.get_stats() for endpoint, breaker in breakers}
+
+
+# Process-wide breakers for backend endpoints
+breakers = BreakerRegistry()
@@ -0,0 +1,48 @@
+"""
+Clocks for MomentumAgent's trade timing
+Live agents measure min_trade_interval on a monotonic clock, so wall-clock
+jumps (NTP, DST) can't block or unblock trades. Replays and backtests use
+a TickClock that only moves with the tick timestamps it is shown, so
+recorded ticks can be fed through the same per-tick logic at CPU speed.
+"""
+
+import time
+from typing import Optional
+
+
+class MonotonicClock:
+    """Live clock: time.monotonic(), ignoring tick timestamps"""
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def observe(self, timestamp: Optional[float]):
+        """Called with every tick's timestamp (ms); the live clock ignores it"""
+
+    def to_wall(self, t: float) -> float:
+        """Convert a reading of this clock to Unix time (for snapshots)"""
+        return t + (time.time() - time.monotonic())
+
+    def from_wall(self, t: float) -> float:
+        """Convert Unix time to a reading of this clock"""
+        return t - (time.time() - time.monotonic())
+
+
+class TickClock:
+    """Replay clock: the timestamp of the latest tick, in seconds"""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+
+    def now(self) -> float:
+        return self._now
+
+    def observe(self, timestamp: Optional[float]):
+        if timestamp:
+            self._now = timestamp / 1000
+
+    def to_wall(self, t: float) -> float:
+        return t
+
+    def from_wall(self, t: float) -> float:
+        return t
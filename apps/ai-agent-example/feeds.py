@@ -0,0 +1,135 @@
+"""
+Per-feed price state for agents trading several sessions over one socket
+Every feed (a subscribed userId) is a row in a few preallocated NumPy
+arrays: a price ring buffer, last trade time and a pro-mode portfolio
+summary. A tick costs one dict lookup and a handful of array writes, so the
+hot path creates no per-feed Python objects.
+
+Balances start at the backend's new-session defaults and are replaced by
+each feed's real portfolio once it has been fetched from /state, and on
+every trade response and periodic reconcile after that.
+"""
+
+from typing import Dict, List, Optional
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Starting portfolio the backend assigns on /session/start (see createUser)
+INITIAL_BALANCE_USD = 1000.0
+# Pro sizing in @tradeOS/trading-engine: buys use 25% of the USD balance
+PRO_BUY_FRACTION = 0.25
+
+
+class FeedBook:
+    """Ring buffers and trading state for many feeds, one row per feed"""
+
+    def __init__(self, feed_ids: List[str], capacity: int = 100):
+        if len(set(feed_ids)) != len(feed_ids):
+            raise ValueError("Duplicate feed ids")
+        self.ids = list(feed_ids)
+        self.index: Dict[str, int] = {feed_id: row for row, feed_id in enumerate(self.ids)}
+        self.capacity = capacity
+        n = len(self.ids)
+        # Each price is written twice (at head and head + capacity) so the
+        # latest `k` prices are always one contiguous slice
+        self._prices = np.zeros((n, 2 * capacity))
+        self._head = np.zeros(n, dtype=np.int64)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.last_price = np.full(n, np.nan)
+        self.last_trade_time = np.full(n, np.nan)  # NaN until the feed's first trade
+        self.trades = np.zeros(n, dtype=np.int64)
+        self.balance_usd = np.full(n, INITIAL_BALANCE_USD)
+        self.balance_token = np.zeros(n)
+        self.synced = np.zeros(n, dtype=bool)  # True once a backend portfolio was applied
+        self.reconciliations = 0
+        self.drift_corrections = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def push(self, row: int, price: float):
+        """Append a price to a feed's ring buffer"""
+        head = self._head[row]
+        self._prices[row, head] = price
+        self._prices[row, head + self.capacity] = price
+        self._head[row] = (head + 1) % self.capacity
+        if self.count[row] < self.capacity:
+            self.count[row] += 1
+        self.last_price[row] = price
+
+    def window(self, row: int, k: Optional[int] = None):
+        """Latest `k` prices of a feed, oldest first (a view, not a copy)"""
+        k = min(self.count[row], k or self.capacity)
+        end = self._head[row] + self.capacity
+        return self._prices[row, end - k : end]
+
+    def momentum(self, row: int, lookback: int) -> float:
+        """Same as MomentumAgent.calculate_momentum over the feed's prices"""
+        recent = self.window(row, lookback)
+        if len(recent) < 2:
+            return 0.0
+        return float((recent[-1] - recent[0]) / recent[0] * 100)
+
+    def rsi(self, row: int, period: int) -> float:
+        """Same as MomentumAgent.calculate_rsi over the feed's prices"""
+        if self.count[row] < period + 1:
+            return 50.0
+
+        deltas = np.diff(self.window(row, period + 1))
+        avg_gain = np.mean(np.where(deltas > 0, deltas, 0))
+        avg_loss = np.mean(np.where(deltas < 0, -deltas, 0))
+        if avg_loss == 0:
+            return 100.0
+        return float(100 - (100 / (1 + avg_gain / avg_loss)))
+
+    def can_buy(self, row: int) -> bool:
+        return self.balance_usd[row] * PRO_BUY_FRACTION > 0
+
+    def can_sell(self, row: int) -> bool:
+        return self.balance_token[row] > 0
+
+    def apply_trade(self, row: int, portfolio: Optional[Dict], now: float):
+        """Record an executed trade and the backend portfolio it returned"""
+        self.last_trade_time[row] = now
+        self.trades[row] += 1
+        if portfolio:
+            self._apply(row, portfolio)
+
+    def reconcile(self, row: int, portfolio: Optional[Dict]) -> bool:
+        """Apply a feed's authoritative portfolio; True if a synced feed had drifted"""
+        if not portfolio:
+            return False
+
+        before = (self.balance_usd[row], self.balance_token[row])
+        was_synced = bool(self.synced[row])
+        self._apply(row, portfolio)
+        self.reconciliations += 1
+
+        # The first sync replaces assumed defaults; that isn't drift
+        drifted = was_synced and not np.allclose(
+            before, (self.balance_usd[row], self.balance_token[row]), rtol=1e-9, atol=1e-9
+        )
+        if drifted:
+            self.drift_corrections += 1
+        return drifted
+
+    def _apply(self, row: int, portfolio: Dict):
+        self.balance_usd[row] = float(portfolio.get("balanceUSD", self.balance_usd[row]))
+        self.balance_token[row] = float(portfolio.get("balanceToken", self.balance_token[row]))
+        self.synced[row] = True
+
+    def get_stats(self) -> List[Dict]:
+        return [
+            {
+                "feed": feed_id,
+                "prices": int(self.count[row]),
+                "last_price": None if np.isnan(self.last_price[row]) else float(self.last_price[row]),
+                "trades": int(self.trades[row]),
+                "balance_usd": float(self.balance_usd[row]),
+                "balance_token": float(self.balance_token[row]),
+                "synced": bool(self.synced[row]),
+            }
+            for row, feed_id in enumerate(self.ids)
+        ]
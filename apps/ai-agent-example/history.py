@@ -0,0 +1,170 @@
+"""
+Bounded, tiered price/equity history for charts
+Every tick lands in a full-resolution tier. When a tier fills, its older
+half is merged `factor` points to one bucket and pushed into the next,
+coarser tier; the last tier halves its own older part instead. Buckets
+keep the close, min and max of price and equity plus buy/sell counts, so
+spikes and trades survive downsampling. Memory is fixed at startup however
+long the session runs.
+
+Every tick gets a sequence number and a bucket keeps its newest tick's,
+so `seq` increases strictly through the stored rows even where ticks share
+a timestamp. Pages are cursored on it rather than on time.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Row layout shared by every tier (a raw tick is a bucket of one)
+START, TIME, SEQ, PRICE, PRICE_MIN, PRICE_MAX, EQUITY, EQUITY_MIN, EQUITY_MAX, BUYS, SELLS, TICKS = range(12)
+FIELDS = [
+    "start", "time", "seq", "price", "price_min", "price_max",
+    "equity", "equity_min", "equity_max", "buys", "sells", "ticks",
+]
+# Returned as integers
+INT_FIELDS = {"seq", "buys", "sells", "ticks"}
+
+# Largest page /history returns
+MAX_PAGE = 5000
+
+
+def _merge(rows, starts):
+    """Collapse `rows` into one bucket per group beginning at each index in `starts`"""
+    ends = np.append(starts[1:], len(rows)) - 1
+    out = np.empty((len(starts), len(FIELDS)))
+    out[:, START] = rows[starts, START]
+    out[:, TIME] = rows[ends, TIME]
+    out[:, SEQ] = rows[ends, SEQ]
+    out[:, PRICE] = rows[ends, PRICE]
+    out[:, EQUITY] = rows[ends, EQUITY]
+    out[:, PRICE_MIN] = np.minimum.reduceat(rows[:, PRICE_MIN], starts)
+    out[:, EQUITY_MIN] = np.minimum.reduceat(rows[:, EQUITY_MIN], starts)
+    out[:, PRICE_MAX] = np.maximum.reduceat(rows[:, PRICE_MAX], starts)
+    out[:, EQUITY_MAX] = np.maximum.reduceat(rows[:, EQUITY_MAX], starts)
+    out[:, BUYS:] = np.add.reduceat(rows[:, BUYS:], starts, axis=0)
+    return out
+
+
+class HistoryStore:
+    """Price/equity time series in `tiers` fixed-size tiers, newest at full resolution"""
+
+    def __init__(self, points: int = 1000, tiers: int = 4, factor: int = 10, trades: int = 1000):
+        if points < 4 or tiers < 1 or factor < 2:
+            raise ValueError("History needs points >= 4, tiers >= 1 and factor >= 2")
+        self.points = points
+        self.factor = factor
+        self._tiers = [np.zeros((points, len(FIELDS))) for _ in range(tiers)]
+        self._lengths = [0] * tiers
+        # (seq, time, type, price, equity) of recent executed trades
+        self.trades: deque = deque(maxlen=trades)
+        self.total_ticks = 0
+        self.total_trades = 0
+
+    def record(self, t: float, price: float, equity: float, trade_type: Optional[str] = None):
+        """Append one tick (and the trade it triggered, if any)"""
+        if self._lengths[0] == self.points:
+            self._compact(0)
+        n = self._lengths[0]
+        self.total_ticks += 1
+        seq = self.total_ticks
+        buy, sell = trade_type == "buy", trade_type == "sell"
+        self._tiers[0][n] = (t, t, seq, price, price, price, equity, equity, equity, buy, sell, 1)
+        self._lengths[0] = n + 1
+        if trade_type:
+            self.trades.append((seq, t, trade_type, price, equity))
+            self.total_trades += 1
+
+    def _compact(self, k: int):
+        """Free the older half of tier `k` by merging it into coarser buckets"""
+        tier, n = self._tiers[k], self._lengths[k]
+        half = n // 2
+        last = k == len(self._tiers) - 1
+        merged = _merge(tier[:half], np.arange(0, half, 2 if last else self.factor))
+
+        if last:
+            # Nowhere coarser to go: halve the resolution of the older part in place
+            keep = n - half
+            tier[len(merged) : len(merged) + keep] = tier[half:n]
+            tier[: len(merged)] = merged
+            self._lengths[k] = len(merged) + keep
+            return
+
+        tier[: n - half] = tier[half:n]
+        self._lengths[k] = n - half
+        if self._lengths[k + 1] + len(merged) > self.points:
+            self._compact(k + 1)
+        m = self._lengths[k + 1]
+        self._tiers[k + 1][m : m + len(merged)] = merged
+        self._lengths[k + 1] = m + len(merged)
+
+    def rows(self):
+        """Every stored bucket, oldest first"""
+        return np.concatenate(
+            [self._tiers[k][: self._lengths[k]] for k in reversed(range(len(self._tiers)))]
+        )
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        max_points: Optional[int] = None,
+        limit: int = MAX_PAGE,
+        after: Optional[int] = None,
+    ) -> Dict:
+        """Buckets with since < time <= until and seq > after, columnar
+
+        With `max_points` the range is re-bucketed into at most that many
+        equal-width time buckets. Results longer than `limit` are paged:
+        repeat the query with the returned `next_after` as `after`. A bucket
+        merged across a page boundary in between comes back once more in
+        full; no point is ever skipped.
+        """
+        rows = self.rows()
+        if since is not None:
+            rows = rows[rows[:, TIME] > since]
+        if until is not None:
+            rows = rows[rows[:, TIME] <= until]
+        if after is not None:
+            rows = rows[rows[:, SEQ] > after]
+
+        if max_points and len(rows) > max_points:
+            lo, hi = rows[0, TIME], rows[-1, TIME]
+            width = (hi - lo) / max_points or 1.0
+            bucket = np.minimum(((rows[:, TIME] - lo) / width).astype(np.int64), max_points - 1)
+            rows = _merge(rows, np.flatnonzero(np.diff(bucket, prepend=-1)))
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = int(rows[-1, SEQ])
+
+        points = {
+            field: (rows[:, col].astype(np.int64) if field in INT_FIELDS else rows[:, col]).tolist()
+            for col, field in enumerate(FIELDS)
+        }
+        trades: List[Dict] = []
+        if len(rows):
+            first, end, last_seq = rows[0, START], rows[-1, TIME], rows[-1, SEQ]
+            # Trades on earlier pages (seq <= after) aren't repeated
+            trades = [
+                {"time": t, "type": trade_type, "price": price, "equity": equity}
+                for seq, t, trade_type, price, equity in self.trades
+                if first <= t <= end and (after is None or seq > after) and seq <= last_seq
+            ]
+        return {"count": len(rows), "next_after": next_after, "points": points, "trades": trades}
+
+    def get_stats(self) -> Dict:
+        rows = self.rows()
+        return {
+            "ticks": self.total_ticks,
+            "trades": self.total_trades,
+            "points": len(rows),
+            "tiers": list(self._lengths),
+            "oldest": float(rows[0, START]) if len(rows) else None,
+            "memory_bytes": sum(tier.nbytes for tier in self._tiers),
+        }
+
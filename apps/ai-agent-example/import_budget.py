@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the Python clients
+Imports each entry point in a fresh interpreter (fast-start mode) and fails
+if it takes longer than its budget or eagerly loads a deferred dependency.
+Each import is timed best-of-N to keep scheduler noise out of the verdict.
+
+The server budget only covers our own modules: FastAPI (and the pydantic
+v1 shim it loads for any route with typed parameters) is imported before
+the clock starts, so a slow FastAPI release can't fail the check and our
+regressions can't hide behind FastAPI's ~300 ms.
+
+Run directly (python import_budget.py) or via pytest (tests/test_import_budget.py).
+"""
+
+import os
+import sys
+import json
+import subprocess
+from typing import Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEVICE_DIR = os.path.join(HERE, "..", "adafruit-device")
+
+# Heavy modules that must not be imported until first use
+DEFERRED = ["numpy", "requests", "websockets", "websocket", "uvicorn"]
+
+# Fresh interpreters per module; the fastest run is reported
+REPEAT = int(os.getenv("IMPORT_BUDGET_REPEAT", "5"))
+
+# What FastAPI costs before our code runs: the framework plus one typed route
+FASTAPI_BASELINE = """
+from fastapi import FastAPI, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+_app = FastAPI()
+@_app.get("/")
+async def _route(q: float = Query(None)): pass
+"""
+
+# (module, directory, budget in milliseconds, setup excluded from the timing)
+BUDGETS: List[Tuple[str, str, float, str]] = [
+    ("ai_agent", HERE, float(os.getenv("IMPORT_BUDGET_AGENT_MS", "50")), ""),
+    # Overhead on top of FASTAPI_BASELINE
+    ("server", HERE, float(os.getenv("IMPORT_BUDGET_SERVER_MS", "50")), FASTAPI_BASELINE),
+    ("adafruit_device", DEVICE_DIR, float(os.getenv("IMPORT_BUDGET_DEVICE_MS", "50")), ""),
+]
+
+PROBE = """
+import sys, time, json
+{setup}
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def measure_once(module: str, directory: str, setup: str = "") -> Dict:
+    """Import `module` in a fresh interpreter and report time and loaded deps"""
+    env = {**os.environ, "FAST_START": "1"}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, setup=setup, deferred=DEFERRED)],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(module: str, directory: str, setup: str = "", repeat: int = REPEAT) -> Dict:
+    """Fastest of `repeat` fresh imports (deferred deps are checked on every run)"""
+    best: Dict = {}
+    for _ in range(max(1, repeat)):
+        report = measure_once(module, directory, setup)
+        if "error" in report or report["loaded"]:
+            return report
+        if not best or report["ms"] < best["ms"]:
+            best = report
+    return best
+
+
+def main() -> int:
+    failed = False
+    for module, directory, budget, setup in BUDGETS:
+        report = measure(module, directory, setup)
+        if "error" in report:
+            print(f"❌ {module}: import failed: {report['error']}")
+            failed = True
+            continue
+
+        status = "✅"
+        if report["ms"] > budget:
+            status = "❌"
+            failed = True
+        if report["loaded"]:
+            status = "❌"
+            failed = True
+            print(f"   {module} eagerly imported: {', '.join(report['loaded'])}")
+        over = " over FastAPI" if setup else ""
+        print(f"{status} {module}: {report['ms']:.1f} ms{over} (budget {budget:.0f} ms)")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Deferred imports for fast startup
+Heavy or optional dependencies are checked for at import time (cheap) but
+only loaded on first use. Missing dependencies fail hard with a clear
+message instead of being installed at runtime.
+
+Vendored: apps/ai-agent-example and apps/adafruit-device ship identical
+copies so each app deploys on its own. Edit both; the check in
+apps/ai-agent-example/tests/test_vendored.py fails if they drift.
+"""
+
+import os
+import types
+import importlib
+import importlib.util
+from typing import Optional
+
+# FAST_START=0 imports every dependency eagerly at startup
+FAST_START = os.getenv("FAST_START", "1") != "0"
+
+INSTALL_HINT = "pip install -r requirements.txt"
+
+
+class MissingDependencyError(ImportError):
+    """A required third-party module is not installed"""
+
+
+def _missing(name: str, package: Optional[str]) -> MissingDependencyError:
+    return MissingDependencyError(
+        f"❌ Missing dependency '{name}'. "
+        f"Install it with: pip install {package or name} (or {INSTALL_HINT})"
+    )
+
+
+def require(name: str, package: Optional[str] = None):
+    """Fail fast if a top-level module is not installed, without importing it"""
+    if importlib.util.find_spec(name) is None:
+        raise _missing(name, package)
+
+
+def load(name: str, package: Optional[str] = None) -> types.ModuleType:
+    """Import a module now, with a clear error if it is missing"""
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        raise _missing(name, package) from e
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str, package: Optional[str] = None):
+        super().__init__(name)
+        self._lazy_package = package
+        self._lazy_module: Optional[types.ModuleType] = None
+
+    def _load(self) -> types.ModuleType:
+        if self._lazy_module is None:
+            self._lazy_module = load(self.__name__, self._lazy_package)
+        return self._lazy_module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._lazy_module is not None else "deferred"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, package: Optional[str] = None) -> types.ModuleType:
+    """Deferred import in fast-start mode, eager import otherwise"""
+    require(name, package)
+    if not FAST_START:
+        return load(name, package)
+    return LazyModule(name, package)
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Swarm load test for the tradeOS agent stack
+Runs N MomentumAgent clients in one asyncio process, each with its own
+session, WebSocket subscription and trades, against a local stand-in
+backend in a separate process. Reports aggregate tick rate, trade request
+rate, tick-to-trade latency percentiles, memory per agent and CPU.
+
+Usage: python loadtest.py --agents 1000 --duration 60
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import asyncio
+import logging
+import argparse
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Position sizing of the pro difficulty (@tradeOS/trading-engine)
+INITIAL_BALANCE_USD = 1000.0
+PRO_BUY_FRACTION = 0.25
+
+# Tick sends are spread over this many slices of each interval, like the
+# staggered per-session simulators on the real backend
+TICK_SLICES = 20
+
+
+# ---------------------------------------------------------------------------
+# Stand-in backend (runs in its own process)
+# ---------------------------------------------------------------------------
+
+
+class StandInBackend:
+    """Just enough of the tradeOS backend for agents to trade against"""
+
+    def __init__(self, difficulty: str, seed: int):
+        from pricegen import PriceGenerator
+
+        self._generator = PriceGenerator
+        self.difficulty = difficulty
+        self.seed = seed
+        self.users: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.ticks_sent = 0
+        self.trades = {"buy": 0, "sell": 0, "rejected": 0}
+
+    def start_session(self, user_id: str) -> Dict:
+        with self.lock:
+            feed = self._generator(
+                difficulty=self.difficulty,
+                seed=self.seed + len(self.users),
+                session_ticks=600,
+            )
+            self.users[user_id] = {
+                "id": user_id,
+                "feed": feed,
+                "prices": [],
+                "price": feed.initial_price,
+                "portfolio": {
+                    "balanceUSD": INITIAL_BALANCE_USD,
+                    "balanceToken": 0.0,
+                    "realizedPnl": 0.0,
+                    "totalTrades": 0,
+                },
+            }
+        return {"success": True, "userId": user_id, "difficulty": self.difficulty}
+
+    def next_price(self, user: Dict) -> float:
+        if not user["prices"]:
+            user["prices"] = user["feed"].generate(1024)["price"].tolist()[::-1]
+        user["price"] = user["prices"].pop()
+        return user["price"]
+
+    def trade(self, user_id: str, trade_type: str):
+        """Apply a buy or sell with the pro sizing rules; (status, body)"""
+        with self.lock:
+            user = self.users.get(user_id)
+            if user is None:
+                return 400, {"error": "Price simulator not started"}
+
+            portfolio, price = user["portfolio"], user["price"]
+            if trade_type == "buy":
+                size = portfolio["balanceUSD"] * PRO_BUY_FRACTION
+                if size <= 0:
+                    self.trades["rejected"] += 1
+                    return 400, {"success": False, "error": "Insufficient balance"}
+                tokens = size / price
+                cost = portfolio["balanceToken"] * (portfolio.get("entryPrice") or 0) + size
+                portfolio["balanceUSD"] -= size
+                portfolio["balanceToken"] += tokens
+                portfolio["entryPrice"] = cost / portfolio["balanceToken"]
+            else:
+                if portfolio["balanceToken"] <= 0:
+                    self.trades["rejected"] += 1
+                    return 400, {"success": False, "error": "No tokens to sell"}
+                tokens = portfolio["balanceToken"] * 0.3
+                entry = portfolio.get("entryPrice") or price
+                portfolio["balanceUSD"] += tokens * price
+                portfolio["balanceToken"] -= tokens
+                portfolio["realizedPnl"] += tokens * (price - entry)
+            portfolio["totalTrades"] += 1
+            self.trades[trade_type] += 1
+            return 200, {"success": True, "portfolio": dict(portfolio), "pointsEarned": 0}
+
+    def state(self, user_id: str):
+        with self.lock:
+            user = self.users.get(user_id)
+            if user is None:
+                return 404, {"error": "User not found"}
+            return 200, {"user": {"portfolio": dict(user["portfolio"])}, "currentPrice": user["price"]}
+
+    def make_handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: Dict):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                user_id = body.get("userId", "")
+                if self.path == "/session/start":
+                    self._reply(200, backend.start_session(user_id))
+                elif self.path in ("/trade/buy", "/trade/sell"):
+                    self._reply(*backend.trade(user_id, self.path.rsplit("/", 1)[1]))
+                else:
+                    self._reply(404, {"error": "Not found"})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path == "/tokens/balance":
+                    self._reply(200, {"hasTokens": True, "balance": "1000"})
+                elif url.path == "/state":
+                    self._reply(*backend.state(query.get("userId", "")))
+                else:
+                    self._reply(404, {"error": "Not found"})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    async def serve_ws(self, port: int, tick_interval: float, stop: asyncio.Event):
+        import websockets
+        import tickcodec
+
+        subscribers: List[tuple] = []
+
+        async def handler(websocket, *_):
+            try:
+                async for message in websocket:
+                    data = json.loads(message)
+                    if data.get("type") == "subscribe" and data.get("userId") in self.users:
+                        # Binary subscribers get tickcodec frames tagged with their feed number
+                        feed = data.get("feed") if data.get("encoding") == "binary" else None
+                        subscribers.append((self.users[data["userId"]], websocket, feed))
+            except websockets.ConnectionClosed:
+                pass
+            finally:
+                subscribers[:] = [s for s in subscribers if s[1] is not websocket]
+
+        async def broadcast():
+            slice_interval = tick_interval / TICK_SLICES
+            slice_index = 0
+            while not stop.is_set():
+                started = time.monotonic()
+                for user, websocket, feed in subscribers[slice_index::TICK_SLICES]:
+                    if feed is not None:
+                        message = tickcodec.encode(feed, self.next_price(user), time.time() * 1000)
+                    else:
+                        message = json.dumps(
+                            {
+                                "type": "price",
+                                "userId": user["id"],
+                                "data": {
+                                    "price": self.next_price(user),
+                                    "timestamp": time.time() * 1000,
+                                    "trend": "sideways",
+                                },
+                            }
+                        )
+                    try:
+                        await websocket.send(message)
+                        self.ticks_sent += 1
+                    except Exception:
+                        pass
+                slice_index = (slice_index + 1) % TICK_SLICES
+                await asyncio.sleep(max(0.0, slice_interval - (time.monotonic() - started)))
+
+        async with websockets.serve(handler, "127.0.0.1", port, max_queue=None):
+            await broadcast()
+
+
+def run_backend(http_port: int, ws_port: int, args: Dict, ready, stop, results):
+    """Entry point of the stand-in backend process"""
+    backend = StandInBackend(args["difficulty"], args["seed"])
+    server = ThreadingHTTPServer(("127.0.0.1", http_port), backend.make_handler())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    async def main():
+        stop_event = asyncio.Event()
+
+        def watch_stop():
+            stop.wait()
+            loop.call_soon_threadsafe(stop_event.set)
+
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=watch_stop, daemon=True).start()
+        ready.set()
+        await backend.serve_ws(ws_port, args["tick_interval"], stop_event)
+
+    asyncio.run(main())
+    server.shutdown()
+    times = os.times()
+    results.put(
+        {
+            "ticks_sent": backend.ticks_sent,
+            "trades": backend.trades,
+            "cpu_seconds": times.user + times.system,
+        }
+    )
+
+
+# ---------------------------------------------------------------------------
+# Agent swarm (this process)
+# ---------------------------------------------------------------------------
+
+
+class SwarmMetrics:
+    """Counters shared by every agent in the swarm"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ticks = 0
+        self.trade_requests = 0
+        self.trades_executed = 0
+        self.latencies_ms: List[float] = []
+
+
+def make_swarm_agent(MomentumAgent):
+    """MomentumAgent that reports ticks, trades and tick-to-trade latency"""
+
+    class SwarmAgent(MomentumAgent):
+        def __init__(self, wallet_address: str, metrics: SwarmMetrics, trade_interval: float):
+            super().__init__(wallet_address)
+            self.metrics = metrics
+            self.min_trade_interval = trade_interval
+            self._tick_ms: Optional[float] = None
+
+        async def evaluate_tick(self, price: float, timestamp: Optional[float] = None):
+            self.metrics.ticks += 1
+            self._tick_ms = timestamp
+            await super().evaluate_tick(price, timestamp)
+
+        async def execute_trade(self, trade_type: str) -> bool:
+            self.metrics.trade_requests += 1
+            executed = await super().execute_trade(trade_type)
+            if executed:
+                self.metrics.trades_executed += 1
+            if self._tick_ms:
+                self.metrics.latencies_ms.append(time.time() * 1000 - self._tick_ms)
+            return executed
+
+    return SwarmAgent
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        # Peak rather than current RSS, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * (len(ordered) - 1)))], 2)
+
+
+async def run_swarm(args, server, metrics: SwarmMetrics) -> Dict:
+    server.lag_monitor.start()
+    SwarmAgent = make_swarm_agent(server.MomentumAgent)
+
+    gc.collect()
+    baseline_rss = rss_bytes()
+
+    agents = []
+    tasks = []
+    started = time.perf_counter()
+    for i in range(args.agents):
+        agent = SwarmAgent(f"0xload{i:036x}", metrics, args.trade_interval)
+        if not await agent.start_session() or not await agent.check_token_balance():
+            print(f"❌ Agent {i} could not start a session")
+            continue
+        agents.append(agent)
+        tasks.append(asyncio.create_task(agent.connect_websocket(), name=f"agent-{i}"))
+
+    deadline = time.monotonic() + 30
+    while sum(a.is_connected for a in agents) < len(agents) and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    connected = sum(a.is_connected for a in agents)
+    print(
+        f"🚀 {connected}/{args.agents} agents connected in "
+        f"{time.perf_counter() - started:.1f}s, warming up {args.warmup:.0f}s..."
+    )
+
+    # Indicators need LOOKBACK_PERIOD ticks before any trade can happen
+    await asyncio.sleep(args.warmup)
+    gc.collect()
+    agent_rss = rss_bytes() - baseline_rss
+
+    metrics.reset()
+    cpu_before = os.times()
+    window_started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    elapsed = time.perf_counter() - window_started
+    cpu_after = os.times()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    server.lag_monitor.stop()
+
+    cpu_seconds = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    latencies = metrics.latencies_ms
+    return {
+        "agents": args.agents,
+        "connected": connected,
+        "duration_s": round(elapsed, 2),
+        "ticks_per_s": round(metrics.ticks / elapsed, 1),
+        "trade_requests_per_s": round(metrics.trade_requests / elapsed, 2),
+        "trades_executed": metrics.trades_executed,
+        "tick_to_trade_ms": {
+            "samples": len(latencies),
+            "p50": percentile(latencies, 0.5),
+            "p99": percentile(latencies, 0.99),
+            "p999": percentile(latencies, 0.999),
+        },
+        "memory_per_agent_kib": round(agent_rss / max(1, len(agents)) / 1024, 1),
+        "agent_cpu_percent": round(cpu_seconds / elapsed * 100, 1),
+        "event_loop": server.lag_monitor.get_stats(),
+        "breakers": server.breakers.get_stats(),
+        "rate_limiter": server.limiter.get_stats(),
+    }
+
+
+def print_report(report: Dict):
+    latency = report["tick_to_trade_ms"]
+    loop = report["event_loop"]
+    backend = report.get("backend", {})
+    print("=" * 50)
+    print(f"Agents:            {report['connected']}/{report['agents']} connected")
+    print(f"Ticks:             {report['ticks_per_s']:,.1f}/s")
+    print(f"Trade requests:    {report['trade_requests_per_s']:,.2f}/s ({report['trades_executed']} executed)")
+    print(
+        f"Tick-to-trade:     p50 {latency['p50']} ms, p99 {latency['p99']} ms, "
+        f"p999 {latency['p999']} ms ({latency['samples']} trades)"
+    )
+    print(f"Memory per agent:  {report['memory_per_agent_kib']:,.1f} KiB")
+    print(f"Agent CPU:         {report['agent_cpu_percent']}% of one core")
+    if "cpu_percent" in backend:
+        print(f"Stand-in CPU:      {backend['cpu_percent']}% of one core")
+    print(f"Event loop lag:    p99 {loop['p99_ms']} ms, max {loop['max_ms']} ms, {loop['stalls']} stalls")
+    print("=" * 50)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="tradeOS agent swarm load test")
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30, help="measurement window (s)")
+    parser.add_argument("--warmup", type=float, default=15, help="seconds before measuring")
+    parser.add_argument("--tick-interval", type=float, default=1.0, help="seconds between ticks per agent")
+    parser.add_argument("--trade-interval", type=float, default=5.0, help="min seconds between trades per agent")
+    parser.add_argument("--per-agent-rate", type=float, default=5.0, help="outbound requests/s per agent")
+    parser.add_argument("--difficulty", default="pro", choices=["noob", "degen", "pro"])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--http-port", type=int, default=3101)
+    parser.add_argument("--ws-port", type=int, default=3102)
+    parser.add_argument("--output", help="also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    backend = multiprocessing.Process(
+        target=run_backend,
+        args=(
+            args.http_port,
+            args.ws_port,
+            {"difficulty": args.difficulty, "seed": args.seed, "tick_interval": args.tick_interval},
+            ready,
+            stop,
+            results,
+        ),
+        name="stand-in-backend",
+    )
+    backend.start()
+    if not ready.wait(10):
+        print("❌ Stand-in backend did not start")
+        backend.terminate()
+        return 1
+
+    # The agent module reads its configuration at import time
+    os.environ.update(
+        {
+            "API_URL": f"http://127.0.0.1:{args.http_port}",
+            "WS_URL": f"ws://127.0.0.1:{args.ws_port}",
+            "AUDIT_DIR": "",
+            "SNAPSHOT_PATH": "",
+            # Memory per agent should measure the agent, not chart buffers
+            "HISTORY_POINTS": "0",
+            # One process-wide bucket stands in for one bucket per agent
+            "OUTBOUND_RATE": str(args.per_agent_rate * args.agents),
+            "OUTBOUND_BURST": str(2 * args.per_agent_rate * args.agents),
+        }
+    )
+    os.environ.setdefault("LOG_QUEUE", "1")
+    import server
+
+    logging.getLogger("server").setLevel(logging.WARNING)
+
+    metrics = SwarmMetrics()
+    backend_started = time.perf_counter()
+    try:
+        report = asyncio.run(run_swarm(args, server, metrics))
+    finally:
+        stop.set()
+
+    backend_stats = results.get(timeout=10)
+    backend.join(timeout=10)
+    backend_stats["cpu_percent"] = round(
+        backend_stats["cpu_seconds"] / (time.perf_counter() - backend_started) * 100, 1
+    )
+    report["backend"] = backend_stats
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
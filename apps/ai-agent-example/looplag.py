@@ -0,0 +1,139 @@
+"""
+Event-loop lag monitor and hot-path watchdog
+A sampler task measures how late the loop wakes it up; a watchdog thread
+captures the loop thread's stack whenever a callback blocks the loop for
+longer than STALL_THRESHOLD.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds between lag samples
+SAMPLE_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+# Block time (seconds) after which the loop's stack is captured
+STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", "0.25"))
+# Stall records kept for /stats
+MAX_STALLS = 20
+
+
+class LoopLagMonitor:
+    """Continuous scheduling-delay sampler with a stall watchdog"""
+
+    def __init__(
+        self,
+        interval: float = SAMPLE_INTERVAL,
+        threshold: float = STALL_THRESHOLD,
+        window: int = 1000,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: deque = deque(maxlen=window)
+        self.stalls: deque = deque(maxlen=MAX_STALLS)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start sampling on the running loop (call from inside the loop)"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._loop = asyncio.get_running_loop()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = self._loop.create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self):
+        """Stop sampling and the watchdog (from the loop, or after it has closed)"""
+        if self._task is None:
+            return
+        self._stopped.set()
+        if not self._task.done() and not self._loop.is_closed():
+            self._task.cancel()
+        if self._watchdog is not threading.current_thread():
+            self._watchdog.join()
+        self._task = self._watchdog = self._loop = None
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            self.samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    def _watch(self):
+        """Runs in a separate thread; the loop can't report its own stall"""
+        captured_for = 0.0
+        loop = self._loop
+        while not self._stopped.wait(self.threshold / 2):
+            # A loop that has gone away without stop() isn't stalled
+            if loop.is_closed():
+                return
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < self.threshold or captured_for == heartbeat:
+                continue
+
+            # One capture per stall: the heartbeat only moves once the loop recovers
+            captured_for = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            self.stall_count += 1
+            self.stalls.append(
+                {
+                    "detected_at": time.time(),
+                    "blocked_ms": round(blocked * 1000, 1),
+                    "stack": stack,
+                }
+            )
+            logger.warning(
+                "⏱️  Event loop blocked for %.0f ms, stack:\n%s", blocked * 1000, stack
+            )
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        samples: List[float] = sorted(self.samples)
+        if not samples:
+            return {"p50_ms": None, "p99_ms": None, "p999_ms": None}
+
+        def pick(q: float) -> float:
+            index = min(len(samples) - 1, int(q * (len(samples) - 1)))
+            return round(samples[index] * 1000, 2)
+
+        return {"p50_ms": pick(0.5), "p99_ms": pick(0.99), "p999_ms": pick(0.999)}
+
+    def get_stats(self) -> Dict:
+        last_stall = self.stalls[-1] if self.stalls else None
+        return {
+            **self.percentiles(),
+            "max_ms": round(self.max_lag * 1000, 2),
+            "samples": len(self.samples),
+            "stall_threshold_ms": self.threshold * 1000,
+            "stalls": self.stall_count,
+            "last_stall": last_stall,
+        }
+
+
+# Process-wide monitor for the agent server's event loop
+lag_monitor = LoopLagMonitor()
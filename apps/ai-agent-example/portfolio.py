@@ -0,0 +1,145 @@
+"""
+Local portfolio mirror for tradeOS agents
+Tracks the agent's own position so trade decisions can be pre-filtered
+without extra REST calls. Mirrors the `Portfolio` shape from @tradeOS/types
+and the sizing rules in @tradeOS/trading-engine.
+"""
+
+import threading
+from typing import Dict, Optional
+
+# Starting portfolio the backend assigns on /session/start (see createUser)
+INITIAL_BALANCE_USD = 1000.0
+
+
+class PortfolioMirror:
+    """Client-side copy of the backend portfolio"""
+
+    def __init__(self, difficulty: str = "pro"):
+        self.difficulty = difficulty
+        self._lock = threading.Lock()
+        self.balance_usd = INITIAL_BALANCE_USD
+        self.balance_token = 0.0
+        self.realized_pnl = 0.0
+        self.entry_price: Optional[float] = None
+        self.total_trades = 0
+        self.synced = False  # True once a backend portfolio has been applied
+        self.reconciliations = 0
+        self.drift_corrections = 0
+        self.trades_blocked = 0
+
+    def reset(self, difficulty: Optional[str] = None):
+        """Reset to the portfolio the backend creates for a new session"""
+        with self._lock:
+            if difficulty:
+                self.difficulty = difficulty
+            self.balance_usd = INITIAL_BALANCE_USD
+            self.balance_token = 0.0
+            self.realized_pnl = 0.0
+            self.entry_price = None
+            self.total_trades = 0
+            self.synced = True
+
+    def apply(self, portfolio: Optional[Dict]) -> bool:
+        """Apply a backend `Portfolio` (e.g. from a TradeResponse body)"""
+        if not portfolio:
+            return False
+
+        with self._lock:
+            self.balance_usd = float(portfolio.get("balanceUSD", self.balance_usd))
+            self.balance_token = float(
+                portfolio.get("balanceToken", self.balance_token)
+            )
+            self.realized_pnl = float(portfolio.get("realizedPnl", self.realized_pnl))
+            entry_price = portfolio.get("entryPrice")
+            self.entry_price = float(entry_price) if entry_price is not None else None
+            self.total_trades = int(portfolio.get("totalTrades", self.total_trades))
+            self.synced = True
+        return True
+
+    def reconcile(self, portfolio: Optional[Dict]) -> bool:
+        """Reconcile against the authoritative backend portfolio.
+
+        Returns True if the local mirror had drifted and was corrected.
+        """
+        if not portfolio:
+            return False
+
+        before = self.to_dict()
+        self.apply(portfolio)
+        after = self.to_dict()
+        self.reconciliations += 1
+
+        drifted = any(
+            not _close(before[key], after[key])
+            for key in ("balanceUSD", "balanceToken", "realizedPnl", "entryPrice")
+        ) or before["totalTrades"] != after["totalTrades"]
+        if drifted:
+            self.drift_corrections += 1
+        return drifted
+
+    def position_size(self) -> float:
+        """USD size of the next buy (calculatePositionSize in trading-engine)"""
+        if self.difficulty == "noob":
+            return 50.0
+        if self.difficulty == "degen":
+            return self.balance_usd * 0.1
+        if self.difficulty == "pro":
+            return min(self.balance_usd * 0.25, self.balance_usd * 0.5)
+        return 50.0
+
+    def can_buy(self, current_price: float) -> bool:
+        """Local equivalent of validateTrade(..., "buy")"""
+        position_size = self.position_size()
+        if position_size <= 0 or self.balance_usd < position_size:
+            return False
+
+        # Safety hook for noob mode
+        if self.difficulty == "noob" and current_price > 0:
+            total_value = self.balance_usd + self.balance_token * current_price
+            new_position_value = (
+                self.balance_token + position_size / current_price
+            ) * current_price
+            if new_position_value > total_value * 0.8:
+                return False
+
+        return True
+
+    def can_sell(self) -> bool:
+        """Local equivalent of validateTrade(..., "sell")"""
+        return self.balance_token > 0
+
+    def allows(self, trade_type: str, current_price: float) -> bool:
+        """Pre-filter a trade decision; counts trades that would be rejected"""
+        if trade_type == "buy":
+            allowed = self.can_buy(current_price)
+        elif trade_type in ("sell", "panic"):
+            allowed = self.can_sell()
+        else:
+            allowed = True
+
+        if not allowed:
+            self.trades_blocked += 1
+        return allowed
+
+    def unrealized_pnl(self, current_price: float) -> float:
+        """Unrealized PnL at the given price (getUnrealizedPnl in trading-engine)"""
+        if not self.entry_price or self.balance_token <= 0:
+            return 0.0
+        return self.balance_token * (current_price - self.entry_price)
+
+    def to_dict(self) -> Dict:
+        """Portfolio in the backend's camelCase shape"""
+        return {
+            "balanceUSD": self.balance_usd,
+            "balanceToken": self.balance_token,
+            "realizedPnl": self.realized_pnl,
+            "entryPrice": self.entry_price,
+            "totalTrades": self.total_trades,
+        }
+
+
+def _close(a: Optional[float], b: Optional[float], tolerance: float = 1e-9) -> bool:
+    if a is None or b is None:
+        return a is b
+    return abs(a - b) <= tolerance * max(1.0, abs(a), abs(b))
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Vectorized synthetic price feed mirroring @tradeOS/price-simulator
+Produces `PriceTick`-shaped NumPy arrays with the same difficulty modes,
+pattern trigger rates, durations and trend classification as the
+TypeScript PriceSimulator, for backtests, replay tools and load tests.
+
+Pattern triggers are drawn as geometric gaps instead of per-tick coin
+flips and each pattern becomes a list of [start, end) windows, so the
+per-tick work is one uniform draw plus a handful of array scans. Prices
+are a running product of 1 + r written straight into the output; sessions
+that touch the 0.01 price floor are recomputed exactly with a
+running-minimum scan in log space.
+
+Differences from the TypeScript simulator:
+- A whale spike is a fraction of the current price on each of its ticks
+  rather than of the price when it triggered.
+- Like PriceSimulator, parabolic runs compound without bound; use
+  `session_ticks` to restart at the initial price the way each
+  /session/start does.
+"""
+
+import sys
+import time
+import argparse
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+TRENDS = ("up", "down", "sideways", "whale", "rug")
+UP, DOWN, SIDEWAYS, WHALE, RUG = range(len(TRENDS))
+
+TICK_DTYPE = np.dtype([("price", "<f8"), ("timestamp", "<i8"), ("trend", "u1")])
+
+DIFFICULTY_MULTIPLIER = {"noob": 0.5, "degen": 1.0, "pro": 1.5}
+
+ALL_PATTERNS = {
+    "pump": True,
+    "dump": True,
+    "rug": True,
+    "chop": True,
+    "whale": True,
+    "parabolic": True,
+    "slowGrind": True,
+}
+
+# Per-tick trigger probabilities (PriceSimulator.updatePatterns)
+TRIGGER_PROBABILITY = {
+    "pump": 0.02,
+    "dump": 0.02,
+    "rug": 0.005,
+    "whale": 0.01,
+    "parabolic": 0.01,
+    "slowGrind": 0.05,
+    "slowGrindStop": 0.1,
+    "chop": 0.03,
+}
+
+# Parabolic return by window age: 0.05, growing 10% per tick (runs last < 70 ticks)
+PARABOLIC_GROWTH = 0.05 * np.power(1.1, np.arange(70))
+
+# |percent change| below this is sideways. Without the floor the percent
+# change is r / (1 + r), which crosses +-0.5% at these returns
+SIDEWAYS_CHANGE = 0.005
+SIDEWAYS_RETURN = (-SIDEWAYS_CHANGE / (1 + SIDEWAYS_CHANGE), SIDEWAYS_CHANGE / (1 - SIDEWAYS_CHANGE))
+
+PRICE_FLOOR = 0.01
+CHUNK_TICKS = 1 << 16
+OPEN = np.iinfo(np.int64).max // 2  # end of a window that has not stopped yet
+
+
+def _expand(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Chunk indices covered by non-overlapping [start, end) windows"""
+    starts = np.maximum(starts, 0)
+    lengths = ends - starts
+    return np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+
+
+def _mask(starts: np.ndarray, ends: np.ndarray, n: int) -> np.ndarray:
+    """Boolean mask of sorted, non-overlapping [start, end) windows"""
+    edges = np.empty(2 * len(starts) + 2, dtype=np.int64)
+    edges[0] = 0
+    edges[1:-1:2] = np.maximum(starts, 0)
+    edges[2:-1:2] = ends
+    edges[-1] = n
+    inside = np.zeros(len(edges) - 1, dtype=np.bool_)
+    inside[1::2] = True
+    return np.repeat(inside, np.diff(edges))
+
+
+def _classify(change: np.ndarray, low: float, high: float, out: np.ndarray):
+    """DOWN at or below `low`, UP at or above `high`, SIDEWAYS in between"""
+    # (1 + (change > low)) * (change < high) is DOWN = 1, SIDEWAYS = 2, UP = 0
+    above = np.greater(change, low).view(np.uint8)
+    above += 1
+    np.multiply(above, np.less(change, high), out=out)
+
+
+class PriceGenerator:
+    """Seedable, chunked NumPy equivalent of PriceSimulator"""
+
+    def __init__(
+        self,
+        difficulty: str = "noob",
+        initial_price: float = 1.0,
+        volatility: float = 0.02,
+        tick_interval: int = 1000,
+        patterns: Optional[Dict[str, bool]] = None,
+        seed: Optional[int] = None,
+        start_timestamp: Optional[int] = None,
+        session_ticks: Optional[int] = None,
+    ):
+        if difficulty not in DIFFICULTY_MULTIPLIER:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+
+        self.difficulty = difficulty
+        self.initial_price = initial_price
+        self.volatility = volatility * DIFFICULTY_MULTIPLIER[difficulty]
+        self.tick_interval = tick_interval
+        self.patterns = {**ALL_PATTERNS, **(patterns or {})}
+        self.session_ticks = session_ticks
+        self.rng = np.random.default_rng(seed)
+        self.timestamp = (
+            start_timestamp if start_timestamp is not None else int(time.time() * 1000)
+        )
+        self.ticks_generated = 0
+        self.sessions = 0
+        self._rows = 1
+        self._work: Optional[Tuple[np.ndarray, ...]] = None
+        self._new_session()
+
+    def _new_session(self):
+        self.price = self.initial_price
+        self._session_tick = 0
+        self.sessions += 1
+        # Chunk-relative offset of each pattern's next trigger
+        self._next_trigger = {
+            name: int(self.rng.geometric(p)) - 1 for name, p in TRIGGER_PROBABILITY.items()
+        }
+        # Most recent window of each pattern: (start, end, param), chunk-relative
+        self._carry: Dict[str, Tuple[int, int, float]] = {
+            name: (-OPEN, -OPEN, 0.0) for name in TRIGGER_PROBABILITY
+        }
+
+    def _triggers(self, name: str, n: int) -> np.ndarray:
+        """Chunk-local tick indices where `name` fires, continuing the stream"""
+        p = TRIGGER_PROBABILITY[name]
+        first = self._next_trigger[name]
+        if first >= n:
+            self._next_trigger[name] = first - n
+            return np.empty(0, dtype=np.int64)
+
+        batches = [np.array([first], dtype=np.int64)]
+        last = first
+        while True:
+            gaps = self.rng.geometric(p, int((n - last) * p * 1.25) + 16)
+            positions = last + np.cumsum(gaps)
+            inside = positions[positions < n]
+            batches.append(inside)
+            if len(inside) < len(positions):
+                self._next_trigger[name] = int(positions[len(inside)]) - n
+                return np.concatenate(batches)
+            last = int(positions[-1])
+
+    def _windows(
+        self,
+        name: str,
+        n: int,
+        duration: Tuple[float, float],
+        param: Tuple[float, float] = (0.0, 0.0),
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """[start, end) windows of a fixed-duration pattern plus their params"""
+        triggers = self._triggers(name, n)
+        rng = self.rng
+        durations = duration[0] + rng.random(len(triggers)) * (duration[1] - duration[0])
+        params = param[0] + rng.random(len(triggers)) * (param[1] - param[0])
+
+        carry_start, carry_end, carry_param = self._carry[name]
+        starts = np.concatenate(([carry_start], triggers))
+        # Duration is decremented on the trigger tick, so d ticks last ceil(d - 1)
+        ends = np.concatenate(([carry_end], triggers + np.ceil(durations - 1).astype(np.int64)))
+        params = np.concatenate(([carry_param], params))
+        return self._close(name, n, starts, ends, params)
+
+    def _slow_grind_windows(self, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Slow grinds run until a 10% per-tick stop check fires"""
+        triggers = self._triggers("slowGrind", n)
+        stops = self._triggers("slowGrindStop", n)
+        directions = np.where(self.rng.random(len(triggers)) > 0.5, 1.0, -1.0)
+
+        carry_start, carry_end, carry_param = self._carry["slowGrind"]
+        starts = np.concatenate(([carry_start], triggers))
+        # The stop check runs after the trigger on the same tick
+        first_stop = np.searchsorted(stops, np.maximum(starts, 0))
+        ends = np.append(stops, OPEN)[first_stop]
+        ends[0] = min(ends[0], carry_end)
+        params = np.concatenate(([carry_param], directions))
+        return self._close("slowGrind", n, starts, ends, params)
+
+    def _close(
+        self, name: str, n: int, starts: np.ndarray, ends: np.ndarray, params: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cut windows at the next trigger, carry the last one, clip to the chunk"""
+        ends[:-1] = np.minimum(ends[:-1], starts[1:])
+        last_end = int(ends[-1])
+        self._carry[name] = (
+            int(starts[-1]) - n,
+            last_end if last_end >= OPEN else last_end - n,
+            float(params[-1]),
+        )
+
+        clipped_starts = np.maximum(starts, 0)
+        clipped_ends = np.minimum(ends, n)
+        if self._rows > 1:
+            # Several whole sessions in one chunk: nothing outlives its session
+            row = n // self._rows
+            clipped_ends = np.minimum(clipped_ends, (clipped_starts // row + 1) * row)
+        keep = clipped_ends > clipped_starts
+        return starts[keep], clipped_ends[keep], params[keep]
+
+    def _chunk(self, out: np.ndarray, rows: int = 1):
+        """Fill `out`; rows > 1 means it covers that many fresh sessions"""
+        n = len(out)
+        self._rows = rows
+        noise, shift, returns, prices, steps = self._scratch(n)
+        self.rng.random(out=noise)
+        noise -= 0.5
+
+        # Constant-per-window return terms as a difference array
+        shift.fill(0.0)
+
+        def add(windows, scale):
+            starts, ends, params = windows
+            starts = np.maximum(starts, 0)
+            # Windows of one pattern never overlap, so indices are unique
+            values = params * scale
+            shift[starts] += values
+            shift[ends] -= values
+            return windows
+
+        enabled = self.patterns
+        whale = rug = chop = None
+        if enabled["pump"]:
+            add(self._windows("pump", n, (20, 50), (0.5, 1.0)), 0.1)
+        if enabled["dump"]:
+            add(self._windows("dump", n, (20, 50), (0.5, 1.0)), -0.1)
+        if enabled["rug"]:
+            rug = add(self._windows("rug", n, (5, 5), (0.5, 0.5)), -1.0)
+        if enabled["whale"]:
+            whale = add(self._windows("whale", n, (3, 3), (0.1, 0.3)), 1.0)
+        if enabled["slowGrind"]:
+            add(self._slow_grind_windows(n), 0.01)
+        if enabled["chop"]:
+            chop = self._windows("chop", n, (15, 35))
+
+        np.multiply(noise, 2 * self.volatility, out=returns)
+        returns += np.cumsum(shift[:n], out=shift[:n])
+
+        if enabled["parabolic"]:
+            starts, ends, _ = self._windows("parabolic", n, (30, 70))
+            ticks = _expand(starts, ends)
+            ages = ticks - np.repeat(starts, ends - np.maximum(starts, 0))
+            returns[ticks] += PARABOLIC_GROWTH[ages]
+
+        if chop is not None:
+            # Chop replaces the move with sideways noise; reuse the tick's draw
+            np.multiply(noise, 0.02, out=returns, where=_mask(*chop[:2], n))
+
+        # Running product of 1 + r, seeded with each row's opening price
+        opening = np.full(rows, self.initial_price)
+        opening[0] = self.price
+        np.add(returns, 1.0, out=prices)
+        rows_view = prices.reshape(rows, -1)
+        rows_view[:, 0] *= opening
+        np.cumprod(rows_view, axis=1, out=rows_view)
+
+        # PriceSimulator.determineTrend: rug > whale > sideways (< 0.5%) > up/down
+        # Without the floor the percent change is r / (1 + r)
+        _classify(returns, *SIDEWAYS_RETURN, out=out["trend"])
+        floored = np.flatnonzero(rows_view.min(axis=1) < PRICE_FLOOR)
+        if len(floored):
+            # Rows that touch the floor take the exact path
+            floored_returns = returns.reshape(rows, -1)[floored]
+            floored_prices = self._apply_floor(floored_returns, opening[floored])
+            rows_view[floored] = floored_prices
+            previous = np.empty_like(floored_prices)
+            previous[:, 0] = opening[floored]
+            previous[:, 1:] = floored_prices[:, :-1]
+            change = floored_returns * previous / floored_prices
+            trend = np.empty(change.shape, dtype=np.uint8)
+            _classify(change, -SIDEWAYS_CHANGE, SIDEWAYS_CHANGE, out=trend)
+            out["trend"].reshape(rows, -1)[floored] = trend
+        out["price"] = prices
+        if whale is not None:
+            out["trend"][_expand(*whale[:2])] = WHALE
+        if rug is not None:
+            out["trend"][_expand(*rug[:2])] = RUG
+
+        np.add(steps, self.timestamp, out=out["timestamp"])
+
+        self.price = float(prices[-1])
+        self.timestamp += self.tick_interval * n
+        self._session_tick += n // rows
+        self.sessions += rows - 1
+
+    def _scratch(self, n: int) -> Tuple[np.ndarray, ...]:
+        """Work arrays for an n-tick chunk, reused so chunks don't refault fresh pages"""
+        if self._work is None or len(self._work[0]) < n:
+            self._work = (
+                np.empty(n),
+                np.empty(n + 1),
+                np.empty(n),
+                np.empty(n),
+                np.arange(1, n + 1, dtype=np.int64) * self.tick_interval,
+            )
+        noise, shift, returns, prices, steps = self._work
+        return noise[:n], shift[: n + 1], returns[:n], prices[:n], steps[:n]
+
+    def _apply_floor(self, returns: np.ndarray, opening: np.ndarray) -> np.ndarray:
+        """price_t = max(floor, price_{t-1} * (1 + r_t)) per row, without a Python loop"""
+        log_floor = np.log(PRICE_FLOOR)
+        level = np.log(np.maximum(1.0 + returns, 1e-300))
+        np.cumsum(level, axis=1, out=level)
+        level += (np.log(opening) - log_floor)[:, None]
+        level -= np.minimum(np.minimum.accumulate(level, axis=1), 0.0)
+        level += log_floor
+        prices = np.exp(level, out=level)
+        return np.maximum(prices, PRICE_FLOOR, out=prices)
+
+    def generate(self, n: int) -> np.ndarray:
+        """Next `n` ticks as a structured array of (price, timestamp, trend)"""
+        ticks = np.empty(n, dtype=TICK_DTYPE)
+        done = 0
+        session = self.session_ticks
+        with np.errstate(over="ignore", invalid="ignore"):
+            while done < n:
+                remaining = n - done
+                rows = 1
+                if not session:
+                    size = min(remaining, CHUNK_TICKS)
+                else:
+                    if self._session_tick >= session:
+                        self._new_session()
+                    left = session - self._session_tick
+                    if self._session_tick or remaining <= left:
+                        size = min(remaining, left, CHUNK_TICKS)
+                    else:
+                        # Batch whole sessions into one 2-D chunk
+                        rows = min(remaining // session, max(1, CHUNK_TICKS // session))
+                        size = rows * session
+                self._chunk(ticks[done : done + size], rows)
+                done += size
+        self.ticks_generated += n
+        return ticks
+
+    def iter_ticks(self, n: Optional[int] = None, batch: int = 4096) -> Iterator[Dict]:
+        """`PriceTick` dicts, e.g. for WebSocket replay; endless if n is None"""
+        produced = 0
+        while n is None or produced < n:
+            size = batch if n is None else min(batch, n - produced)
+            for price, timestamp, trend in self.generate(size).tolist():
+                yield {"price": price, "timestamp": timestamp, "trend": TRENDS[trend]}
+            produced += size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Synthetic tradeOS price feed benchmark")
+    parser.add_argument("--ticks", type=int, default=10_000_000)
+    parser.add_argument("--difficulty", default="pro", choices=sorted(DIFFICULTY_MULTIPLIER))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--session-ticks", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs (best and median are reported)")
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(max(1, args.repeat)):
+        generator = PriceGenerator(
+            difficulty=args.difficulty, seed=args.seed, session_ticks=args.session_ticks or None
+        )
+        started = time.perf_counter()
+        ticks = generator.generate(args.ticks)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    best, median = timings[0], timings[len(timings) // 2]
+    counts = np.bincount(ticks["trend"], minlength=len(TRENDS))
+    print(
+        f"Generated {args.ticks:,} ticks: best {best:.2f}s ({args.ticks / best / 1e6:.1f}M ticks/s), "
+        f"median {median:.2f}s ({args.ticks / median / 1e6:.1f}M ticks/s), "
+        f"{generator.sessions:,} sessions"
+    )
+    print("Trends: " + ", ".join(f"{name}={count:,}" for name, count in zip(TRENDS, counts)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+On-demand statistical sampling profiler
+Samples every thread's stack plus the await chain of every suspended
+asyncio task from a background thread, and aggregates them into collapsed
+stacks (flamegraph.pl / speedscope format).
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Seconds between samples (100 Hz keeps overhead low)
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.01"))
+MAX_SECONDS = 60
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _thread_stack(frame) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _task_stack(task: asyncio.Task) -> List[str]:
+    """Follow a suspended task's await chain from outer to inner coroutine"""
+    stack = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return stack
+
+
+def sample(
+    seconds: float,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+    interval: float = SAMPLE_INTERVAL,
+) -> Counter:
+    """Sample stacks for `seconds`; must run outside the event loop thread"""
+    counts: Counter = Counter()
+    me = threading.get_ident()
+    deadline = time.monotonic() + min(seconds, MAX_SECONDS)
+
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = _thread_stack(frame)
+            counts[";".join([f"thread:{names.get(ident, ident)}"] + stack)] += 1
+
+        if loop is not None:
+            try:
+                tasks = list(asyncio.all_tasks(loop))
+            except RuntimeError:
+                # Task set changed while copying; skip tasks for this sample
+                tasks = []
+            for task in tasks:
+                stack = _task_stack(task)
+                if stack:
+                    counts[";".join([f"task:{task.get_name()}"] + stack)] += 1
+
+        time.sleep(interval)
+
+    return counts
+
+
+def collapse(counts: Counter) -> str:
+    """Render samples as collapsed stacks: `frame;frame;frame count`"""
+    return "\n".join(f"{stack} {n}" for stack, n in counts.most_common()) + "\n"
+
+
+def summarize(counts: Counter, seconds: float, interval: float = SAMPLE_INTERVAL) -> Dict:
+    return {
+        "seconds": seconds,
+        "interval": interval,
+        "samples": sum(counts.values()),
+        "stacks": [{"stack": stack, "count": n} for stack, n in counts.most_common()],
+    }
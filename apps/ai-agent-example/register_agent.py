@@ -1,12 +1,27 @@
 #!/usr/bin/env python3
 """
 Register an AI agent with the tradeOS backend
+
+Single agent (from environment variables):
+    python register_agent.py
+
+Bulk onboarding from a CSV or JSON manifest:
+    python register_agent.py --manifest agents.csv --start-session
 """
 
 import os
 import sys
+import csv
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
 
 API_URL = os.getenv("API_URL", "http://localhost:3001")
 AGENT_NAME = os.getenv("AGENT_NAME", "Example Trading Bot")
@@ -15,6 +30,21 @@ AGENT_WALLET = os.getenv("AGENT_WALLET", "")
 DESCRIPTION = os.getenv("DESCRIPTION", "An example AI trading agent")
 STRATEGY = os.getenv("STRATEGY", "momentum")
 
+# Bulk mode defaults
+BULK_CONCURRENCY = 32
+BULK_RETRIES = 3
+CACHE_PATH = ".register_cache.json"
+# Statuses worth retrying (backend busy, DB not connected yet, proxies)
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+ALREADY_REGISTERED = "already registered"
+
+# Manifest columns accepted in snake_case, mapped to the API's camelCase
+MANIFEST_KEYS = {
+    "owner_address": "ownerAddress",
+    "wallet_address": "walletAddress",
+    "agent_url": "agentUrl",
+}
+
 
 def register_agent(
     name: str,
@@ -48,7 +78,259 @@ def register_agent(
         sys.exit(1)
 
 
+def load_manifest(path: str) -> List[Dict]:
+    """Read agent entries from a CSV file or a JSON list / {"agents": [...]}"""
+    with open(path, newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            data = json.load(f)
+            rows = data.get("agents", []) if isinstance(data, dict) else data
+
+    entries = []
+    for row in rows:
+        entry = {
+            MANIFEST_KEYS.get(key.strip(), key.strip()): value.strip()
+            if isinstance(value, str)
+            else value
+            for key, value in row.items()
+            if key and value not in (None, "")
+        }
+        entry.setdefault("ownerAddress", OWNER_ADDRESS)
+        entry.setdefault("strategy", STRATEGY)
+        entries.append(entry)
+    return entries
+
+
+class RegistrationCache:
+    """Local idempotency cache of wallets that are already registered"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = 0
+        try:
+            with open(path) as f:
+                self._entries: Dict[str, Dict] = json.load(f)
+        except FileNotFoundError:
+            self._entries = {}
+
+    def has(self, wallet: str) -> bool:
+        return wallet.lower() in self._entries
+
+    def get(self, wallet: str) -> Optional[Dict]:
+        return self._entries.get(wallet.lower())
+
+    def add(self, wallet: str, info: Dict):
+        with self._lock:
+            self._entries[wallet.lower()] = info
+            self._dirty += 1
+            if self._dirty >= 50:
+                self._save_locked()
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        # Write-then-rename so an interrupted run never corrupts the cache
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._dirty = 0
+
+
+def make_session(concurrency: int) -> requests.Session:
+    """HTTP session with a connection pool sized for the worker count"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def post_with_retry(
+    session: requests.Session,
+    url: str,
+    payload: Dict,
+    retries: int = BULK_RETRIES,
+    timeout: float = 10,
+) -> Tuple[int, Dict, int]:
+    """POST with exponential backoff on transient failures.
+
+    Returns (status code, JSON body, attempts); status 0 means no response.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            response = session.post(url, json=payload, timeout=timeout)
+            try:
+                body = response.json()
+            except ValueError:
+                body = {"error": response.text}
+            if response.status_code not in TRANSIENT_STATUS or attempt > retries:
+                return response.status_code, body, attempt
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt > retries:
+                return 0, {"error": str(e)}, attempt
+
+        # Jittered exponential backoff: ~0.25 s, 0.5 s, 1 s, ...
+        time.sleep(0.25 * 2 ** (attempt - 1) * (0.5 + random.random()))
+
+
+def onboard_agent(
+    session: requests.Session,
+    entry: Dict,
+    cache: RegistrationCache,
+    start_session: bool = False,
+    difficulty: str = "pro",
+    retries: int = BULK_RETRIES,
+) -> Dict:
+    """Register one agent (unless cached) and optionally start its session"""
+    wallet = entry.get("walletAddress", "")
+    result = {"walletAddress": wallet, "name": entry.get("name")}
+
+    missing = [k for k in ("name", "ownerAddress", "walletAddress") if not entry.get(k)]
+    if missing:
+        result.update(status="failed", error=f"Missing fields: {', '.join(missing)}")
+        return result
+
+    cached = cache.get(wallet)
+    if cached:
+        result.update(status="skipped", agentId=cached.get("agentId"))
+    else:
+        status, body, attempts = post_with_retry(
+            session, f"{API_URL}/ai-agent/register", entry, retries=retries
+        )
+        result["attempts"] = attempts
+        if status == 200 and body.get("success"):
+            agent_id = body.get("agent", {}).get("agentId")
+            cache.add(wallet, {"agentId": agent_id, "registeredAt": time.time()})
+            result.update(status="registered", agentId=agent_id)
+        elif status == 400 and ALREADY_REGISTERED in str(body.get("error", "")):
+            cache.add(wallet, {"agentId": None, "registeredAt": time.time()})
+            result.update(status="already_registered")
+        else:
+            result.update(status="failed", httpStatus=status, error=body.get("error"))
+            return result
+
+    if start_session:
+        status, body, _ = post_with_retry(
+            session,
+            f"{API_URL}/session/start",
+            {"userId": wallet, "difficulty": difficulty, "ownerAddress": wallet},
+            retries=retries,
+            timeout=30,
+        )
+        if status == 200 and body.get("success"):
+            result.update(session="started", smartAccountAddress=body.get("smartAccountAddress"))
+        else:
+            result.update(session="failed", sessionError=body.get("error"))
+
+    return result
+
+
+def bulk_register(
+    entries: List[Dict],
+    cache: RegistrationCache,
+    concurrency: int = BULK_CONCURRENCY,
+    start_session: bool = False,
+    difficulty: str = "pro",
+    retries: int = BULK_RETRIES,
+) -> List[Dict]:
+    """Onboard many agents concurrently over one pooled HTTP session"""
+    session = make_session(concurrency)
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(
+                    onboard_agent, session, entry, cache, start_session, difficulty, retries
+                )
+                for entry in entries
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                icon = "❌" if result["status"] == "failed" else "✅"
+                print(f"{icon} [{done}/{len(entries)}] {result['walletAddress']}: {result['status']}")
+    finally:
+        cache.save()
+        session.close()
+    return results
+
+
+def write_results(path: str, results: List[Dict]):
+    """Write per-wallet results as CSV or JSON (by file extension)"""
+    if path.lower().endswith(".csv"):
+        fields = sorted({key for result in results for key in result})
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def run_bulk(args: argparse.Namespace):
+    """Bulk onboarding entry point"""
+    entries = load_manifest(args.manifest)
+    cache = RegistrationCache(args.cache)
+
+    print("=" * 50)
+    print("tradeOS AI Agent Bulk Registration")
+    print("=" * 50)
+    print(f"Manifest: {args.manifest} ({len(entries)} agents)")
+    print(f"Concurrency: {args.concurrency}")
+    print(f"Start sessions: {'yes' if args.start_session else 'no'}")
+    print(f"API URL: {API_URL}")
+    print("=" * 50)
+
+    started = time.perf_counter()
+    results = bulk_register(
+        entries,
+        cache,
+        concurrency=args.concurrency,
+        start_session=args.start_session,
+        difficulty=args.difficulty,
+        retries=args.retries,
+    )
+    elapsed = time.perf_counter() - started
+    write_results(args.output, results)
+
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print("=" * 50)
+    print(f"Done in {elapsed:.1f}s: {summary}")
+    print(f"Results written to {args.output}")
+
+    if counts.get("failed"):
+        sys.exit(1)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Register tradeOS AI agents")
+    parser.add_argument("--manifest", help="CSV or JSON manifest for bulk registration")
+    parser.add_argument("--concurrency", type=int, default=BULK_CONCURRENCY)
+    parser.add_argument("--retries", type=int, default=BULK_RETRIES)
+    parser.add_argument("--cache", default=CACHE_PATH, help="Idempotency cache file")
+    parser.add_argument("--output", default="register_results.json", help="Per-wallet results (.json or .csv)")
+    parser.add_argument("--start-session", action="store_true", help="Chain /session/start for each wallet")
+    parser.add_argument("--difficulty", default="pro", choices=["noob", "degen", "pro"])
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.manifest:
+        run_bulk(args)
+        sys.exit(0)
+
     print("=" * 50)
     print("tradeOS AI Agent Registration")
     print("=" * 50)
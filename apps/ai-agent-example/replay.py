@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Replay ticks through MomentumAgent at CPU speed
+Feeds recorded ticks (an audit log) or synthetic ones (pricegen.py) through
+the agent's own evaluate_tick with a TickClock, so min_trade_interval is
+measured in tick time rather than wall time. Trades are filled locally with
+the pro sizing rules instead of calling the backend.
+
+Usage:
+    python replay.py --audit-dir audit/
+    python replay.py --ticks 1000000 --difficulty pro --seed 1
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from array import array
+from typing import Dict, Optional
+
+# The agent module reads its configuration at import time
+os.environ["AUDIT_DIR"] = ""
+os.environ["SNAPSHOT_PATH"] = ""
+os.environ.setdefault("LOG_QUEUE", "1")
+
+import server  # noqa: E402
+from clock import TickClock  # noqa: E402
+from audit import BUY, HOLD, SELL  # noqa: E402
+
+# Sells close this fraction of the token balance (stand-in backend rules)
+SELL_FRACTION = 0.3
+
+
+class ReplayAgent(server.MomentumAgent):
+    """MomentumAgent on a tick clock with local fills"""
+
+    def __init__(self):
+        super().__init__("0xreplay", clock=TickClock())
+        self.has_tokens = self.session_started = True
+        self.portfolio.reset("pro")
+        self.price = 0.0
+        self.decision = HOLD
+
+    async def evaluate_tick(self, price: float, timestamp: Optional[float] = None):
+        self.price = price
+        self.decision = HOLD
+        await super().evaluate_tick(price, timestamp)
+
+    async def execute_trade(self, trade_type: str, feed: Optional[int] = None) -> bool:
+        """Fill at the current tick's price instead of calling the backend"""
+        self.decision = BUY if trade_type == "buy" else SELL
+        portfolio, price = self.portfolio, self.price
+        if trade_type == "buy":
+            size = portfolio.position_size()
+            tokens = size / price
+            cost = portfolio.balance_token * (portfolio.entry_price or 0) + size
+            balance_token = portfolio.balance_token + tokens
+            update = {
+                "balanceUSD": portfolio.balance_usd - size,
+                "balanceToken": balance_token,
+                "entryPrice": cost / balance_token,
+            }
+        else:
+            tokens = portfolio.balance_token * SELL_FRACTION
+            entry = portfolio.entry_price or price
+            update = {
+                "balanceUSD": portfolio.balance_usd + tokens * price,
+                "balanceToken": portfolio.balance_token - tokens,
+                "realizedPnl": portfolio.realized_pnl + tokens * (price - entry),
+                "entryPrice": portfolio.entry_price,
+            }
+        update["totalTrades"] = portfolio.total_trades + 1
+
+        self.last_trade_time = self.clock.now()
+        portfolio.apply(update)
+        self.stats["trades_executed"] += 1
+        return True
+
+
+async def replay(prices, timestamps_ms) -> Dict:
+    """Run every tick through a fresh ReplayAgent"""
+    agent = ReplayAgent()
+    history = agent.price_history
+    decisions = array("B")
+
+    started = time.perf_counter()
+    for price, timestamp in zip(prices.tolist(), timestamps_ms.tolist()):
+        history.append(price)
+        await agent.evaluate_tick(price, timestamp)
+        decisions.append(agent.decision)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "ticks": len(prices),
+        "seconds": round(elapsed, 3),
+        "ticks_per_s": round(len(prices) / elapsed, 1) if elapsed else None,
+        "trades": agent.stats["trades_executed"],
+        "decisions": decisions,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay ticks through MomentumAgent")
+    parser.add_argument("--audit-dir", help="replay the ticks recorded in an audit log")
+    parser.add_argument("--ticks", type=int, default=100_000, help="synthetic ticks (without --audit-dir)")
+    parser.add_argument("--difficulty", default="pro", choices=["noob", "degen", "pro"])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--session-ticks", type=int, default=600, help="ticks per synthetic session")
+    parser.add_argument("--output", help="also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    import numpy as np
+
+    recorded = None
+    if args.audit_dir:
+        import audit
+
+        recorded = audit.load(args.audit_dir)
+        prices = recorded["price"]
+        timestamps_ms = recorded["timestamp"] * 1000
+        source = f"audit log {args.audit_dir}"
+    else:
+        from pricegen import PriceGenerator
+
+        generator = PriceGenerator(
+            difficulty=args.difficulty, seed=args.seed, session_ticks=args.session_ticks
+        )
+        ticks = generator.generate(args.ticks)
+        prices, timestamps_ms = ticks["price"], ticks["timestamp"].astype(np.float64)
+        source = f"{args.ticks:,} synthetic {args.difficulty} ticks (seed {args.seed})"
+
+    if not len(prices):
+        print("❌ No ticks to replay")
+        return 1
+
+    report = asyncio.run(replay(prices, timestamps_ms))
+    decisions = np.frombuffer(report.pop("decisions"), dtype=np.uint8)
+    report["buys"] = int((decisions == BUY).sum())
+    report["sells"] = int((decisions == SELL).sum())
+    if recorded is not None:
+        # Live decisions used arrival time, replay uses tick time; they can
+        # only differ on ticks right at the min_trade_interval boundary
+        report["matches_recorded"] = round(float((decisions == recorded["decision"]).mean()), 6)
+
+    print("=" * 50)
+    print(f"Source:     {source}")
+    print(f"Replayed:   {report['ticks']:,} ticks in {report['seconds']}s ({report['ticks_per_s']:,.0f} ticks/s)")
+    print(f"Trades:     {report['trades']} ({report['buys']} buys, {report['sells']} sells)")
+    if "matches_recorded" in report:
+        print(f"Decisions:  {report['matches_recorded']:.4%} match the recording")
+    print("=" * 50)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
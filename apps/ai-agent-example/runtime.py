@@ -0,0 +1,100 @@
+"""
+Runtime profiles for the agent server
+RUNTIME_PROFILE=performance switches to the fastest components that are
+installed (uvloop event loop, httptools HTTP parser, orjson responses and
+tick decoding), tunes the price-feed WebSocket and turns off per-request
+access logs. The default profile keeps stock uvicorn/websockets settings.
+"""
+
+import os
+import json
+import socket
+import asyncio
+import importlib
+import importlib.util
+from typing import Callable, Dict
+
+PROFILES = ("default", "performance")
+PROFILE = os.getenv("RUNTIME_PROFILE", "default")
+
+# Frames the price-feed connection buffers before it stops reading the socket
+WS_MAX_QUEUE = int(os.getenv("WS_MAX_QUEUE", "1024"))
+# Kernel receive buffer of the price-feed socket (bytes)
+WS_RECV_BUFFER = int(os.getenv("WS_RECV_BUFFER", str(1 << 20)))
+
+
+def installed(name: str) -> bool:
+    """True if a module can be imported, without importing it"""
+    return importlib.util.find_spec(name) is not None
+
+
+class RuntimeProfile:
+    """Components and tuning selected for one runtime profile"""
+
+    def __init__(self, name: str = PROFILE):
+        if name not in PROFILES:
+            raise ValueError(f"Unknown RUNTIME_PROFILE '{name}' (expected one of {', '.join(PROFILES)})")
+        self.name = name
+        self.performance = name == "performance"
+        # uvicorn's "auto" already prefers uvloop/httptools; the performance
+        # profile pins them so the choice is explicit and reported in /stats
+        if self.performance:
+            self.loop = "uvloop" if installed("uvloop") else "asyncio"
+            self.http = "httptools" if installed("httptools") else "h11"
+            self.json = "orjson" if installed("orjson") else "json"
+        else:
+            self.loop = self.http = "auto"
+            self.json = "json"
+
+    @property
+    def response_class(self):
+        """Default FastAPI response class"""
+        from fastapi.responses import JSONResponse, ORJSONResponse
+
+        return ORJSONResponse if self.json == "orjson" else JSONResponse
+
+    def json_loads(self) -> Callable:
+        """JSON decoder for incoming feed messages (imports orjson on first use)"""
+        if self.json == "orjson":
+            return importlib.import_module("orjson").loads
+        return json.loads
+
+    def uvicorn_options(self) -> Dict:
+        """Keyword arguments for uvicorn.run"""
+        if not self.performance:
+            return {}
+        return {"loop": self.loop, "http": self.http, "access_log": False}
+
+    def websocket_options(self) -> Dict:
+        """Keyword arguments for websockets.connect on the price feed"""
+        if not self.performance:
+            return {}
+        # Ticks are a few dozen bytes; deflate would cost more CPU than it saves
+        return {"max_queue": WS_MAX_QUEUE, "compression": None}
+
+    def tune_socket(self, websocket):
+        """Enlarge the receive buffer and disable Nagle on a connected feed"""
+        if not self.performance:
+            return
+        sock = websocket.transport.get_extra_info("socket")
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, WS_RECV_BUFFER)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+
+    def run(self, main):
+        """asyncio.run on the profile's event loop (for standalone tools)"""
+        if self.loop == "uvloop":
+            import uvloop
+
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return asyncio.run(main)
+
+    def get_stats(self) -> Dict:
+        return {"profile": self.name, "loop": self.loop, "http": self.http, "json": self.json}
+
+
+runtime_profile = RuntimeProfile()
@@ -7,6 +7,7 @@ This agent runs as a web service and connects to tradeOS API via WebSocket
 import os
 import sys
 import time
+import hmac
 import json
 import asyncio
 import logging
@@ -14,37 +15,33 @@ from typing import List, Optional, Dict
 from collections import deque
 from datetime import datetime
 
-try:
-    from fastapi import FastAPI, HTTPException
-    from fastapi.responses import JSONResponse
-    import uvicorn
-except ImportError:
-    print("Installing FastAPI and uvicorn...")
-    os.system("pip install fastapi uvicorn websockets")
-    from fastapi import FastAPI, HTTPException
-    from fastapi.responses import JSONResponse
-    import uvicorn
-
-try:
-    import websockets
-except ImportError:
-    print("Installing websockets...")
-    os.system("pip install websockets")
-    import websockets
-
-try:
-    import requests
-except ImportError:
-    print("Installing requests...")
-    os.system("pip install requests")
-    import requests
-
-try:
-    import numpy as np
-except ImportError:
-    print("Installing numpy...")
-    os.system("pip install numpy")
-    import numpy as np
+from lazy import lazy_import, require
+
+# FastAPI defines the app at import time; heavier modules load on first use
+require("fastapi")
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+uvicorn = lazy_import("uvicorn")
+websockets = lazy_import("websockets")
+requests = lazy_import("requests")
+np = lazy_import("numpy")
+
+from portfolio import PortfolioMirror
+from ratelimit import INFO, limiter, priority_for_trade
+from breaker import CircuitOpenError, breakers
+from stats_stream import stats_stream
+from looplag import lag_monitor
+import profiler
+import logqueue
+from snapshot import SnapshotFile
+from audit import BUY, HOLD, SELL, AuditWriter
+from runtime import runtime_profile
+from feeds import FeedBook
+from clock import MonotonicClock
+from tuner import TUNE_WINDOW, AdaptiveTuner, StrategyParams
+import history
+import tickcodec
 
 # Configuration
 API_URL = os.getenv("API_URL", "http://localhost:3001")
@@ -52,6 +49,25 @@ WS_URL = os.getenv("WS_URL", "ws://localhost:3001")
 AGENT_WALLET = os.getenv("AGENT_WALLET", "")
 AGENT_PRIVATE_KEY = os.getenv("AGENT_PRIVATE_KEY", "")  # Optional: Private key for smart account control
 AGENT_PORT = int(os.getenv("AGENT_PORT", "8000"))
+# Optional: Extra sessions (userIds) traded over the same WebSocket, comma-separated
+AGENT_FEEDS = [f.strip() for f in os.getenv("AGENT_FEEDS", "").split(",") if f.strip()]
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")  # Optional: Enables /debug/profile when set
+# Optional: Crash-safe state snapshots, e.g. agent_state.snapshot (off when empty)
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "")
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "1"))
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", "300"))  # Older snapshots are ignored
+AUDIT_DIR = os.getenv("AUDIT_DIR", "")  # Optional: Directory for the decision audit log
+# Seconds between reconciling the local portfolio mirror against /state
+PORTFOLIO_RECONCILE_INTERVAL = float(os.getenv("PORTFOLIO_RECONCILE_INTERVAL", "60"))
+# Optional: Periodically re-optimize the trading thresholds in a worker process
+ADAPTIVE_TUNING = os.getenv("ADAPTIVE_TUNING", "0") == "1"
+# Optional: Points per tier of the in-memory price/equity history, e.g. 1000 (0 disables /history)
+HISTORY_POINTS = int(os.getenv("HISTORY_POINTS", "0"))
+HISTORY_TIERS = int(os.getenv("HISTORY_TIERS", "4"))  # Tiers, each HISTORY_FACTOR times coarser
+HISTORY_FACTOR = int(os.getenv("HISTORY_FACTOR", "10"))
+# Optional: Compact price feed; "1" = binary ticks + permessage-deflate, "binary" = binary ticks only
+COMPACT_FEED = os.getenv("COMPACT_FEED", "0") in ("1", "binary")
+FEED_DEFLATE = os.getenv("COMPACT_FEED", "0") == "1"
 
 # Trading parameters
 MIN_PRICE_CHANGE = 0.01  # 1% minimum price change to trigger trade
@@ -60,30 +76,61 @@ RSI_PERIOD = 14
 RSI_OVERSOLD = 30
 RSI_OVERBOUGHT = 70
 
-# Setup logging
-logging.basicConfig(
+# Starting thresholds; adaptive tuning swaps in new StrategyParams at runtime
+DEFAULT_PARAMS = StrategyParams(MIN_PRICE_CHANGE, LOOKBACK_PERIOD, RSI_OVERSOLD, RSI_OVERBOUGHT)
+
+# Setup logging (LOG_QUEUE=1 moves formatting and writes off the event loop)
+logqueue.setup_logging(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
 
 # FastAPI app
-app = FastAPI(title="tradeOS AI Agent", version="1.0.0")
+app = FastAPI(
+    title="tradeOS AI Agent",
+    version="1.0.0",
+    default_response_class=runtime_profile.response_class,
+)
 
 
 class MomentumAgent:
     """Momentum-based trading agent"""
 
-    def __init__(self, wallet_address: str, private_key: str = ""):
+    def __init__(
+        self,
+        wallet_address: str,
+        private_key: str = "",
+        feed_ids: Optional[List[str]] = None,
+        clock=None,
+    ):
         self.wallet_address = wallet_address
         self.private_key = private_key  # Agent's private key (never sent to backend)
         self.smart_account_address: Optional[str] = None  # Smart account address (managed client-side)
         self.price_history: deque = deque(maxlen=100)
+        # Read once per decision and replaced whole, never mutated
+        self.params: StrategyParams = DEFAULT_PARAMS
+        # Longer price window for adaptive tuning (empty unless enabled)
+        self.tune_history: deque = deque(maxlen=TUNE_WINDOW if ADAPTIVE_TUNING else 0)
+        # Equity curve and trades of the agent's own feed for /history
+        self.history: Optional[history.HistoryStore] = (
+            history.HistoryStore(HISTORY_POINTS, HISTORY_TIERS, HISTORY_FACTOR) if HISTORY_POINTS else None
+        )
+        # Extra feeds share one socket; their state lives in NumPy rows
+        feed_ids = [f for f in feed_ids or [] if f != wallet_address]
+        self.feeds: Optional[FeedBook] = FeedBook(feed_ids, capacity=100) if feed_ids else None
         self.is_connected = False
         self.has_tokens = False
         self.session_started = False
-        self.last_trade_time = 0
+        # Trade timing runs on this clock (MonotonicClock live, TickClock in replay)
+        self.clock = clock or MonotonicClock()
+        self.last_trade_time: Optional[float] = None  # clock reading of the last trade
         self.min_trade_interval = 5
+        self.portfolio = PortfolioMirror(difficulty="pro")
+        self.audit: Optional[AuditWriter] = AuditWriter(AUDIT_DIR) if AUDIT_DIR else None
+        # Indicators from the latest should_buy/should_sell evaluation
+        self.last_momentum = float("nan")
+        self.last_rsi = float("nan")
         self.stats = {
             "trades_executed": 0,
             "last_trade": None,
@@ -109,30 +156,48 @@ class MomentumAgent:
         rsi = 100 - (100 / (1 + rs))
         return float(rsi)
 
-    def calculate_momentum(self, prices: List[float]) -> float:
+    def calculate_momentum(self, prices: List[float], lookback: Optional[int] = None) -> float:
         """Calculate price momentum"""
         if len(prices) < 2:
             return 0.0
 
-        recent = prices[-LOOKBACK_PERIOD:] if len(prices) >= LOOKBACK_PERIOD else prices
+        lookback = lookback or self.params.lookback_period
+        recent = prices[-lookback:] if len(prices) >= lookback else prices
         if len(recent) < 2:
             return 0.0
 
         return ((recent[-1] - recent[0]) / recent[0]) * 100
 
+    def indicator_snapshot(self) -> Dict:
+        """Current indicator values for the stats stream"""
+        prices = list(self.price_history)
+        return {
+            "momentum": self.calculate_momentum(prices),
+            "rsi": self.calculate_rsi(prices),
+        }
+
+    def trade_interval_elapsed(self) -> bool:
+        """True if min_trade_interval has passed since the last trade"""
+        if self.last_trade_time is None:
+            return True
+        return (self.clock.now() - self.last_trade_time) > self.min_trade_interval
+
     def should_buy(self, current_price: float) -> bool:
         """Determine if agent should buy"""
-        if len(self.price_history) < LOOKBACK_PERIOD:
+        params = self.params
+        if len(self.price_history) < params.lookback_period:
             return False
 
         prices = list(self.price_history)
-        momentum = self.calculate_momentum(prices)
+        momentum = self.calculate_momentum(prices, params.lookback_period)
         rsi = self.calculate_rsi(prices)
+        self.last_momentum, self.last_rsi = momentum, rsi
 
         if (
-            momentum > MIN_PRICE_CHANGE
-            and rsi < RSI_OVERBOUGHT
-            and (time.time() - self.last_trade_time) > self.min_trade_interval
+            momentum > params.min_price_change
+            and rsi < params.rsi_overbought
+            and self.trade_interval_elapsed()
+            and self.portfolio.allows("buy", current_price)
         ):
             return True
 
@@ -140,29 +205,99 @@ class MomentumAgent:
 
     def should_sell(self, current_price: float) -> bool:
         """Determine if agent should sell"""
-        if len(self.price_history) < LOOKBACK_PERIOD:
+        params = self.params
+        if len(self.price_history) < params.lookback_period:
             return False
 
         prices = list(self.price_history)
-        momentum = self.calculate_momentum(prices)
+        momentum = self.calculate_momentum(prices, params.lookback_period)
         rsi = self.calculate_rsi(prices)
+        self.last_momentum, self.last_rsi = momentum, rsi
 
         if (
-            momentum < -MIN_PRICE_CHANGE
-            and rsi > RSI_OVERSOLD
-            and (time.time() - self.last_trade_time) > self.min_trade_interval
+            momentum < -params.min_price_change
+            and rsi > params.rsi_oversold
+            and self.trade_interval_elapsed()
+            and self.portfolio.allows("sell", current_price)
         ):
             return True
 
         return False
 
-    async def execute_trade(self, trade_type: str) -> bool:
-        """Execute a trade via the API"""
+    def decide_feed(self, row: int, price: float) -> Optional[str]:
+        """should_buy/should_sell for an extra feed; returns the trade type or None"""
+        feeds, params = self.feeds, self.params
+        if feeds.count[row] < params.lookback_period:
+            return None
+        # Never-traded feeds hold NaN, which compares False here
+        if (self.clock.now() - feeds.last_trade_time[row]) <= self.min_trade_interval:
+            return None
+
+        momentum = feeds.momentum(row, params.lookback_period)
+        rsi = feeds.rsi(row, RSI_PERIOD)
+        if momentum > params.min_price_change and rsi < params.rsi_overbought and feeds.can_buy(row):
+            return "buy"
+        if momentum < -params.min_price_change and rsi > params.rsi_oversold and feeds.can_sell(row):
+            return "sell"
+        return None
+
+    async def evaluate_feed(self, row: int, price: float, timestamp: Optional[float] = None):
+        """Make a trading decision for a tick on an extra feed"""
+        self.clock.observe(timestamp)
+        trade_type = self.decide_feed(row, price)
+        if trade_type:
+            await self.execute_trade(trade_type, feed=row)
+
+    async def evaluate_tick(self, price: float, timestamp: Optional[float] = None):
+        """Make a trading decision for a tick and record it in the audit log"""
+        self.clock.observe(timestamp)
+        self.last_momentum = self.last_rsi = float("nan")
+        decision, executed, latency_ms = HOLD, False, float("nan")
+
+        if self.should_buy(price):
+            decision = BUY
+        elif self.should_sell(price):
+            decision = SELL
+
+        if decision != HOLD:
+            started = time.perf_counter()
+            executed = await self.execute_trade("buy" if decision == BUY else "sell")
+            latency_ms = (time.perf_counter() - started) * 1000
+
+        if self.history:
+            portfolio = self.portfolio
+            self.history.record(
+                timestamp / 1000 if timestamp else time.time(),
+                price,
+                portfolio.balance_usd + portfolio.balance_token * price,
+                ("buy" if decision == BUY else "sell") if executed else None,
+            )
+
+        if self.audit:
+            self.audit.record(
+                timestamp / 1000 if timestamp else time.time(),
+                price,
+                self.last_momentum,
+                self.last_rsi,
+                decision,
+                executed,
+                latency_ms,
+            )
+
+    async def execute_trade(self, trade_type: str, feed: Optional[int] = None) -> bool:
+        """Execute a trade via the API (for an extra feed's session if `feed` is set)"""
+        user_id = self.wallet_address if feed is None else self.feeds.ids[feed]
+        if not await limiter.acquire_async(priority_for_trade(trade_type)):
+            logger.warning("⚠️  %s shed by outbound rate limiter", trade_type.upper())
+            return False
+
         try:
             url = f"{API_URL}/trade/{trade_type}"
-            response = requests.post(
+            response = await breakers.call_async(
+                f"/trade/{trade_type}",
+                requests.post,
                 url,
-                json={"userId": self.wallet_address, "type": trade_type},
+                json={"userId": user_id, "type": trade_type},
                 headers={"Content-Type": "application/json"},
                 timeout=5,
             )
@@ -170,24 +305,169 @@ class MomentumAgent:
             if response.status_code == 200:
                 data = response.json()
                 if data.get("success"):
-                    self.last_trade_time = time.time()
+                    if feed is None:
+                        self.last_trade_time = self.clock.now()
+                        self.portfolio.apply(data.get("portfolio"))
+                    else:
+                        self.feeds.apply_trade(feed, data.get("portfolio"), self.clock.now())
                     self.stats["trades_executed"] += 1
                     self.stats["last_trade"] = {
                         "type": trade_type,
                         "timestamp": datetime.now().isoformat(),
                     }
-                    logger.info(f"✅ {trade_type.upper()} executed successfully")
+                    if feed is not None:
+                        self.stats["last_trade"]["feed"] = user_id
+                    stats_stream.publish(
+                        trades_executed=self.stats["trades_executed"],
+                        last_trade=self.stats["last_trade"],
+                    )
+                    logger.info("✅ %s executed successfully", trade_type.upper())
                     return True
                 else:
-                    logger.error(f"❌ {trade_type.upper()} failed: {data.get('error')}")
+                    logger.error("❌ %s failed: %s", trade_type.upper(), data.get("error"))
             else:
-                logger.error(f"❌ HTTP {response.status_code}: {response.text}")
+                logger.error("❌ HTTP %s: %s", response.status_code, response.text)
+
+            # Rejected trade means the mirror disagrees with the backend
+            if response.status_code == 400 and feed is None:
+                await self.reconcile_portfolio()
+            return False
+        except CircuitOpenError as e:
+            logger.warning("⚡ %s skipped: %s", trade_type.upper(), e)
+            return False
+        except Exception as e:
+            logger.error("❌ Error executing %s: %s", trade_type, e)
+            return False
 
+    def to_snapshot(self) -> Dict:
+        """Agent state needed to resume trading after a restart"""
+        return {
+            "wallet_address": self.wallet_address,
+            "smart_account_address": self.smart_account_address,
+            "session_started": self.session_started,
+            "has_tokens": self.has_tokens,
+            # Unix time, so snapshots stay valid across clocks and reboots
+            "last_trade_time": (
+                self.clock.to_wall(self.last_trade_time) if self.last_trade_time is not None else 0
+            ),
+            # Indicators are derived from the ring buffer, so it restores them too
+            "price_history": list(self.price_history),
+            "stats": self.stats,
+            "portfolio": self.portfolio.to_dict(),
+            "difficulty": self.portfolio.difficulty,
+        }
+
+    def restore_snapshot(self, state: Dict) -> bool:
+        """Restore state from a snapshot; False if it can't be used to trade"""
+        if state.get("wallet_address") != self.wallet_address:
+            return False
+        if not (state.get("session_started") and state.get("has_tokens")):
             return False
+
+        self.smart_account_address = state.get("smart_account_address")
+        self.session_started = True
+        self.has_tokens = True
+        last_trade_time = state.get("last_trade_time") or 0
+        self.last_trade_time = self.clock.from_wall(last_trade_time) if last_trade_time else None
+        self.price_history.extend(state.get("price_history", []))
+        self.stats.update(state.get("stats", {}))
+        self.portfolio.difficulty = state.get("difficulty", self.portfolio.difficulty)
+        self.portfolio.apply(state.get("portfolio"))
+        return True
+
+    async def snapshot_loop(self, snapshots: SnapshotFile):
+        """Periodically snapshot agent state"""
+        while True:
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+            try:
+                snapshots.write(self.to_snapshot())
+            except Exception as e:
+                logger.error("❌ Error writing snapshot: %s", e)
+
+    async def fetch_state(self, user_id: Optional[str] = None) -> Optional[Dict]:
+        """Fetch the authoritative game state (including portfolio) from API"""
+        if not await limiter.acquire_async(INFO):
+            return None
+
+        try:
+            url = f"{API_URL}/state"
+            response = await breakers.call_async(
+                "/state",
+                requests.get,
+                url,
+                params={"userId": user_id or self.wallet_address},
+                timeout=5,
+            )
+
+            if response.status_code == 200:
+                return response.json()
+            return None
         except Exception as e:
-            logger.error(f"❌ Error executing {trade_type}: {e}")
+            logger.error("❌ Error fetching state: %s", e)
+            return None
+
+    async def reconcile_portfolio(self) -> bool:
+        """Reconcile the local portfolio mirror against the backend"""
+        state = await self.fetch_state()
+        if not state:
             return False
 
+        portfolio = (state.get("user") or {}).get("portfolio")
+        if self.portfolio.reconcile(portfolio):
+            logger.warning("⚠️  Portfolio mirror drifted, resynced: %s", self.portfolio.to_dict())
+        return True
+
+    async def verify_resume(self) -> bool:
+        """Confirm a snapshot resume with the backend, or start over with a new session"""
+        state = await self.fetch_state()
+        portfolio = ((state or {}).get("user") or {}).get("portfolio")
+        if portfolio:
+            if self.portfolio.reconcile(portfolio):
+                logger.warning("⚠️  Portfolio mirror drifted, resynced: %s", self.portfolio.to_dict())
+            return True
+
+        # Unreachable backend or unknown session: don't keep trading on trust
+        logger.warning("⚠️  Could not confirm the resumed session, starting a new one")
+        self.session_started = False
+        self.has_tokens = False
+        return await self.bootstrap()
+
+    async def reconcile_feeds(self, rows: Optional[List[int]] = None) -> List[int]:
+        """Reconcile extra feeds' balances against their /state; returns rows not reached"""
+        missed = []
+        for row in range(len(self.feeds)) if rows is None else rows:
+            feed_id = self.feeds.ids[row]
+            state = await self.fetch_state(feed_id)
+            portfolio = ((state or {}).get("user") or {}).get("portfolio")
+            if not portfolio:
+                missed.append(row)
+                continue
+            if self.feeds.reconcile(row, portfolio):
+                logger.warning("⚠️  Feed %s balances drifted, resynced", feed_id)
+        return missed
+
+    async def seed_feeds(self, attempts: int = 10):
+        """Load every extra feed's real balances, retrying feeds the limiter shed"""
+        missed = list(range(len(self.feeds)))
+        for _ in range(attempts):
+            missed = await self.reconcile_feeds(missed)
+            if not missed:
+                logger.info("✅ Balances loaded for %d feeds", len(self.feeds))
+                return
+            await asyncio.sleep(1)
+        logger.warning(
+            "⚠️  %d feeds still on default balances until the next reconcile", len(missed)
+        )
+
+    async def reconcile_portfolio_loop(self):
+        """Slowly reconcile the portfolio mirror (and extra feeds) in the background"""
+        while True:
+            await asyncio.sleep(PORTFOLIO_RECONCILE_INTERVAL)
+            if self.session_started:
+                await self.reconcile_portfolio()
+            if self.feeds is not None:
+                await self.reconcile_feeds()
+
     async def create_smart_account(self) -> Optional[str]:
         """Create a smart account using the agent's private key (client-side)"""
         if not self.private_key:
@@ -248,7 +528,9 @@ class MomentumAgent:
                 payload["smartAccountAddress"] = self.smart_account_address
                 logger.info("✅ Providing smart account address to backend (private key stays client-side)")
             
-            response = requests.post(
+            response = await breakers.call_async(
+                "/session/start",
+                requests.post,
                 url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
@@ -259,6 +541,8 @@ class MomentumAgent:
                 data = response.json()
                 if data.get("success"):
                     self.session_started = True
+                    # Backend resets the portfolio on every new session
+                    self.portfolio.reset(payload["difficulty"])
                     # Update smart account address if backend created one
                     if data.get("smartAccountAddress") and not self.smart_account_address:
                         self.smart_account_address = data.get("smartAccountAddress")
@@ -276,14 +560,40 @@ class MomentumAgent:
             logger.error(f"❌ Error starting session: {e}")
             return False
 
+    async def bootstrap(self) -> bool:
+        """Start a session and wait until the agent holds tokens"""
+        if not await self.start_session():
+            logger.error("❌ Failed to start session")
+            return False
+
+        # Wait for tokens
+        logger.info("⏳ Waiting for tokens...")
+        await asyncio.sleep(5)
+
+        # Check token balance
+        if not await self.check_token_balance():
+            logger.warning("⚠️  No tokens detected. Agent will wait...")
+            while not self.has_tokens:
+                await asyncio.sleep(5)
+                await self.check_token_balance()
+            logger.info("✅ Tokens detected!")
+        return True
+
     async def check_token_balance(self) -> bool:
         """Check if agent has tokens"""
+        if not await limiter.acquire_async(INFO):
+            return self.has_tokens
+
         try:
             url = f"{API_URL}/tokens/balance"
             # Check balance of smart account if available, otherwise wallet address
             address_to_check = self.smart_account_address or self.wallet_address
-            response = requests.get(
-                url, params={"address": address_to_check}, timeout=5
+            response = await breakers.call_async(
+                "/tokens/balance",
+                requests.get,
+                url,
+                params={"address": address_to_check},
+                timeout=5,
             )
 
             if response.status_code == 200:
@@ -297,10 +607,17 @@ class MomentumAgent:
 
     async def fetch_signals(self) -> Optional[Dict]:
         """Fetch trading signals from API"""
+        if not await limiter.acquire_async(INFO):
+            return None
+
         try:
             url = f"{API_URL}/data/signals"
-            response = requests.get(
-                url, params={"userId": self.wallet_address}, timeout=5
+            response = await breakers.call_async(
+                "/data/signals",
+                requests.get,
+                url,
+                params={"userId": self.wallet_address},
+                timeout=5,
             )
 
             if response.status_code == 200:
@@ -312,9 +629,14 @@ class MomentumAgent:
 
     async def fetch_price_history(self, limit: int = 100) -> List[Dict]:
         """Fetch price history from API"""
+        if not await limiter.acquire_async(INFO):
+            return []
+
         try:
             url = f"{API_URL}/data/price/history"
-            response = requests.get(
+            response = await breakers.call_async(
+                "/data/price/history",
+                requests.get,
                 url,
                 params={"userId": self.wallet_address, "limit": limit},
                 timeout=5,
@@ -328,78 +650,121 @@ class MomentumAgent:
             logger.error(f"❌ Error fetching price history: {e}")
             return []
 
+    async def on_price(self, row: Optional[int], price: Optional[float], timestamp: Optional[float]):
+        """Handle a price tick for an extra feed's row, or our own feed if `row` is None"""
+        if not price:
+            return
+        if row is not None:
+            self.feeds.push(row, price)
+            if self.has_tokens and self.session_started:
+                await self.evaluate_feed(row, price, timestamp)
+            return
+
+        self.price_history.append(price)
+        self.tune_history.append(price)
+        self.stats["last_price"] = price
+        stats_stream.publish(last_price=price)
+
+        # Optionally fetch signals from API for more sophisticated decisions
+        # signals = await self.fetch_signals()
+        # if signals:
+        #     # Use API signals for trading decisions
+        #     pass
+
+        # Make trading decision
+        if self.has_tokens and self.session_started:
+            await self.evaluate_tick(price, timestamp)
+
     async def connect_websocket(self):
         """Connect to WebSocket and handle messages"""
         ws_url = WS_URL.replace("http", "ws") if WS_URL.startswith("http") else WS_URL
+        loads = runtime_profile.json_loads()
+        feeds = self.feeds
+        feed_index = feeds.index if feeds is not None else {}
+        options = runtime_profile.websocket_options()
+        if FEED_DEFLATE:
+            # Offer permessage-deflate even under the performance profile
+            options["compression"] = "deflate"
 
         while True:
             try:
                 logger.info(f"🔌 Connecting to {ws_url}...")
-                async with websockets.connect(ws_url) as websocket:
+                async with websockets.connect(ws_url, **options) as websocket:
+                    runtime_profile.tune_socket(websocket)
                     self.is_connected = True
+                    stats_stream.publish(is_connected=True)
                     logger.info("✅ Connected to backend")
 
-                    # Subscribe to price feed
-                    subscribe_msg = json.dumps(
-                        {"type": "subscribe", "userId": self.wallet_address}
-                    )
-                    await websocket.send(subscribe_msg)
+                    # Subscribe to price feed (binary feed 0 is our own, N is extra feed row N-1)
+                    if COMPACT_FEED:
+                        subscribe_msg = tickcodec.subscribe_message(self.wallet_address, 0)
+                    else:
+                        subscribe_msg = {"type": "subscribe", "userId": self.wallet_address}
+                    await websocket.send(json.dumps(subscribe_msg))
                     logger.info(f"📡 Subscribed to price feed for {self.wallet_address}")
+                    if feeds is not None:
+                        for row, feed_id in enumerate(feeds.ids):
+                            if COMPACT_FEED:
+                                subscribe_msg = tickcodec.subscribe_message(feed_id, row + 1)
+                            else:
+                                subscribe_msg = {"type": "subscribe", "userId": feed_id}
+                            await websocket.send(json.dumps(subscribe_msg))
+                        logger.info("📡 Subscribed to %d extra feeds", len(feeds))
 
                     # Listen for messages
                     async for message in websocket:
                         try:
-                            data = json.loads(message)
+                            # Binary frames are compact price ticks (COMPACT_FEED)
+                            if isinstance(message, bytes):
+                                for feed, price, timestamp in tickcodec.decode(message):
+                                    await self.on_price(feed - 1 if feed else None, price, timestamp)
+                                continue
+
+                            data = loads(message)
 
                             if data.get("type") == "price":
                                 tick = data.get("data", {})
-                                price = tick.get("price")
-                                timestamp = tick.get("timestamp")
-
-                                if price:
-                                    self.price_history.append(price)
-                                    self.stats["last_price"] = price
-
-                                    # Optionally fetch signals from API for more sophisticated decisions
-                                    # signals = await self.fetch_signals()
-                                    # if signals:
-                                    #     # Use API signals for trading decisions
-                                    #     pass
-
-                                    # Make trading decision
-                                    if self.has_tokens and self.session_started:
-                                        if self.should_buy(price):
-                                            await self.execute_trade("buy")
-                                        elif self.should_sell(price):
-                                            await self.execute_trade("sell")
+                                # Extra feeds are routed to their row by userId
+                                await self.on_price(
+                                    feed_index.get(data.get("userId")),
+                                    tick.get("price"),
+                                    tick.get("timestamp"),
+                                )
 
                             elif data.get("type") == "device":
                                 # Device signals
                                 pass
 
                         except json.JSONDecodeError as e:
-                            logger.error(f"Error parsing message: {e}")
+                            logger.error("Error parsing message: %s", e)
                         except Exception as e:
-                            logger.error(f"Error processing message: {e}")
+                            logger.error("Error processing message: %s", e)
 
             except websockets.exceptions.ConnectionClosed:
                 self.is_connected = False
+                stats_stream.publish(is_connected=False)
                 logger.warning("❌ WebSocket closed. Reconnecting in 3 seconds...")
                 await asyncio.sleep(3)
             except Exception as e:
                 self.is_connected = False
+                stats_stream.publish(is_connected=False)
                 logger.error(f"WebSocket error: {e}. Reconnecting in 3 seconds...")
                 await asyncio.sleep(3)
 
 
 # Global agent instance
 agent: Optional[MomentumAgent] = None
+snapshots: Optional[SnapshotFile] = None
+tuner: Optional[AdaptiveTuner] = None
 
 
 @app.on_event("startup")
 async def startup():
     """Initialize agent on startup"""
-    global agent
+    global agent, snapshots, tuner
+
+    # Watch for event-loop stalls from the very start
+    lag_monitor.start()
 
     if not AGENT_WALLET:
         logger.error("❌ AGENT_WALLET environment variable is required")
@@ -413,29 +778,64 @@ async def startup():
         logger.info("🔑 Private key provided - agent will control its own smart account")
     logger.info(f"API URL: {API_URL}")
     logger.info(f"WS URL: {WS_URL}")
+    if AGENT_FEEDS:
+        logger.info("Extra feeds: %d", len(AGENT_FEEDS))
+    if ADAPTIVE_TUNING:
+        logger.info("🎛️  Adaptive tuning enabled")
     logger.info("=" * 50)
 
-    agent = MomentumAgent(AGENT_WALLET, AGENT_PRIVATE_KEY)
+    agent = MomentumAgent(AGENT_WALLET, AGENT_PRIVATE_KEY, feed_ids=AGENT_FEEDS)
 
-    # Start trading session
-    if not await agent.start_session():
-        logger.error("❌ Failed to start session")
-        return
+    # Push stats to dashboards as soon as the agent exists
+    stats_stream.add_source(agent.indicator_snapshot)
+    asyncio.create_task(stats_stream.run(), name="stats_stream")
 
-    # Wait for tokens
-    logger.info("⏳ Waiting for tokens...")
-    await asyncio.sleep(5)
-
-    # Check token balance
-    if not await agent.check_token_balance():
-        logger.warning("⚠️  No tokens detected. Agent will wait...")
-        while not agent.has_tokens:
-            await asyncio.sleep(5)
-            await agent.check_token_balance()
-        logger.info("✅ Tokens detected!")
+    # Resume from a recent snapshot, skipping session start and token wait
+    resumed = False
+    if SNAPSHOT_PATH:
+        snapshots = SnapshotFile(SNAPSHOT_PATH)
+        try:
+            state = snapshots.load(max_age=SNAPSHOT_MAX_AGE)
+            resumed = state is not None and agent.restore_snapshot(state)
+        except Exception as e:
+            logger.warning("⚠️  Ignoring unreadable snapshot: %s", e)
+
+    if resumed:
+        logger.info(
+            f"⚡ Resumed from snapshot #{snapshots.seq} "
+            f"({len(agent.price_history)} prices, {agent.stats['trades_executed']} trades)"
+        )
+        # Verify the restored session without delaying the first trade
+        asyncio.create_task(agent.verify_resume(), name="verify_snapshot")
+    elif not await agent.bootstrap():
+        return
 
     # Start WebSocket connection in background
-    asyncio.create_task(agent.connect_websocket())
+    asyncio.create_task(agent.connect_websocket(), name="connect_websocket")
+    asyncio.create_task(agent.reconcile_portfolio_loop(), name="reconcile_portfolio")
+    if agent.feeds is not None:
+        asyncio.create_task(agent.seed_feeds(), name="seed_feeds")
+    if snapshots:
+        asyncio.create_task(agent.snapshot_loop(snapshots), name="snapshot")
+    if ADAPTIVE_TUNING:
+        tuner = AdaptiveTuner()
+        asyncio.create_task(tuner.run(agent, RSI_PERIOD), name="adaptive_tuning")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Write a final snapshot and flush the audit log on graceful shutdown"""
+    lag_monitor.stop()
+    if tuner:
+        tuner.close()
+    if agent and snapshots:
+        try:
+            snapshots.write(agent.to_snapshot())
+        except Exception as e:
+            logger.error("❌ Error writing snapshot: %s", e)
+        snapshots.close()
+    if agent and agent.audit:
+        agent.audit.close()
 
 
 @app.get("/")
@@ -468,10 +868,98 @@ async def get_stats():
         "last_price": agent.stats["last_price"],
         "trades_executed": agent.stats["trades_executed"],
         "last_trade": agent.stats["last_trade"],
+        "portfolio": agent.portfolio.to_dict(),
+        "portfolio_mirror": {
+            "synced": agent.portfolio.synced,
+            "reconciliations": agent.portfolio.reconciliations,
+            "drift_corrections": agent.portfolio.drift_corrections,
+            "trades_blocked": agent.portfolio.trades_blocked,
+        },
+        "rate_limiter": limiter.get_stats(),
+        "breakers": breakers.get_stats(),
+        "stats_stream": stats_stream.get_stats(),
+        "event_loop": lag_monitor.get_stats(),
+        "logging": logqueue.get_stats(),
+        "runtime": runtime_profile.get_stats(),
+        "snapshot": snapshots.get_stats() if snapshots else None,
+        "audit": agent.audit.get_stats() if agent.audit else None,
+        "feeds": agent.feeds.get_stats() if agent.feeds else None,
+        "history": agent.history.get_stats() if agent.history else None,
+        "strategy": {
+            "params": agent.params._asdict(),
+            "adaptive": tuner.get_stats() if tuner else None,
+        },
         "signals": signals,  # Include signals from tradeOS API
     }
 
 
-if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=AGENT_PORT)
+@app.get("/history")
+async def get_history(
+    since: Optional[float] = Query(None, description="Unix time; only points after it"),
+    until: Optional[float] = Query(None, description="Unix time; only points up to it"),
+    max_points: Optional[int] = Query(None, ge=1, le=history.MAX_PAGE),
+    limit: int = Query(1000, ge=1, le=history.MAX_PAGE),
+    after: Optional[int] = Query(None, ge=0, description="`next_after` from the previous page"),
+):
+    """Price/equity history and trades, downsampled to `max_points` or paged by `limit`"""
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    if not agent.history:
+        raise HTTPException(status_code=404, detail="History disabled (set HISTORY_POINTS)")
+
+    return agent.history.query(since, until, max_points, limit, after)
+
+
+@app.get("/stats/stream")
+async def stream_stats():
+    """Stream stats deltas to dashboards via Server-Sent Events"""
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
 
+    return StreamingResponse(
+        stats_stream.subscribe(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+
+# Only one profile may run at a time
+profile_running = False
+
+
+@app.get("/debug/profile")
+async def debug_profile(
+    seconds: float = Query(10, gt=0, le=profiler.MAX_SECONDS),
+    output: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    authorization: Optional[str] = Header(None),
+):
+    """Sample the live process and return collapsed stacks"""
+    global profile_running
+
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling disabled (set DEBUG_TOKEN)")
+    token = (authorization or "").strip()
+    if token.startswith("Bearer "):
+        token = token[len("Bearer "):].strip()
+    if not hmac.compare_digest(token.encode(), DEBUG_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid debug token")
+    if profile_running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    profile_running = True
+    try:
+        logger.info("🔬 Profiling for %ss...", seconds)
+        loop = asyncio.get_running_loop()
+        # Sample from a worker thread so the event loop keeps serving ticks
+        counts = await loop.run_in_executor(None, profiler.sample, seconds, loop)
+    finally:
+        profile_running = False
+
+    if output == "json":
+        return profiler.summarize(counts, seconds)
+    return PlainTextResponse(profiler.collapse(counts))
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=AGENT_PORT, **runtime_profile.uvicorn_options())
@@ -0,0 +1,115 @@
+"""
+Crash-safe agent state snapshots
+State is written to a small memory-mapped file with two slots. Each write
+goes to the older slot and is only valid once its header (sequence number,
+length, CRC) is in place, so a crash mid-write always leaves the previous
+snapshot readable.
+
+Writes land in the shared page cache without an msync, so they cost no
+disk I/O on the event loop. They survive a process crash, which is what
+restarts recover from; after a power loss the file may hold an older
+snapshot (or none), and the agent then starts a fresh session.
+"""
+
+import os
+import json
+import mmap
+import time
+import struct
+import zlib
+from typing import Dict, Optional
+
+MAGIC = b"TOS1"
+# magic, sequence, written_at, payload length, payload crc32
+HEADER = struct.Struct("<4sQdII")
+SLOT_SIZE = 32 * 1024
+FILE_SIZE = 2 * SLOT_SIZE
+MAX_PAYLOAD = SLOT_SIZE - HEADER.size
+
+
+class SnapshotTooLarge(ValueError):
+    """Serialized state does not fit in a snapshot slot"""
+
+
+class SnapshotFile:
+    """Double-buffered snapshot file backed by mmap"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seq = 0
+        self.writes = 0
+        self.last_write_at: Optional[float] = None
+        self._mm: Optional[mmap.mmap] = None
+
+    def _open(self) -> mmap.mmap:
+        if self._mm is None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size != FILE_SIZE:
+                    os.ftruncate(fd, FILE_SIZE)
+                self._mm = mmap.mmap(fd, FILE_SIZE)
+            finally:
+                os.close(fd)
+            # Continue the sequence so new writes never lose to old slots
+            slots = [s for s in (self._read_slot(0), self._read_slot(1)) if s]
+            self.seq = max((s["seq"] for s in slots), default=0)
+        return self._mm
+
+    def _read_slot(self, slot: int) -> Optional[Dict]:
+        mm = self._open()
+        offset = slot * SLOT_SIZE
+        magic, seq, written_at, length, crc = HEADER.unpack_from(mm, offset)
+        if magic != MAGIC or length > MAX_PAYLOAD:
+            return None
+
+        start = offset + HEADER.size
+        payload = mm[start : start + length]
+        if zlib.crc32(payload) != crc:
+            return None
+        return {"seq": seq, "written_at": written_at, "payload": payload}
+
+    def load(self, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Newest valid snapshot state, or None if missing, corrupt or stale"""
+        slots = [s for s in (self._read_slot(0), self._read_slot(1)) if s]
+        if not slots:
+            return None
+
+        newest = max(slots, key=lambda s: s["seq"])
+        if max_age is not None and time.time() - newest["written_at"] > max_age:
+            return None
+        return json.loads(newest["payload"])
+
+    def write(self, state: Dict):
+        """Atomically replace the snapshot with `state`"""
+        payload = json.dumps(state, separators=(",", ":")).encode()
+        if len(payload) > MAX_PAYLOAD:
+            raise SnapshotTooLarge(f"snapshot is {len(payload)} bytes, max {MAX_PAYLOAD}")
+
+        mm = self._open()
+        self.seq += 1
+        offset = (self.seq % 2) * SLOT_SIZE
+
+        # Invalidate the slot, write the payload, then publish the header
+        mm[offset : offset + 4] = b"\0\0\0\0"
+        start = offset + HEADER.size
+        mm[start : start + len(payload)] = payload
+        now = time.time()
+        HEADER.pack_into(mm, offset, MAGIC, self.seq, now, len(payload), zlib.crc32(payload))
+
+        self.writes += 1
+        self.last_write_at = now
+
+    def close(self):
+        if self._mm is not None:
+            # One msync on shutdown so a clean stop also survives a reboot
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "seq": self.seq,
+            "writes": self.writes,
+            "last_write_at": self.last_write_at,
+        }
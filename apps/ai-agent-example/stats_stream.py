@@ -0,0 +1,144 @@
+"""
+Push-based stats stream for dashboards (Server-Sent Events)
+Updates are coalesced and flushed at most MAX_HZ times per second. Each
+flush serializes one delta frame that is shared by every subscriber.
+"""
+
+import os
+import json
+import time
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+# Maximum delta frames per second pushed to subscribers
+MAX_HZ = float(os.getenv("STATS_STREAM_MAX_HZ", "4"))
+# Seconds between keep-alive comments on idle streams
+HEARTBEAT_INTERVAL = 15.0
+# Frames buffered per subscriber before it is resynced with a snapshot
+SUBSCRIBER_BUFFER = 32
+
+_HEARTBEAT = b": keep-alive\n\n"
+
+
+class _Subscriber:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+        self.needs_snapshot = False
+
+
+class StatsBroadcaster:
+    """Coalesces stats updates and fans them out as SSE frames"""
+
+    def __init__(self, max_hz: float = MAX_HZ):
+        self.min_interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self.state: Dict = {}
+        self.seq = 0
+        self.frames_sent = 0
+        self.resyncs = 0
+        self._pending: Dict = {}
+        self._sources: List[Callable[[], Dict]] = []
+        self._subscribers: List[_Subscriber] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def add_source(self, source: Callable[[], Dict]):
+        """Register a callable polled on each flush (e.g. indicator values)"""
+        self._sources.append(source)
+
+    def publish(self, **fields):
+        """Record changed fields; cheap enough for the tick path"""
+        self._pending.update(fields)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _frame(self, event: str, payload: Dict) -> bytes:
+        data = json.dumps(payload, separators=(",", ":"), default=str)
+        return f"id: {self.seq}\nevent: {event}\ndata: {data}\n\n".encode()
+
+    def _flush(self):
+        """Compute the delta since the last flush and fan it out"""
+        updates = self._pending
+        self._pending = {}
+        # Sources are only evaluated when someone is listening
+        if self._subscribers:
+            for source in self._sources:
+                updates.update(source())
+
+        delta = {k: v for k, v in updates.items() if self.state.get(k) != v}
+        if not delta:
+            return
+        self.state.update(delta)
+        if not self._subscribers:
+            return
+
+        self.seq += 1
+        frame = self._frame("delta", delta)  # one serialization per update
+        self.frames_sent += 1
+        for subscriber in self._subscribers:
+            if subscriber.needs_snapshot:
+                continue
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow viewer: drop its backlog and resend full state later
+                subscriber.needs_snapshot = True
+                self.resyncs += 1
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(b"")
+
+    async def run(self):
+        """Background flush loop; rate-caps pushes to MAX_HZ"""
+        self._wakeup = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        last_flush = 0.0
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            wait = self.min_interval - (time.monotonic() - last_flush)
+            if wait > 0:
+                # Further publishes during this sleep are coalesced
+                await asyncio.sleep(wait)
+            last_flush = time.monotonic()
+            self._flush()
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        """SSE byte stream: a full snapshot followed by deltas"""
+        subscriber = _Subscriber()
+        self._subscribers.append(subscriber)
+        try:
+            for source in self._sources:
+                self.state.update(source())
+            yield self._frame("snapshot", self.state)
+
+            while True:
+                try:
+                    frame = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    yield _HEARTBEAT
+                    continue
+
+                if subscriber.needs_snapshot:
+                    subscriber.needs_snapshot = False
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    yield self._frame("snapshot", self.state)
+                elif frame:
+                    yield frame
+        finally:
+            self._subscribers.remove(subscriber)
+
+    def get_stats(self) -> Dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "frames_sent": self.frames_sent,
+            "resyncs": self.resyncs,
+            "max_hz": 1.0 / self.min_interval if self.min_interval else None,
+        }
+
+
+# Process-wide broadcaster for the agent's /stats/stream endpoint
+stats_stream = StatsBroadcaster()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the agent modules the way the scripts do, from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
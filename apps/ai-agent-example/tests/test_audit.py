@@ -0,0 +1,75 @@
+import glob
+import math
+import os
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import audit
+from audit import BUY, HOLD, SELL, AuditWriter
+
+
+def write_rows(directory: str, rows: int, **kwargs) -> AuditWriter:
+    writer = AuditWriter(directory, flush_interval=3600, **kwargs)
+    for i in range(rows):
+        decision = (HOLD, BUY, SELL)[i % 3]
+        writer.record(
+            1_700_000_000.0 + i, 100.0 + i, i / 10, 50.0, decision,
+            executed=decision != HOLD, latency_ms=float(i) if decision != HOLD else float("nan"),
+        )
+    writer.close()
+    return writer
+
+
+def test_round_trip_across_rotated_files(tmp_path):
+    # Every chunk overflows the 1-byte limit, so each lands in its own file
+    writer = write_rows(str(tmp_path), 35, chunk_rows=10, max_file_bytes=1)
+    assert writer.rows_written == 35
+    assert writer.chunks_written == 4
+    assert writer.files_rotated == 3
+    assert len(glob.glob(os.path.join(tmp_path, "*" + audit.FILE_SUFFIX))) == 4
+
+    log = audit.load(str(tmp_path))
+    assert log["timestamp"].tolist() == [1_700_000_000.0 + i for i in range(35)]
+    assert log["price"].tolist() == [100.0 + i for i in range(35)]
+    assert log["decision"].tolist() == [(HOLD, BUY, SELL)[i % 3] for i in range(35)]
+    assert log["executed"].dtype == np.uint8
+    assert log["latency_ms"][1] == 1.0
+    assert math.isnan(log["latency_ms"][0])
+
+
+def test_idle_buffer_is_flushed_without_new_ticks(tmp_path):
+    writer = AuditWriter(str(tmp_path), flush_interval=0.05)
+    for i in range(3):
+        writer.record(1_700_000_000.0 + i, 100.0, 0.0, 50.0, HOLD)
+
+    deadline = time.monotonic() + 2
+    while writer.rows_written < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.rows_written == 3  # written while the writer was still open
+    assert writer.get_stats()["buffered_rows"] == 0
+    assert audit.load(str(tmp_path))["timestamp"].tolist() == [1_700_000_000.0 + i for i in range(3)]
+    writer.close()
+    assert writer.chunks_written == 1
+
+
+def test_load_single_file(tmp_path):
+    write_rows(str(tmp_path), 5, chunk_rows=2)
+    (path,) = glob.glob(os.path.join(tmp_path, "*" + audit.FILE_SUFFIX))
+    assert audit.load(path)["price"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+
+
+def test_truncated_tail_keeps_complete_chunks(tmp_path):
+    write_rows(str(tmp_path), 20, chunk_rows=10)
+    (path,) = glob.glob(os.path.join(tmp_path, "*" + audit.FILE_SUFFIX))
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)  # crash mid-way through the last chunk
+    assert len(audit.load(path)["timestamp"]) == 10
+
+
+def test_empty_directory_loads_empty_columns(tmp_path):
+    log = audit.load(str(tmp_path))
+    assert all(len(column) == 0 for column in log.values())
+    assert set(log) == {name for name, _, _ in audit.COLUMNS}
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def ok(timeout):
+    return SimpleNamespace(status_code=200)
+
+
+def server_error(timeout):
+    return SimpleNamespace(status_code=503)
+
+
+def boom(timeout):
+    raise ConnectionError("backend down")
+
+
+def open_breaker(reset_timeout=60.0) -> CircuitBreaker:
+    breaker = CircuitBreaker("/test", failure_threshold=2, reset_timeout=reset_timeout)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(boom, timeout=1)
+    return breaker
+
+
+def test_opens_after_consecutive_failures_and_fails_fast():
+    breaker = open_breaker()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+
+    called = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda timeout: called.append(timeout), timeout=1)
+    assert called == []
+    assert breaker.fast_failures == 1
+
+
+def test_5xx_counts_as_failure_and_success_resets_count():
+    breaker = CircuitBreaker("/test", failure_threshold=2)
+    breaker.call(server_error, timeout=1)
+    assert breaker.failures == 1
+    breaker.call(ok, timeout=1)
+    assert breaker.failures == 0
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = open_breaker(reset_timeout=0.0)
+    assert breaker.allow()  # the probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # everyone else waits for its verdict
+
+
+def test_successful_probe_closes():
+    breaker = open_breaker(reset_timeout=0.0)
+    breaker.call(ok, timeout=1)
+    assert breaker.state == CLOSED
+    assert breaker.call(ok, timeout=1).status_code == 200
+
+
+def test_failed_probe_reopens():
+    breaker = open_breaker(reset_timeout=0.0)
+    with pytest.raises(ConnectionError):
+        breaker.call(boom, timeout=1)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_probe_slot_is_held_until_the_verdict_is_recorded():
+    seen = []
+
+    class Watched(CircuitBreaker):
+        def record_success(self, latency):
+            seen.append(self.allow())  # a second caller racing the verdict
+            super().record_success(latency)
+
+    breaker = Watched("/test", failure_threshold=1, reset_timeout=0.0)
+    with pytest.raises(ConnectionError):
+        breaker.call(boom, timeout=1)
+    breaker.call(ok, timeout=1)
+    assert seen == [False]
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_async_probe_releases_the_breaker():
+    breaker = open_breaker(reset_timeout=0.0)
+    release = threading.Event()
+
+    async def main():
+        probe = asyncio.create_task(breaker.call_async(lambda timeout: release.wait(5), timeout=1))
+        await asyncio.sleep(0.05)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        release.set()
+
+    asyncio.run(main())
+    assert breaker.allow()  # a new probe may go out
+
+
+def test_call_async_does_not_block_the_loop():
+    breaker = CircuitBreaker("/test")
+
+    def slow(timeout):
+        time.sleep(0.2)
+        return SimpleNamespace(status_code=200)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        response = await breaker.call_async(slow, timeout=1)
+        task.cancel()
+        return response, ticks
+
+    response, ticks = asyncio.run(main())
+    assert response.status_code == 200
+    assert ticks >= 5
+    assert breaker.state == CLOSED
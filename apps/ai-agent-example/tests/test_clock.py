@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from clock import MonotonicClock, TickClock
+
+
+def test_tick_clock_follows_tick_timestamps():
+    clock = TickClock(start=5.0)
+    assert clock.now() == 5.0
+    clock.observe(1_700_000_000_500)
+    assert clock.now() == 1_700_000_000.5
+    # Ticks without a timestamp leave the clock where it was
+    clock.observe(None)
+    clock.observe(0)
+    assert clock.now() == 1_700_000_000.5
+
+
+def test_tick_clock_readings_are_wall_time():
+    clock = TickClock()
+    assert clock.to_wall(1_700_000_000.5) == 1_700_000_000.5
+    assert clock.from_wall(1_700_000_000.5) == 1_700_000_000.5
+
+
+def test_monotonic_clock_ignores_tick_timestamps():
+    clock = MonotonicClock()
+    before = clock.now()
+    clock.observe(1_700_000_000_500)
+    assert before <= clock.now() < before + 1
+
+
+def test_monotonic_clock_wall_time_round_trip():
+    clock = MonotonicClock()
+    assert clock.to_wall(clock.now()) == pytest.approx(time.time(), abs=0.05)
+    assert clock.from_wall(time.time()) == pytest.approx(clock.now(), abs=0.05)
+    reading = clock.now() - 30
+    assert clock.from_wall(clock.to_wall(reading)) == pytest.approx(reading, abs=1e-3)
+
+
+def test_threaded_agent_times_trades_on_its_clock():
+    ai_agent = pytest.importorskip("ai_agent")
+    clock = TickClock()
+    agent = ai_agent.MomentumAgent("0xclock", clock=clock)
+    assert agent.trade_interval_elapsed()  # never traded
+
+    clock.observe(100_000)
+    agent.last_trade_time = clock.now()
+    clock.observe(100_000 + agent.min_trade_interval * 1000)
+    assert not agent.trade_interval_elapsed()
+    clock.observe(100_001 + agent.min_trade_interval * 1000)
+    assert agent.trade_interval_elapsed()
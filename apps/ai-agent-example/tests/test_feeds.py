@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from feeds import INITIAL_BALANCE_USD, FeedBook
+
+
+def test_feeds_start_on_assumed_session_defaults():
+    book = FeedBook(["0xa", "0xb"])
+    assert book.balance_usd.tolist() == [INITIAL_BALANCE_USD] * 2
+    assert not book.synced.any()
+    assert not book.can_sell(0)
+
+
+def test_first_reconcile_seeds_without_counting_drift():
+    book = FeedBook(["0xa"])
+    assert not book.reconcile(0, {"balanceUSD": 400.0, "balanceToken": 3.0})
+    assert book.balance_usd[0] == 400.0
+    assert book.can_sell(0)
+    assert book.synced[0]
+    assert book.drift_corrections == 0
+
+
+def test_reconcile_corrects_drift_after_seeding():
+    book = FeedBook(["0xa"])
+    book.reconcile(0, {"balanceUSD": 400.0, "balanceToken": 3.0})
+    assert not book.reconcile(0, {"balanceUSD": 400.0, "balanceToken": 3.0})
+    assert book.reconcile(0, {"balanceUSD": 400.0, "balanceToken": 0.0})
+    assert book.balance_token[0] == 0.0
+    assert (book.reconciliations, book.drift_corrections) == (3, 1)
+
+
+def test_trade_response_syncs_the_feed():
+    book = FeedBook(["0xa"])
+    book.apply_trade(0, {"balanceUSD": 750.0, "balanceToken": 2.5}, now=10.0)
+    assert book.synced[0]
+    assert book.trades[0] == 1
+    assert book.get_stats()[0]["balance_token"] == 2.5
+
+
+def test_ring_buffer_window_and_momentum():
+    book = FeedBook(["0xa"], capacity=4)
+    for price in (1.0, 2.0, 3.0, 4.0, 5.0, 6.0):
+        book.push(0, price)
+    assert book.window(0).tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert book.window(0, 2).tolist() == [5.0, 6.0]
+    assert book.momentum(0, 4) == pytest.approx(100.0)
+
+
+def test_agent_seeds_and_reconciles_every_feed():
+    server = pytest.importorskip("server")
+    agent = server.MomentumAgent("0xagent", feed_ids=["0xa", "0xb", "0xc"])
+    states = {
+        "0xa": {"user": {"portfolio": {"balanceUSD": 10.0, "balanceToken": 1.0}}},
+        "0xc": {"user": {"portfolio": {"balanceUSD": 30.0, "balanceToken": 0.0}}},
+    }
+
+    async def fetch_state(user_id=None):
+        return states.get(user_id)  # 0xb is unreachable
+
+    agent.fetch_state = fetch_state
+    assert asyncio.run(agent.reconcile_feeds()) == [1]
+    assert agent.feeds.balance_usd.tolist() == [10.0, INITIAL_BALANCE_USD, 30.0]
+    assert agent.feeds.synced.tolist() == [True, False, True]
+
+    states["0xb"] = {"user": {"portfolio": {"balanceUSD": 20.0, "balanceToken": 5.0}}}
+    asyncio.run(agent.seed_feeds(attempts=1))
+    assert agent.feeds.synced.all()
+    assert agent.feeds.balance_token[1] == 5.0
@@ -0,0 +1,96 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from history import HistoryStore
+
+
+def fill(store: HistoryStore, n: int, t0: float = 0.0, trade_every: int = 0):
+    for i in range(n):
+        trade = None
+        if trade_every and i % trade_every == 0:
+            trade = "buy" if (i // trade_every) % 2 == 0 else "sell"
+        store.record(t0 + i, 100.0 + i, 1000.0 + i, trade)
+
+
+def test_downsampling_keeps_every_tick_and_trade_counted():
+    store = HistoryStore(points=20, tiers=3, factor=4, trades=10)
+    fill(store, 5000, trade_every=7)
+    rows = store.rows()
+    assert len(rows) <= 3 * 20
+    result = store.query(limit=100)
+    points = result["points"]
+    assert sum(points["ticks"]) == 5000
+    assert sum(points["buys"]) + sum(points["sells"]) == store.total_trades == len(range(0, 5000, 7))
+    assert sum(points["buys"]) == len(range(0, 5000, 14))
+
+
+def test_buckets_keep_extremes_and_close():
+    store = HistoryStore(points=4, tiers=2, factor=2)
+    for t, price in enumerate([1.0, 9.0, 2.0, 3.0, 4.0, 5.0]):
+        store.record(float(t), price, price)
+    points = store.query()["points"]
+    # The first two ticks were merged into one bucket
+    assert points["ticks"][0] == 2
+    assert (points["price"][0], points["price_min"][0], points["price_max"][0]) == (9.0, 1.0, 9.0)
+    assert points["start"][0] == 0.0 and points["time"][0] == 1.0
+
+
+def test_seq_strictly_increases_through_tiers():
+    store = HistoryStore(points=10, tiers=3, factor=3)
+    fill(store, 1234)
+    seq = store.query()["points"]["seq"]
+    assert seq == sorted(set(seq))
+    assert seq[-1] == 1234
+
+
+def test_paging_does_not_skip_ticks_sharing_a_timestamp():
+    store = HistoryStore(points=1000)
+    for i in range(30):
+        store.record(float(i // 10), 1.0, 1.0)  # ten ticks per timestamp
+
+    seen, after = [], None
+    while True:
+        page = store.query(limit=7, after=after)
+        seen.extend(page["points"]["seq"])
+        after = page["next_after"]
+        if after is None:
+            break
+    assert seen == list(range(1, 31))
+
+
+def test_paging_survives_compaction_between_pages():
+    store = HistoryStore(points=10, tiers=2, factor=2)
+    fill(store, 10)
+    first = store.query(limit=4)
+    fill(store, 10, t0=10.0)  # compacts the tier the cursor points into
+
+    rest, after = [], first["next_after"]
+    while after is not None:
+        page = store.query(limit=4, after=after)
+        rest.append(page)
+        after = page["next_after"]
+
+    ticks = sum(first["points"]["ticks"]) + sum(sum(p["points"]["ticks"]) for p in rest)
+    # Merged buckets may repeat across the boundary, but nothing is lost
+    assert ticks >= 20
+    assert rest[-1]["points"]["seq"][-1] == 20
+
+
+def test_trades_are_not_repeated_across_pages():
+    store = HistoryStore(points=1000)
+    for i in range(6):
+        store.record(0.0, 1.0, 1.0, "buy")  # every tick a trade, same timestamp
+    first = store.query(limit=3)
+    second = store.query(limit=3, after=first["next_after"])
+    assert len(first["trades"]) == len(second["trades"]) == 3
+
+
+def test_time_range_and_rebucketing():
+    store = HistoryStore(points=1000)
+    fill(store, 100)
+    window = store.query(since=49.0, until=59.0)
+    assert window["points"]["time"] == [float(t) for t in range(50, 60)]
+    coarse = store.query(max_points=10)
+    assert coarse["count"] <= 10
+    assert sum(coarse["points"]["ticks"]) == 100
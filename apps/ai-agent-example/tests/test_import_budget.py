@@ -0,0 +1,15 @@
+import pytest
+
+import import_budget
+
+
+@pytest.mark.parametrize(
+    "module, directory, budget, setup",
+    import_budget.BUDGETS,
+    ids=[entry[0] for entry in import_budget.BUDGETS],
+)
+def test_import_within_budget(module, directory, budget, setup):
+    report = import_budget.measure(module, directory, setup)
+    assert "error" not in report, report.get("error")
+    assert report["loaded"] == [], f"{module} eagerly imported {report['loaded']}"
+    assert report["ms"] <= budget, f"{module} took {report['ms']:.1f} ms (budget {budget:.0f} ms)"
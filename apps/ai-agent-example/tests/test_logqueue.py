@@ -0,0 +1,61 @@
+import logging
+import queue
+from types import SimpleNamespace
+
+import logqueue
+from logqueue import CallSiteRateLimitFilter, DroppingQueueHandler
+
+
+def record(level=logging.WARNING, lineno=10, msg="backend slow"):
+    return logging.LogRecord("agent", level, "server.py", lineno, msg, None, None)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(record(logging.INFO))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_records_are_queued_unformatted():
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.handle(logging.LogRecord("agent", logging.INFO, "server.py", 1, "price %s", (1.5,), None))
+    queued = handler.queue.get_nowait()
+    assert (queued.msg, queued.args) == ("price %s", (1.5,))
+
+
+def test_rate_limit_allows_a_burst_per_call_site(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logqueue, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    limiter = CallSiteRateLimitFilter(burst=2, window=10.0)
+
+    assert [limiter.filter(record()) for _ in range(5)] == [True, True, False, False, False]
+    assert limiter.filter(record(lineno=20))  # another call site has its own burst
+    assert all(limiter.filter(record(logging.INFO)) for _ in range(5))  # below WARNING
+    assert limiter.suppressed == 3
+
+    # A new window lets the site through again and reports what was skipped
+    now[0] += 10.0
+    reopened = record()
+    assert limiter.filter(reopened)
+    assert reopened.msg == "backend slow (+3 similar suppressed)"
+    assert limiter.filter(record())
+    assert not limiter.filter(record())
+
+
+def test_stats_report_queue_depth_drops_and_rate_limiting(monkeypatch):
+    monkeypatch.setattr(logqueue, "_handler", None)
+    assert logqueue.get_stats() == {"mode": "sync"}
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    limiter = CallSiteRateLimitFilter(burst=1)
+    handler.addFilter(limiter)
+    monkeypatch.setattr(logqueue, "_handler", handler)
+    monkeypatch.setattr(logqueue, "_filter", limiter)
+
+    handler.handle(record(logging.INFO))
+    handler.handle(record(logging.INFO))  # queue full
+    handler.handle(record())  # queue full, counted as a drop
+    handler.handle(record())  # over the burst, never reaches the queue
+    assert logqueue.get_stats() == {"mode": "queued", "queued": 1, "dropped": 2, "rate_limited": 1}
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from looplag import LoopLagMonitor
+
+
+def test_samples_lag_and_records_a_stall():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1)
+
+    async def main():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)  # block the loop
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(main())
+    assert monitor.get_stats()["samples"] > 0
+    assert monitor.stall_count == 1
+    assert "test_looplag" in monitor.stalls[-1]["stack"]
+
+
+def test_stop_ends_the_watchdog():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+
+    async def main():
+        monitor.start()
+        watchdog = monitor._watchdog
+        await asyncio.sleep(0.02)
+        monitor.stop()
+        return watchdog
+
+    watchdog = asyncio.run(main())
+    assert not watchdog.is_alive()
+    time.sleep(0.2)
+    assert monitor.stall_count == 0
+
+
+def test_stop_after_the_loop_has_closed():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+
+    async def main():
+        monitor.start()
+        await asyncio.sleep(0.02)
+        return monitor._watchdog
+
+    watchdog = asyncio.run(main())
+    time.sleep(0.2)  # long enough for a stale heartbeat to look like a stall
+    assert monitor.stall_count == 0
+    assert not watchdog.is_alive()
+    monitor.stop()
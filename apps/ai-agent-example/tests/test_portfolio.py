@@ -0,0 +1,81 @@
+from portfolio import INITIAL_BALANCE_USD, PortfolioMirror
+
+BACKEND = {
+    "balanceUSD": 750.0,
+    "balanceToken": 2.5,
+    "realizedPnl": -12.5,
+    "entryPrice": 100.0,
+    "totalTrades": 1,
+}
+
+
+def test_starts_with_the_backend_session_portfolio():
+    mirror = PortfolioMirror()
+    assert mirror.balance_usd == INITIAL_BALANCE_USD
+    assert mirror.balance_token == 0.0
+    assert mirror.entry_price is None
+    assert not mirror.synced
+
+
+def test_apply_copies_the_backend_portfolio():
+    mirror = PortfolioMirror()
+    assert mirror.apply(BACKEND)
+    assert mirror.to_dict() == BACKEND
+    assert mirror.synced
+
+
+def test_apply_keeps_fields_missing_from_a_partial_portfolio():
+    mirror = PortfolioMirror()
+    mirror.apply(BACKEND)
+    mirror.apply({"balanceUSD": 500.0, "entryPrice": None})
+    assert mirror.balance_usd == 500.0
+    assert mirror.balance_token == 2.5
+    assert mirror.entry_price is None
+    assert mirror.total_trades == 1
+
+
+def test_apply_ignores_an_empty_portfolio():
+    mirror = PortfolioMirror()
+    assert not mirror.apply(None)
+    assert not mirror.apply({})
+    assert not mirror.synced
+
+
+def test_reconcile_without_drift_only_counts_the_check():
+    mirror = PortfolioMirror()
+    mirror.apply(BACKEND)
+    assert not mirror.reconcile(dict(BACKEND))
+    assert mirror.reconciliations == 1
+    assert mirror.drift_corrections == 0
+
+
+def test_reconcile_corrects_drift():
+    mirror = PortfolioMirror()
+    mirror.apply(BACKEND)
+    mirror.balance_token = 0.0  # e.g. a sell the mirror thinks went through
+    assert mirror.reconcile(BACKEND)
+    assert mirror.balance_token == 2.5
+    assert mirror.drift_corrections == 1
+
+
+def test_reconcile_ignores_float_noise():
+    mirror = PortfolioMirror()
+    mirror.apply(BACKEND)
+    assert not mirror.reconcile({**BACKEND, "balanceUSD": 750.0 + 1e-12})
+
+
+def test_reconcile_detects_a_missed_trade():
+    mirror = PortfolioMirror()
+    mirror.apply(BACKEND)
+    assert mirror.reconcile({**BACKEND, "totalTrades": 2})
+
+
+def test_pre_filter_follows_the_mirrored_balances():
+    mirror = PortfolioMirror(difficulty="pro")
+    mirror.reset()
+    assert mirror.allows("buy", 100.0)
+    assert not mirror.allows("sell", 100.0)  # nothing to sell yet
+    mirror.apply({"balanceUSD": 0.0, "balanceToken": 1.0})
+    assert not mirror.allows("buy", 100.0)
+    assert mirror.allows("panic", 100.0)
+    assert mirror.trades_blocked == 2
@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pricegen import DOWN, PRICE_FLOOR, RUG, SIDEWAYS, UP, WHALE, PriceGenerator
+
+SESSION = 600
+# The exact floor path works in log space, so floored prices can round just above 0.01
+AT_FLOOR = PRICE_FLOOR * (1 + 1e-9)
+
+
+def generate(seed=7, n=120_000, **kwargs):
+    generator = PriceGenerator(
+        difficulty="pro", seed=seed, session_ticks=SESSION, start_timestamp=0, **kwargs
+    )
+    return generator.generate(n)
+
+
+def test_same_seed_same_ticks():
+    assert generate().tobytes() == generate().tobytes()
+    assert generate().tobytes() != generate(seed=8).tobytes()
+
+
+def test_timestamps_step_by_the_tick_interval():
+    ticks = generate(n=70_000)
+    assert ticks["timestamp"].tolist() == list(range(1000, 70_001_000, 1000))
+
+
+def test_prices_never_go_below_the_floor():
+    prices = generate()["price"].reshape(-1, SESSION)
+    assert prices.min() >= PRICE_FLOOR
+    # pro sessions do hit the floor, so the exact floor path is exercised
+    assert (prices.min(axis=1) < AT_FLOOR).any()
+
+
+def test_trend_follows_the_percent_change():
+    ticks = generate().reshape(-1, SESSION)
+    prices = ticks["price"]
+    previous = np.empty_like(prices)
+    previous[:, 0] = 1.0  # every session opens at initial_price
+    previous[:, 1:] = prices[:, :-1]
+    change = (prices - previous) / prices
+
+    # Floored sessions and whale/rug ticks follow other rules; skip values
+    # within rounding of the +-0.5% bounds
+    plain = (prices.min(axis=1) >= AT_FLOOR)[:, None] & (ticks["trend"] < WHALE)
+    plain &= np.abs(np.abs(change) - 0.005) > 1e-9
+    expected = np.where(change >= 0.005, UP, np.where(change <= -0.005, DOWN, SIDEWAYS))
+    assert plain.sum() > 100_000
+    assert np.array_equal(ticks["trend"][plain], expected[plain])
+
+
+def test_disabled_patterns_never_show_up():
+    trends = generate(patterns={"whale": False, "rug": False})["trend"]
+    assert not np.isin(trends, [WHALE, RUG]).any()
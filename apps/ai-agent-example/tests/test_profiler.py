@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from collections import Counter
+
+import pytest
+
+import profiler
+
+COUNTS = Counter({"thread:main;run (a.py:1);tick (b.py:2)": 3, "task:feed;listen (c.py:3)": 1})
+
+
+def test_collapse_renders_one_stack_per_line_hottest_first():
+    assert profiler.collapse(COUNTS) == (
+        "thread:main;run (a.py:1);tick (b.py:2) 3\n"
+        "task:feed;listen (c.py:3) 1\n"
+    )
+
+
+def test_summary_counts_samples_per_stack():
+    summary = profiler.summarize(COUNTS, seconds=2.0, interval=0.01)
+    assert summary == {
+        "seconds": 2.0,
+        "interval": 0.01,
+        "samples": 4,
+        "stacks": [
+            {"stack": "thread:main;run (a.py:1);tick (b.py:2)", "count": 3},
+            {"stack": "task:feed;listen (c.py:3)", "count": 1},
+        ],
+    }
+
+
+def test_sample_collapses_a_thread_stack_outer_to_inner():
+    release = threading.Event()
+
+    def parked_worker():
+        release.wait(5)
+
+    worker = threading.Thread(target=parked_worker, name="parked")
+    worker.start()
+    try:
+        counts = profiler.sample(0.05, interval=0.01)
+    finally:
+        release.set()
+        worker.join()
+
+    stacks = [stack for stack in counts if stack.startswith("thread:parked;")]
+    assert stacks
+    frames = [frame.split(" (")[0] for frame in stacks[0].split(";")[1:]]
+    # Outermost frame first: the thread bootstrap, then our target, then the wait
+    assert frames[0] == "Thread._bootstrap"
+    worker_at = next(i for i, name in enumerate(frames) if name.endswith(".parked_worker"))
+    assert frames[worker_at + 1] == "Event.wait"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = pytest.importorskip("server")
+    monkeypatch.setattr(server, "DEBUG_TOKEN", "s3cret")
+    monkeypatch.setattr(profiler, "sample", lambda seconds, loop: COUNTS)
+    return server
+
+
+def profile(server, authorization, output="json"):
+    return asyncio.run(server.debug_profile(seconds=1.0, output=output, authorization=authorization))
+
+
+@pytest.mark.parametrize("authorization", [None, "", "Bearer wrong", "s3cre"], ids=["missing", "empty", "wrong", "prefix"])
+def test_profile_rejects_a_missing_or_wrong_token(server, authorization):
+    with pytest.raises(server.HTTPException) as error:
+        profile(server, authorization)
+    assert error.value.status_code == 401
+
+
+def test_profile_is_disabled_without_a_debug_token(server, monkeypatch):
+    monkeypatch.setattr(server, "DEBUG_TOKEN", "")
+    with pytest.raises(server.HTTPException) as error:
+        profile(server, "Bearer s3cret")
+    assert error.value.status_code == 404
+
+
+def test_profile_returns_the_json_summary_for_a_valid_token(server):
+    assert profile(server, "Bearer s3cret")["samples"] == 4
+    assert profile(server, "s3cret", output="collapsed").body == profiler.collapse(COUNTS).encode()
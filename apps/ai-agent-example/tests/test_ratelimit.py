@@ -0,0 +1,53 @@
+import asyncio
+
+from ratelimit import BUY, INFO, PANIC, SELL, RateLimiter, priority_for_trade
+
+
+def drained(rate=1.0, burst=10.0) -> RateLimiter:
+    """A limiter with an empty bucket that refills too slowly to matter in a test"""
+    limiter = RateLimiter(rate=rate, burst=burst, max_wait={SELL: 0.0, BUY: 0.0})
+    limiter._tokens = 0.0
+    return limiter
+
+
+def test_trade_types_map_to_priorities():
+    assert priority_for_trade("panic") == PANIC
+    assert priority_for_trade("sell") == SELL
+    assert priority_for_trade("buy") == BUY
+    assert priority_for_trade("state") == INFO
+
+
+def test_reserves_shed_lower_classes_first():
+    limiter = RateLimiter(rate=0.001, burst=10.0, max_wait={SELL: 0.0, BUY: 0.0})
+    # 10 tokens: info must leave 5 behind, buy 2, sell none
+    assert [limiter.acquire(INFO) for _ in range(6)] == [True] * 5 + [False]
+    assert [limiter.acquire(BUY) for _ in range(4)] == [True] * 3 + [False]
+    assert [limiter.acquire(SELL) for _ in range(3)] == [True, True, False]
+    assert limiter.granted == {PANIC: 0, SELL: 2, BUY: 3, INFO: 5}
+    assert limiter.shed == {PANIC: 0, SELL: 1, BUY: 1, INFO: 1}
+
+
+def test_panic_is_never_shed():
+    limiter = drained()
+    assert all(limiter.acquire(PANIC) for _ in range(5))
+    assert limiter.granted[PANIC] == 5
+    assert limiter.shed[PANIC] == 0
+    # Panics borrowed from the future; everyone else waits for the debt
+    assert not limiter.acquire(SELL)
+
+
+def test_sell_waits_for_a_token_within_max_wait():
+    limiter = RateLimiter(rate=100.0, burst=1.0, max_wait={SELL: 0.5})
+    limiter._tokens = 0.0
+    assert limiter.acquire(SELL)
+    assert limiter.shed[SELL] == 0
+
+
+def test_async_acquire_sheds_like_the_blocking_one():
+    limiter = drained()
+
+    async def main():
+        return await limiter.acquire_async(BUY), await limiter.acquire_async(PANIC)
+
+    assert asyncio.run(main()) == (False, True)
+    assert limiter.shed[BUY] == 1
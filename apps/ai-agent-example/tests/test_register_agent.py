@@ -0,0 +1,153 @@
+import argparse
+import csv
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+
+import register_agent
+from register_agent import RegistrationCache, load_manifest
+
+OWNER = "0xowner"
+REGISTERED = (200, {"success": True, "agent": {"agentId": "agent-1"}})
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Answers each wallet's POSTs from a script of (status, body) replies"""
+
+    def __init__(self, replies=None):
+        self.replies = replies or {}
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def post(self, url, json, timeout):
+        with self._lock:
+            self.posts.append((url, json))
+            script = self.replies.get(json.get("walletAddress"), [REGISTERED])
+            status, body = script.pop(0) if len(script) > 1 else script[0]
+        return FakeResponse(status, body)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    slept = []
+    fake_time = SimpleNamespace(sleep=slept.append, time=time.time, perf_counter=time.perf_counter)
+    monkeypatch.setattr(register_agent, "time", fake_time)
+    return slept
+
+
+def run_bulk(monkeypatch, tmp_path, manifest, session, output="results.json"):
+    args = argparse.Namespace(
+        manifest=str(manifest), cache=str(tmp_path / ".register_cache.json"),
+        output=str(tmp_path / output), concurrency=4, retries=3,
+        start_session=False, difficulty="pro",
+    )
+    monkeypatch.setattr(register_agent, "make_session", lambda concurrency: session)
+    register_agent.run_bulk(args)
+    return args
+
+
+def test_csv_manifest_maps_snake_case_columns(tmp_path):
+    path = tmp_path / "agents.csv"
+    path.write_text(
+        "name,wallet_address,owner_address,agent_url\n"
+        "Bot A , 0xA ,0xowner,http://a\n"
+        "Bot B,0xB,,\n"
+    )
+    assert load_manifest(str(path)) == [
+        {"name": "Bot A", "walletAddress": "0xA", "ownerAddress": "0xowner",
+         "agentUrl": "http://a", "strategy": register_agent.STRATEGY},
+        {"name": "Bot B", "walletAddress": "0xB", "ownerAddress": register_agent.OWNER_ADDRESS,
+         "strategy": register_agent.STRATEGY},
+    ]
+
+
+@pytest.mark.parametrize("wrap", [False, True], ids=["list", "agents-key"])
+def test_json_manifest_accepts_camel_case(tmp_path, wrap):
+    agents = [{"name": "Bot A", "walletAddress": "0xA", "ownerAddress": OWNER, "strategy": "mean"}]
+    path = tmp_path / "agents.json"
+    path.write_text(json.dumps({"agents": agents} if wrap else agents))
+    assert load_manifest(str(path)) == agents
+
+
+def test_cached_wallets_are_skipped(monkeypatch, tmp_path):
+    cache = RegistrationCache(str(tmp_path / ".register_cache.json"))
+    cache.add("0xA", {"agentId": "agent-0"})
+    cache.save()
+    manifest = tmp_path / "agents.json"
+    manifest.write_text(json.dumps([
+        {"name": "Bot A", "walletAddress": "0XA", "ownerAddress": OWNER},
+        {"name": "Bot B", "walletAddress": "0xB", "ownerAddress": OWNER},
+    ]))
+
+    session = FakeSession()
+    args = run_bulk(monkeypatch, tmp_path, manifest, session)
+    assert [body["walletAddress"] for _, body in session.posts] == ["0xB"]
+
+    results = {r["walletAddress"]: r for r in json.loads(open(args.output).read())}
+    assert results["0XA"]["status"] == "skipped"
+    assert results["0XA"]["agentId"] == "agent-0"
+    assert results["0xB"]["status"] == "registered"
+    # The new registration is persisted for the next run
+    assert RegistrationCache(args.cache).get("0xb")["agentId"] == "agent-1"
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_transient_statuses_are_retried(status, no_backoff):
+    session = FakeSession({"0xA": [(status, {"error": "busy"})] * 2 + [REGISTERED]})
+    assert register_agent.post_with_retry(session, "/register", {"walletAddress": "0xA"}) == (
+        200, REGISTERED[1], 3,
+    )
+    assert len(no_backoff) == 2
+
+
+def test_transient_status_gives_up_after_the_retries(no_backoff):
+    session = FakeSession({"0xA": [(503, {"error": "down"})]})
+    status, _, attempts = register_agent.post_with_retry(
+        session, "/register", {"walletAddress": "0xA"}, retries=2
+    )
+    assert (status, attempts) == (503, 3)
+
+
+@pytest.mark.parametrize("status", [400, 401, 404])
+def test_other_client_errors_are_not_retried(status, no_backoff):
+    session = FakeSession({"0xA": [(status, {"error": "bad"})]})
+    assert register_agent.post_with_retry(session, "/register", {"walletAddress": "0xA"})[::2] == (status, 1)
+    assert no_backoff == []
+
+
+def test_csv_output_has_one_row_per_wallet(monkeypatch, tmp_path):
+    manifest = tmp_path / "agents.csv"
+    manifest.write_text(
+        "name,walletAddress,ownerAddress\n"
+        "Bot A,0xA,0xowner\n"
+        "Bot B,0xB,0xowner\n"
+        "Bot C,,0xowner\n"
+    )
+    session = FakeSession({"0xB": [(400, {"error": "Agent already registered"})]})
+    with pytest.raises(SystemExit):  # the row without a wallet fails the run
+        run_bulk(monkeypatch, tmp_path, manifest, session, output="results.csv")
+
+    with open(tmp_path / "results.csv", newline="") as f:
+        rows = {row["name"]: row for row in csv.DictReader(f)}
+    assert rows["Bot A"]["status"] == "registered"
+    assert rows["Bot B"]["status"] == "already_registered"
+    assert rows["Bot C"]["status"] == "failed"
+    assert rows["Bot C"]["error"] == "Missing fields: walletAddress"
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("server")
+
+import audit
+import replay
+from pricegen import PriceGenerator
+
+
+def record_session(directory: str, ticks: int = 3000):
+    """Run the agent's per-tick logic over synthetic ticks with an audit log attached"""
+    generator = PriceGenerator(difficulty="pro", seed=11, session_ticks=600, start_timestamp=0)
+    data = generator.generate(ticks)
+    agent = replay.ReplayAgent()
+    agent.audit = audit.AuditWriter(directory, flush_interval=3600)
+
+    async def main():
+        for price, timestamp, _ in data.tolist():
+            agent.price_history.append(price)
+            await agent.evaluate_tick(price, 1_700_000_000_000 + timestamp)
+
+    asyncio.run(main())
+    agent.audit.close()
+    return agent
+
+
+def test_replaying_an_audit_log_reproduces_every_decision(tmp_path):
+    live = record_session(str(tmp_path))
+    recorded = audit.load(str(tmp_path))
+    assert len(recorded["decision"]) == 3000
+    assert live.stats["trades_executed"] > 0
+
+    report = asyncio.run(replay.replay(recorded["price"], recorded["timestamp"] * 1000))
+    decisions = np.frombuffer(report["decisions"], dtype=np.uint8)
+    assert np.array_equal(decisions, recorded["decision"])
+    assert report["trades"] == live.stats["trades_executed"]
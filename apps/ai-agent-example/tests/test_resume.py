@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+server = pytest.importorskip("server")
+
+
+@pytest.fixture
+def agent():
+    agent = server.MomentumAgent("0xresume")
+    assert agent.restore_snapshot(
+        {"wallet_address": "0xresume", "session_started": True, "has_tokens": True}
+    )
+    agent.bootstrapped = 0
+
+    async def bootstrap():
+        agent.bootstrapped += 1
+        return True
+
+    agent.bootstrap = bootstrap
+    return agent
+
+
+def resume_with(agent, state):
+    async def fetch_state():
+        return state
+
+    agent.fetch_state = fetch_state
+    return asyncio.run(agent.verify_resume())
+
+
+def test_confirmed_resume_keeps_trading(agent):
+    assert resume_with(agent, {"user": {"portfolio": {"balanceUSD": 900.0}}})
+    assert agent.bootstrapped == 0
+    assert agent.session_started
+    assert agent.portfolio.balance_usd == 900.0
+
+
+@pytest.mark.parametrize("state", [None, {"user": None}], ids=["unreachable", "unknown-session"])
+def test_unconfirmed_resume_starts_a_new_session(agent, state):
+    assert resume_with(agent, state)
+    assert agent.bootstrapped == 1
+    assert not agent.session_started  # the stub bootstrap doesn't start one
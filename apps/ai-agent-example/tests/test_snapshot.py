@@ -0,0 +1,83 @@
+import struct
+import time
+
+import pytest
+
+from snapshot import HEADER, MAX_PAYLOAD, SLOT_SIZE, SnapshotFile, SnapshotTooLarge
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    snapshots = SnapshotFile(str(tmp_path / "agent.snapshot"))
+    yield snapshots
+    snapshots.close()
+
+
+def newest_offset(snapshots: SnapshotFile) -> int:
+    return (snapshots.seq % 2) * SLOT_SIZE
+
+
+def test_missing_file_has_no_snapshot(snapshots):
+    assert snapshots.load() is None
+
+
+def test_round_trip_keeps_the_newest_state(snapshots):
+    snapshots.write({"n": 1})
+    snapshots.write({"n": 2})
+    assert snapshots.load() == {"n": 2}
+    assert snapshots.writes == 2
+
+
+def test_corrupt_payload_falls_back_to_the_other_slot(snapshots):
+    snapshots.write({"n": 1})
+    snapshots.write({"n": 2})
+    start = newest_offset(snapshots) + HEADER.size
+    snapshots._mm[start : start + 1] = b"X"  # payload no longer matches its CRC
+    assert snapshots.load() == {"n": 1}
+
+
+def test_torn_write_falls_back_to_the_previous_snapshot(snapshots):
+    snapshots.write({"n": 1})
+    snapshots.write({"n": 2})
+    # A crash after invalidating the next slot and writing part of its payload
+    offset = ((snapshots.seq + 1) % 2) * SLOT_SIZE
+    snapshots._mm[offset : offset + 4] = b"\0\0\0\0"
+    snapshots._mm[offset + HEADER.size : offset + HEADER.size + 4] = b'{"n"'
+    assert snapshots.load() == {"n": 2}
+
+
+def test_header_with_impossible_length_is_ignored(snapshots):
+    snapshots.write({"n": 1})
+    snapshots.write({"n": 2})
+    offset = newest_offset(snapshots)
+    struct.pack_into("<I", snapshots._mm, offset + 20, MAX_PAYLOAD + 1)
+    assert snapshots.load() == {"n": 1}
+
+
+def test_reopened_file_continues_the_sequence(tmp_path):
+    path = str(tmp_path / "agent.snapshot")
+    first = SnapshotFile(path)
+    for n in range(3):
+        first.write({"n": n})
+    first.close()
+
+    second = SnapshotFile(path)
+    assert second.load() == {"n": 2}
+    second.write({"n": 3})
+    assert second.seq == 4
+    assert second.load() == {"n": 3}
+    second.close()
+
+
+def test_stale_snapshot_is_ignored(snapshots, monkeypatch):
+    snapshots.write({"n": 1})
+    monkeypatch.setattr(time, "time", lambda: snapshots.last_write_at + 301)
+    assert snapshots.load(max_age=300) is None
+    assert snapshots.load() == {"n": 1}
+
+
+def test_oversized_state_is_rejected_without_touching_the_file(snapshots):
+    snapshots.write({"n": 1})
+    with pytest.raises(SnapshotTooLarge):
+        snapshots.write({"blob": "x" * MAX_PAYLOAD})
+    assert snapshots.load() == {"n": 1}
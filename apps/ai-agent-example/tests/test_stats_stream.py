@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+
+from stats_stream import SUBSCRIBER_BUFFER, StatsBroadcaster
+
+
+def parse(frame: bytes):
+    """(event, payload) of one SSE frame"""
+    lines = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_publishes_are_coalesced_to_max_hz():
+    broadcaster = StatsBroadcaster(max_hz=10)
+
+    async def main():
+        stream = broadcaster.subscribe()
+        await stream.__anext__()  # snapshot
+        flusher = asyncio.create_task(broadcaster.run())
+        started = time.monotonic()
+        for price in range(100):
+            broadcaster.publish(last_price=price)
+            await asyncio.sleep(0.003)
+        await asyncio.sleep(0.15)  # let the last window flush
+        flusher.cancel()
+        await stream.aclose()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(main())
+    # At most one frame per 100 ms window, plus the immediate first flush
+    assert 2 <= broadcaster.frames_sent <= elapsed * 10 + 1
+    assert broadcaster.state["last_price"] == 99
+
+
+def test_deltas_carry_only_changed_fields():
+    broadcaster = StatsBroadcaster()
+
+    async def main():
+        stream = broadcaster.subscribe()
+        await stream.__anext__()
+        broadcaster.publish(last_price=100.0, is_connected=True)
+        broadcaster._flush()
+        first = await stream.__anext__()
+        broadcaster.publish(last_price=101.0, is_connected=True)
+        broadcaster._flush()
+        second = await stream.__anext__()
+        broadcaster.publish(is_connected=True)
+        broadcaster._flush()  # nothing changed: no frame at all
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert parse(first) == ("delta", {"last_price": 100.0, "is_connected": True})
+    assert parse(second) == ("delta", {"last_price": 101.0})
+    assert broadcaster.frames_sent == 2
+
+
+def test_lagging_viewer_is_resynced_with_a_snapshot():
+    broadcaster = StatsBroadcaster()
+    broadcaster.add_source(lambda: {"rsi": 42.0})
+
+    async def main():
+        stream = broadcaster.subscribe()
+        event, payload = parse(await stream.__anext__())
+        assert (event, payload) == ("snapshot", {"rsi": 42.0})
+        # The viewer stops reading while the buffer overflows
+        for price in range(SUBSCRIBER_BUFFER + 5):
+            broadcaster.publish(last_price=float(price))
+            broadcaster._flush()
+        frame = await stream.__anext__()
+        await stream.aclose()
+        return frame
+
+    event, payload = parse(asyncio.run(main()))
+    assert event == "snapshot"
+    assert payload == {"rsi": 42.0, "last_price": float(SUBSCRIBER_BUFFER + 4)}
+    assert broadcaster.resyncs == 1
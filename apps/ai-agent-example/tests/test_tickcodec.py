@@ -0,0 +1,81 @@
+import os
+import re
+import struct
+
+import pytest
+
+import tickcodec
+from tickcodec import TICK_SIZE, TRENDS, decode, encode
+
+TS_CODEC = os.path.join(
+    os.path.dirname(__file__), "..", "..", "backend", "src", "utils", "tickCodec.ts"
+)
+
+# One tick as backend encodeTicks(258, [{trend: "whale", timestamp: 1700000000000, price: 1.5}])
+# writes it: u8 version | u8 trend | u16le feed | f64le timestamp | f64le price
+GOLDEN = bytes.fromhex("01" "03" "0201" "00008056febc7842" "000000000000f83f")
+
+
+def ts_encode(feed: int, ticks) -> bytes:
+    """Field-by-field port of encodeTicks in tickCodec.ts"""
+    buffer = bytearray(TICK_SIZE * len(ticks))
+    for i, (price, timestamp, trend) in enumerate(ticks):
+        offset = i * TICK_SIZE
+        struct.pack_into("<B", buffer, offset, 1)
+        struct.pack_into("<B", buffer, offset + 1, TRENDS.index(trend) if trend in TRENDS else 255)
+        struct.pack_into("<H", buffer, offset + 2, feed)
+        struct.pack_into("<d", buffer, offset + 4, timestamp)
+        struct.pack_into("<d", buffer, offset + 12, price)
+    return bytes(buffer)
+
+
+def test_golden_frame():
+    assert encode(258, 1.5, 1_700_000_000_000.0, "whale") == GOLDEN
+    assert decode(GOLDEN) == [(258, 1.5, 1_700_000_000_000.0)]
+
+
+def test_layout_matches_the_backend_source():
+    if not os.path.exists(TS_CODEC):
+        pytest.skip("backend source not checked out")
+    with open(TS_CODEC) as f:
+        source = f.read()
+    assert f"TICK_VERSION = {tickcodec.TICK_VERSION};" in source
+    assert f"TICK_SIZE = {TICK_SIZE};" in source
+    codes = dict(re.findall(r"^\s+(\w+): (\d+),$", source, re.M))
+    assert {trend: int(code) for trend, code in codes.items()} == tickcodec.TREND_CODES
+
+
+@pytest.mark.parametrize("records", [1, 5, tickcodec.BULK_RECORDS + 1], ids=["single", "small", "bulk"])
+def test_round_trip(records):
+    pytest.importorskip("numpy")
+    ticks = [
+        (100.0 + i / 3, 1_700_000_000_000.0 + 1000 * i, TRENDS[i % len(TRENDS)])
+        for i in range(records)
+    ]
+    frame = ts_encode(7, ticks)
+    assert decode(frame) == [(7, price, timestamp) for price, timestamp, _ in ticks]
+    assert b"".join(encode(7, *tick) for tick in ticks) == frame
+
+
+def test_unknown_trend_is_encoded_as_255():
+    assert encode(0, 1.0, 0.0, "moon")[1] == 255
+    assert ts_encode(0, [(1.0, 0.0, "moon")]) == encode(0, 1.0, 0.0, "moon")
+
+
+@pytest.mark.parametrize(
+    "frame, message",
+    [(b"", "not a multiple"), (GOLDEN[:-1], "not a multiple"), (b"\x02" + GOLDEN[1:], "version 2")],
+    ids=["empty", "truncated", "future-version"],
+)
+def test_malformed_frames_are_rejected(frame, message):
+    with pytest.raises(ValueError, match=message):
+        decode(frame)
+
+
+def test_bulk_decode_is_a_view():
+    np = pytest.importorskip("numpy")
+    frame = ts_encode(1, [(2.0, 3.0, "up")] * 40)
+    ticks = tickcodec.decode_array(frame)
+    assert ticks.dtype.itemsize == TICK_SIZE
+    assert not ticks.flags.owndata
+    assert np.all(ticks["trend"] == 0)
@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import tuner
+from tuner import GRID, MIN_IMPROVEMENT, AdaptiveTuner, StrategyParams
+
+RSI_PERIOD = 14
+# Barely ever trades on the window below
+IDLE = StrategyParams(min_price_change=0.1, lookback_period=20, rsi_oversold=20, rsi_overbought=80)
+
+
+def window(ticks: int = 1500):
+    """Trending swings with noise: momentum pays, but not at every threshold"""
+    rng = np.random.default_rng(5)
+    t = np.arange(ticks)
+    return 100 * np.exp(0.08 * np.sin(t / 40) + 0.0004 * t + rng.normal(0, 0.002, ticks))
+
+
+def tune(agent, optimize=None, monkeypatch=None):
+    if optimize is not None:
+        monkeypatch.setattr(tuner, "optimize", optimize)
+    adaptive = AdaptiveTuner(min_ticks=100)
+    adaptive._executor = lambda: None  # the loop's default thread pool instead of a process
+    return adaptive, asyncio.run(adaptive.retune(agent, RSI_PERIOD))
+
+
+def make_agent(params=IDLE):
+    return SimpleNamespace(tune_history=deque(window()), params=params)
+
+
+def test_optimize_picks_the_best_grid_point():
+    prices = window()
+    best, best_score, baseline = tuner.optimize(prices, IDLE, RSI_PERIOD)
+
+    candidates = [
+        StrategyParams(*values)
+        for values in itertools.product(*GRID.values())
+        if values[2] < values[3]
+    ]
+    scores = [tuner.score(prices, candidate, RSI_PERIOD) for candidate in candidates]
+    assert best == candidates[int(np.argmax(scores))]
+    assert best_score == pytest.approx(max(scores))
+    assert baseline == pytest.approx(tuner.score(prices, IDLE, RSI_PERIOD))
+    assert best_score - baseline > MIN_IMPROVEMENT
+
+
+def test_better_params_are_swapped_in():
+    agent = make_agent()
+    adaptive, swapped = tune(agent)
+    assert swapped
+    assert agent.params == tuner.optimize(window(), IDLE, RSI_PERIOD)[0]
+    assert (adaptive.retunes, adaptive.swaps) == (1, 1)
+
+
+def test_no_swap_without_a_gain():
+    best = tuner.optimize(window(), IDLE, RSI_PERIOD)[0]
+    agent = make_agent(best)
+    adaptive, swapped = tune(agent)
+    assert not swapped
+    assert agent.params is best
+    assert adaptive.retunes == 1
+
+
+def test_no_swap_below_min_improvement(monkeypatch):
+    agent = make_agent()
+    other = IDLE._replace(lookback_period=5)
+
+    def optimize(prices, current, rsi_period):
+        return other, 0.5 + MIN_IMPROVEMENT / 2, 0.5
+
+    adaptive, swapped = tune(agent, optimize, monkeypatch)
+    assert not swapped
+    assert agent.params is IDLE
+    assert adaptive.swaps == 0
+
+
+def test_no_swap_if_params_changed_during_the_run(monkeypatch):
+    agent = make_agent()
+    elsewhere = IDLE._replace(min_price_change=0.02)
+    winner = IDLE._replace(lookback_period=5)
+
+    def optimize(prices, current, rsi_period):
+        agent.params = elsewhere  # e.g. set by hand while the worker ran
+        return winner, 1.0, 0.0
+
+    adaptive, swapped = tune(agent, optimize, monkeypatch)
+    assert not swapped
+    assert agent.params is elsewhere
+    assert adaptive.history[-1]["swapped"] is False
+
+
+def test_short_history_is_not_tuned():
+    agent = SimpleNamespace(tune_history=deque(window(50)), params=IDLE)
+    adaptive, swapped = tune(agent)
+    assert not swapped
+    assert adaptive.retunes == 0
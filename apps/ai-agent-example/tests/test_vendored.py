@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEVICE_DIR = os.path.join(HERE, "..", "adafruit-device")
+
+# Modules both apps carry a copy of (see each module's docstring)
+VENDORED = ["lazy.py", "ratelimit.py", "logqueue.py"]
+
+
+@pytest.mark.parametrize("name", VENDORED)
+def test_vendored_copies_match(name):
+    with open(os.path.join(HERE, name), "rb") as agent, open(os.path.join(DEVICE_DIR, name), "rb") as device:
+        assert agent.read() == device.read(), f"{name} differs between the agent and device apps"
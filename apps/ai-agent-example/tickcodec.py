@@ -0,0 +1,70 @@
+"""
+Compact binary price ticks (see backend/src/utils/tickCodec.ts)
+Clients that subscribe with {"encoding": "binary", "feed": n} receive price
+ticks as fixed 20-byte little-endian records instead of JSON text:
+
+    u8 version | u8 trend | u16 feed | f64 timestamp (ms) | f64 price
+
+A frame holds one or more records. Single-tick frames are decoded with
+struct; bulk frames (the session history burst) with one NumPy view.
+"""
+
+import struct
+from typing import List, Tuple
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+TICK_VERSION = 1
+TICK = struct.Struct("<BBHdd")
+TICK_SIZE = TICK.size  # 20 bytes
+TRENDS = ("up", "down", "sideways", "whale", "rug")
+TREND_CODES = {trend: code for code, trend in enumerate(TRENDS)}
+UNKNOWN_TREND = 255
+# Frames with more records than this are decoded with NumPy
+BULK_RECORDS = 32
+
+# Same layout as TICK, for decoding many records at once
+TICK_DTYPE = [
+    ("version", "u1"),
+    ("trend", "u1"),
+    ("feed", "<u2"),
+    ("timestamp", "<f8"),
+    ("price", "<f8"),
+]
+
+
+def subscribe_message(user_id: str, feed: int) -> dict:
+    """Subscribe request asking for binary ticks tagged with `feed`"""
+    return {"type": "subscribe", "userId": user_id, "encoding": "binary", "feed": feed}
+
+
+def encode(feed: int, price: float, timestamp: float, trend: str = "sideways") -> bytes:
+    """One tick as a binary frame (used by the stand-in backends)"""
+    return TICK.pack(TICK_VERSION, TREND_CODES.get(trend, UNKNOWN_TREND), feed, timestamp, price)
+
+
+def _check(frame: bytes):
+    if not frame or len(frame) % TICK_SIZE:
+        raise ValueError(f"Binary tick frame of {len(frame)} bytes is not a multiple of {TICK_SIZE}")
+    if frame[0] != TICK_VERSION:
+        raise ValueError(f"Unsupported binary tick version {frame[0]}")
+
+
+def decode_array(frame: bytes):
+    """All records of a frame as a NumPy structured array (a view, not a copy)"""
+    _check(frame)
+    return np.frombuffer(frame, dtype=np.dtype(TICK_DTYPE))
+
+
+def decode(frame: bytes) -> List[Tuple[int, float, float]]:
+    """(feed, price, timestamp) for every record in a frame"""
+    if len(frame) == TICK_SIZE and frame[0] == TICK_VERSION:
+        _, _, feed, timestamp, price = TICK.unpack(frame)
+        return [(feed, price, timestamp)]
+    if len(frame) > BULK_RECORDS * TICK_SIZE:
+        ticks = decode_array(frame)
+        return list(zip(ticks["feed"].tolist(), ticks["price"].tolist(), ticks["timestamp"].tolist()))
+    _check(frame)
+    return [(feed, price, timestamp) for _, _, feed, timestamp, price in TICK.iter_unpack(frame)]
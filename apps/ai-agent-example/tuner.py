@@ -0,0 +1,214 @@
+"""
+Online re-tuning of the momentum strategy thresholds
+On a schedule the agent hands its recent price window to a worker process,
+which backtests every combination in a small parameter grid with
+vectorized NumPy and returns the best one. The agent swaps the winning
+StrategyParams in with a single attribute assignment, so a tick always sees
+one consistent set and the event loop never waits on the optimization.
+
+The backtest is a long/flat proxy of the live agent: a buy signal goes
+long, a sell signal goes flat, and each switch pays TRADE_COST. The
+min_trade_interval cooldown and partial position sizing are ignored.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import itertools
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between re-tunes
+TUNE_INTERVAL = float(os.getenv("ADAPTIVE_INTERVAL", "300"))
+# Ticks of history each re-tune optimizes over
+TUNE_WINDOW = int(os.getenv("ADAPTIVE_WINDOW", "2000"))
+# Don't re-tune on fewer ticks than this
+TUNE_MIN_TICKS = int(os.getenv("ADAPTIVE_MIN_TICKS", "300"))
+# Log-return cost charged per position switch in the backtest
+TRADE_COST = 0.001
+# A candidate must beat the running parameters by this much to be swapped in
+MIN_IMPROVEMENT = 0.001
+
+GRID = {
+    "min_price_change": (0.005, 0.01, 0.02, 0.05, 0.1),
+    "lookback_period": (5, 10, 20),
+    "rsi_oversold": (20, 30, 40),
+    "rsi_overbought": (60, 70, 80),
+}
+
+
+class StrategyParams(NamedTuple):
+    """Thresholds read by MomentumAgent on every tick (immutable, swapped whole)"""
+
+    min_price_change: float
+    lookback_period: int
+    rsi_oversold: float
+    rsi_overbought: float
+
+
+def _rsi_series(prices, period: int):
+    """RSI at every index, as MomentumAgent.calculate_rsi computes it (50 before warm-up)"""
+    import numpy as np
+
+    deltas = np.diff(prices)
+    gains = np.concatenate(([0.0], np.cumsum(np.where(deltas > 0, deltas, 0))))
+    losses = np.concatenate(([0.0], np.cumsum(np.where(deltas < 0, -deltas, 0))))
+
+    rsi = np.full(len(prices), 50.0)
+    if len(prices) > period:
+        avg_gain = (gains[period:] - gains[:-period]) / period
+        avg_loss = (losses[period:] - losses[:-period]) / period
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi[period:] = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    return rsi
+
+
+def _momentum_series(prices, lookback: int):
+    """Momentum (%) at every index from `lookback` prices (0 before warm-up)"""
+    import numpy as np
+
+    momentum = np.zeros(len(prices))
+    if len(prices) >= lookback:
+        start = prices[: len(prices) - lookback + 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            momentum[lookback - 1 :] = (prices[lookback - 1 :] - start) / start * 100
+    return momentum
+
+
+def score(prices, params: StrategyParams, rsi_period: int, rsi=None) -> float:
+    """Log return of the long/flat backtest of `params` over `prices`"""
+    import numpy as np
+
+    if rsi is None:
+        rsi = _rsi_series(prices, rsi_period)
+    momentum = _momentum_series(prices, params.lookback_period)
+    ready = np.arange(len(prices)) >= params.lookback_period - 1
+
+    buy = ready & (momentum > params.min_price_change) & (rsi < params.rsi_overbought)
+    sell = ready & ~buy & (momentum < -params.min_price_change) & (rsi > params.rsi_oversold)
+
+    # Position after each tick: the last signal wins, flat before the first
+    signal_at = np.where(buy | sell, np.arange(len(prices)), -1)
+    last = np.maximum.accumulate(signal_at)
+    position = np.where(last >= 0, buy[np.maximum(last, 0)], False).astype(np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(prices))
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    switches = np.count_nonzero(np.diff(position, prepend=0.0))
+    return float(np.dot(position[:-1], returns) - TRADE_COST * switches)
+
+
+def optimize(prices, current: StrategyParams, rsi_period: int) -> Tuple[StrategyParams, float, float]:
+    """Best grid point for `prices`; returns (params, its score, current's score)
+
+    Runs in a worker process.
+    """
+    import numpy as np
+
+    prices = np.asarray(prices, dtype=np.float64)
+    rsi = _rsi_series(prices, rsi_period)
+    baseline = score(prices, current, rsi_period, rsi)
+
+    best, best_score = current, baseline
+    for values in itertools.product(*GRID.values()):
+        candidate = StrategyParams(*values)
+        if candidate.rsi_oversold >= candidate.rsi_overbought:
+            continue
+        result = score(prices, candidate, rsi_period, rsi)
+        if result > best_score:
+            best, best_score = candidate, result
+    return best, best_score, baseline
+
+
+class AdaptiveTuner:
+    """Periodically re-optimizes an agent's StrategyParams in a worker process"""
+
+    def __init__(self, interval: float = TUNE_INTERVAL, min_ticks: int = TUNE_MIN_TICKS):
+        self.interval = interval
+        self.min_ticks = min_ticks
+        self._pool = None  # ProcessPoolExecutor, created on first re-tune
+        self.retunes = 0
+        self.swaps = 0
+        self.failures = 0
+        self.last_retune_at: Optional[float] = None
+        self.last_retune_seconds: Optional[float] = None
+        self.last_score: Optional[float] = None
+        self.last_baseline: Optional[float] = None
+        self.history: List[Dict] = []
+
+    def _executor(self):
+        if self._pool is None:
+            # deferred: the worker pool machinery is only needed once tuning runs
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Spawn rather than fork so the worker inherits no sockets or event loop
+            self._pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def retune(self, agent, rsi_period: int) -> bool:
+        """Optimize on the agent's tuning window and swap in a better result"""
+        import numpy as np
+
+        if len(agent.tune_history) < self.min_ticks:
+            return False
+
+        prices = np.fromiter(agent.tune_history, dtype=np.float64, count=len(agent.tune_history))
+        current = agent.params
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            best, best_score, baseline = await loop.run_in_executor(
+                self._executor(), optimize, prices, current, rsi_period
+            )
+        except Exception as e:
+            self.failures += 1
+            logger.error("❌ Re-tune failed: %s", e)
+            return False
+
+        self.retunes += 1
+        self.last_retune_at = time.time()
+        self.last_retune_seconds = round(time.perf_counter() - started, 3)
+        self.last_score, self.last_baseline = round(best_score, 6), round(baseline, 6)
+
+        # The agent may have been re-tuned elsewhere meanwhile; only replace what we tuned
+        swapped = best != current and best_score - baseline > MIN_IMPROVEMENT and agent.params is current
+        if swapped:
+            agent.params = best
+            self.swaps += 1
+            logger.info(
+                "🎛️  Strategy re-tuned: %s (score %.4f -> %.4f)", best._asdict(), baseline, best_score
+            )
+        self.history.append(
+            {"at": self.last_retune_at, "seconds": self.last_retune_seconds, "swapped": swapped}
+        )
+        del self.history[:-20]
+        return swapped
+
+    async def run(self, agent, rsi_period: int):
+        """Re-tune every `interval` seconds (runs as a background task)"""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.retune(agent, rsi_period)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict:
+        return {
+            "interval": self.interval,
+            "retunes": self.retunes,
+            "swaps": self.swaps,
+            "failures": self.failures,
+            "last_retune_at": self.last_retune_at,
+            "last_retune_seconds": self.last_retune_seconds,
+            "last_score": self.last_score,
+            "last_baseline": self.last_baseline,
+            "recent": self.history,
+        }
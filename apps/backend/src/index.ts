@@ -30,6 +30,7 @@ import { createAccountAndAirdrop } from "./services/airdrop";
 import { type Address } from "viem";
 import { generateHistoricalPrices } from "./utils/historicalPrices";
 import { generateTradingSignals } from "./utils/indicators";
+import { framesFor, setFeedEncoding } from "./utils/tickCodec";
 import connectDB from "./db/connection";
 import Trade from "./models/Trade";
 import User from "./models/User";
@@ -40,7 +41,12 @@ import mongoose from "mongoose";
 
 const app = express();
 const server = createServer(app);
-const wss = new WebSocketServer({ server });
+// WS_PERMESSAGE_DEFLATE=1 compresses frames for clients that offer permessage-deflate
+const wss = new WebSocketServer({
+  server,
+  perMessageDeflate:
+    process.env.WS_PERMESSAGE_DEFLATE === "1" ? { threshold: 0 } : false,
+});
 
 app.use(cors());
 app.use(express.json());
@@ -101,6 +107,60 @@ const TradeRequestSchema = z.object({
   amount: z.number().optional(),
 });
 
+// Trades retried with the same Idempotency-Key get the original response
+// instead of executing twice (devices replay queued trades after outages)
+const IDEMPOTENCY_TTL_MS = 10 * 60 * 1000;
+const IDEMPOTENCY_MAX_KEYS = 10000;
+const idempotentResponses = new Map<
+  string,
+  { status: number; body: unknown; at: number }
+>();
+const idempotentInFlight = new Set<string>();
+
+app.use("/trade", (req, res, next) => {
+  const key = req.header("Idempotency-Key");
+  if (!key || req.method !== "POST") {
+    return next();
+  }
+
+  const cacheKey = `${req.path}:${key}`;
+  const cached = idempotentResponses.get(cacheKey);
+  if (cached && Date.now() - cached.at < IDEMPOTENCY_TTL_MS) {
+    res.setHeader("Idempotent-Replayed", "true");
+    return res.status(cached.status).json(cached.body);
+  }
+  if (idempotentInFlight.has(cacheKey)) {
+    return res
+      .status(409)
+      .json({ error: "A request with this Idempotency-Key is in progress" });
+  }
+
+  idempotentInFlight.add(cacheKey);
+  res.on("finish", () => idempotentInFlight.delete(cacheKey));
+  res.on("close", () => idempotentInFlight.delete(cacheKey));
+
+  const json = res.json.bind(res);
+  res.json = (body: unknown) => {
+    // Server errors may succeed on retry, so only remember final answers
+    if (res.statusCode < 500) {
+      idempotentResponses.delete(cacheKey);
+      idempotentResponses.set(cacheKey, {
+        status: res.statusCode,
+        body,
+        at: Date.now(),
+      });
+      if (idempotentResponses.size > IDEMPOTENCY_MAX_KEYS) {
+        const oldest = idempotentResponses.keys().next().value;
+        if (oldest !== undefined) {
+          idempotentResponses.delete(oldest);
+        }
+      }
+    }
+    return json(body);
+  };
+  next();
+});
+
 // REST Endpoints
 
 app.post("/trade/buy", async (req: express.Request, res: express.Response) => {
@@ -542,13 +602,21 @@ app.post(
     const userClients = clients.get(userId);
     if (userClients) {
       historicalPrices.forEach((tick) => {
-        const message = JSON.stringify({ type: "price", data: tick });
+        const message = JSON.stringify({ type: "price", userId, data: tick });
         userClients.forEach((client) => {
-          if (client.readyState === 1) {
+          if (client.readyState === 1 && !client.binaryFeeds?.has(userId)) {
             client.send(message);
           }
         });
       });
+      // Binary subscribers get the whole history in one frame
+      const historyFrame = framesFor(historicalPrices);
+      userClients.forEach((client) => {
+        const feed = client.binaryFeeds?.get(userId);
+        if (client.readyState === 1 && feed !== undefined) {
+          client.send(historyFrame(feed));
+        }
+      });
     }
 
     simulator.start((price: number, trend: TrendSignal) => {
@@ -617,6 +685,9 @@ wss.on("connection", (ws: any) => {
           clients.set(data.userId, new Set());
         }
         clients.get(data.userId)!.add(ws);
+
+        // Opt-in compact price ticks, tagged with the client's feed number
+        setFeedEncoding(ws, data.userId, data.encoding, data.feed);
       }
     } catch (error: unknown) {
       console.error("Error parsing WebSocket message:", error);
@@ -671,11 +742,21 @@ function broadcastPriceUpdate(userId: string, tick: PriceTick): void {
   // Broadcast to WebSocket clients
   const userClients = clients.get(userId);
   if (userClients) {
-    const message = JSON.stringify({ type: "price", data: tick });
+    // userId lets one connection multiplex several subscriptions; each
+    // encoding is serialized once per tick (binary once per feed number)
+    let message: string | undefined;
+    let frame: ((feed: number) => Buffer) | undefined;
     userClients.forEach((client) => {
       if (client.readyState === 1) {
         // OPEN
-        client.send(message);
+        const feed = client.binaryFeeds?.get(userId);
+        if (feed !== undefined) {
+          frame ??= framesFor([tick]);
+          client.send(frame(feed));
+        } else {
+          message ??= JSON.stringify({ type: "price", userId, data: tick });
+          client.send(message);
+        }
       }
     });
   }
@@ -684,7 +765,7 @@ function broadcastPriceUpdate(userId: string, tick: PriceTick): void {
 function broadcastDeviceSignal(userId: string, signal: DeviceSignal): void {
   const userClients = clients.get(userId);
   if (userClients) {
-    const message = JSON.stringify({ type: "device", data: signal });
+    const message = JSON.stringify({ type: "device", userId, data: signal });
     userClients.forEach((client) => {
       if (client.readyState === 1) {
         // OPEN
@@ -0,0 +1,76 @@
+import { PriceTick } from "@tradeOS/types";
+import {
+  BinarySubscriber,
+  TICK_SIZE,
+  TICK_VERSION,
+  TREND_CODES,
+  encodeTicks,
+  framesFor,
+  setFeedEncoding,
+} from "./tickCodec";
+
+const TICK: PriceTick = { price: 1.25, timestamp: 1700000000123, trend: "whale" };
+
+describe("encodeTicks", () => {
+  test("should write one 20-byte little-endian record per tick", () => {
+    const frame = encodeTicks(7, [TICK, { ...TICK, trend: "rug" }]);
+    expect(frame.length).toBe(2 * TICK_SIZE);
+    expect(frame.readUInt8(0)).toBe(TICK_VERSION);
+    expect(frame.readUInt8(1)).toBe(TREND_CODES.whale);
+    expect(frame.readUInt16LE(2)).toBe(7);
+    expect(frame.readDoubleLE(4)).toBe(TICK.timestamp);
+    expect(frame.readDoubleLE(12)).toBe(TICK.price);
+    expect(frame.readUInt8(TICK_SIZE + 1)).toBe(TREND_CODES.rug);
+  });
+});
+
+describe("framesFor", () => {
+  test("should encode each feed once and reuse the buffer", () => {
+    const frame = framesFor([TICK]);
+    const first = frame(3);
+    expect(frame(3)).toBe(first);
+    expect(first.equals(encodeTicks(3, [TICK]))).toBe(true);
+
+    const other = frame(4);
+    expect(other).not.toBe(first);
+    expect(other.readUInt16LE(2)).toBe(4);
+  });
+});
+
+describe("setFeedEncoding", () => {
+  test("should record the feed for a binary subscribe", () => {
+    const client: BinarySubscriber = {};
+    setFeedEncoding(client, "user-1", "binary", 9);
+    expect(client.binaryFeeds?.get("user-1")).toBe(9);
+  });
+
+  test("should go back to JSON on a later non-binary subscribe", () => {
+    const client: BinarySubscriber = {};
+    setFeedEncoding(client, "user-1", "binary", 9);
+    setFeedEncoding(client, "user-2", "binary", 10);
+
+    setFeedEncoding(client, "user-1", undefined, undefined);
+    expect(client.binaryFeeds?.has("user-1")).toBe(false);
+    // Other subscriptions on the same connection keep their feed
+    expect(client.binaryFeeds?.get("user-2")).toBe(10);
+
+    setFeedEncoding(client, "user-2", "json", 10);
+    expect(client.binaryFeeds?.has("user-2")).toBe(false);
+  });
+
+  test.each([-1, 0x10000, 1.5, "9", undefined])(
+    "should fall back to JSON for feed %p",
+    (feed) => {
+      const client: BinarySubscriber = {};
+      setFeedEncoding(client, "user-1", "binary", 9);
+      setFeedEncoding(client, "user-1", "binary", feed);
+      expect(client.binaryFeeds?.has("user-1")).toBe(false);
+    }
+  );
+
+  test("should not allocate a map for JSON subscribers", () => {
+    const client: BinarySubscriber = {};
+    setFeedEncoding(client, "user-1", undefined, undefined);
+    expect(client.binaryFeeds).toBeUndefined();
+  });
+});
@@ -0,0 +1,88 @@
+import { PriceTick, TrendSignal } from "@tradeOS/types";
+
+/**
+ * Compact binary price ticks for clients that subscribe with
+ * `encoding: "binary"`. Each tick is a fixed 20-byte little-endian record:
+ *
+ *   u8 version | u8 trend | u16 feed | f64 timestamp (ms) | f64 price
+ *
+ * `feed` is the number the client chose when subscribing, so one connection
+ * can multiplex several feeds without repeating the userId in every frame.
+ * A frame holds one or more records back to back.
+ */
+export const TICK_VERSION = 1;
+export const TICK_SIZE = 20;
+
+export const TREND_CODES: Record<TrendSignal, number> = {
+  up: 0,
+  down: 1,
+  sideways: 2,
+  whale: 3,
+  rug: 4,
+};
+
+const UNKNOWN_TREND = 255;
+
+/**
+ * Encode ticks of one feed into a single binary frame
+ */
+export function encodeTicks(feed: number, ticks: PriceTick[]): Buffer {
+  const buffer = Buffer.allocUnsafe(TICK_SIZE * ticks.length);
+  ticks.forEach((tick, i) => {
+    const offset = i * TICK_SIZE;
+    buffer.writeUInt8(TICK_VERSION, offset);
+    buffer.writeUInt8(TREND_CODES[tick.trend] ?? UNKNOWN_TREND, offset + 1);
+    buffer.writeUInt16LE(feed, offset + 2);
+    buffer.writeDoubleLE(tick.timestamp, offset + 4);
+    buffer.writeDoubleLE(tick.price, offset + 12);
+  });
+  return buffer;
+}
+
+/**
+ * Frames of the same ticks for each feed number, encoded on first use, so a
+ * broadcast encodes once per distinct feed rather than once per client
+ */
+export function framesFor(ticks: PriceTick[]): (feed: number) => Buffer {
+  const frames = new Map<number, Buffer>();
+  return (feed) => {
+    let frame = frames.get(feed);
+    if (!frame) {
+      frame = encodeTicks(feed, ticks);
+      frames.set(feed, frame);
+    }
+    return frame;
+  };
+}
+
+/**
+ * A WebSocket client's binary subscriptions: userId -> feed number
+ */
+export interface BinarySubscriber {
+  binaryFeeds?: Map<string, number>;
+}
+
+/**
+ * Apply the encoding of a subscribe message for `userId`. Binary with a
+ * valid u16 feed number opts in; anything else (including a later JSON
+ * subscribe for the same userId) goes back to JSON ticks.
+ */
+export function setFeedEncoding(
+  client: BinarySubscriber,
+  userId: string,
+  encoding: unknown,
+  feed: unknown
+): void {
+  if (
+    encoding === "binary" &&
+    typeof feed === "number" &&
+    Number.isInteger(feed) &&
+    feed >= 0 &&
+    feed <= 0xffff
+  ) {
+    client.binaryFeeds ??= new Map<string, number>();
+    client.binaryFeeds.set(userId, feed);
+  } else {
+    client.binaryFeeds?.delete(userId);
+  }
+}